@@ -585,6 +585,39 @@ QUARTUS_PROJECT_TCL_PART_2 = r'''
 }
 '''
 
+# the clocks of DE10_NANO_SOC_GHRD.sdc, the design and soc_system are clocked by FPGA_CLK1_50, the constraints of the pios are appended by the generator
+SDC_PART_1 = r'''#**************************************************************
+# Create Clock
+#**************************************************************
+create_clock -period "50.0 MHz" [get_ports FPGA_CLK1_50]
+create_clock -period "50.0 MHz" [get_ports FPGA_CLK2_50]
+create_clock -period "50.0 MHz" [get_ports FPGA_CLK3_50]
+
+# for enhancing USB BlasterII to be reliable, 25MHz
+create_clock -name {altera_reserved_tck} -period 40 {altera_reserved_tck}
+set_input_delay -clock altera_reserved_tck -clock_fall 3 [get_ports altera_reserved_tdi]
+set_input_delay -clock altera_reserved_tck -clock_fall 3 [get_ports altera_reserved_tms]
+set_output_delay -clock altera_reserved_tck 3 [get_ports altera_reserved_tdo]
+
+#**************************************************************
+# Create Generated Clock
+#**************************************************************
+derive_pll_clocks%(generated_clocks)s
+
+#**************************************************************
+# Set Clock Uncertainty
+#**************************************************************
+derive_clock_uncertainty
+
+#**************************************************************
+# Set Multicycle Path / Set False Path
+#**************************************************************
+'''
+
+# the comment before the pio path constraints of generate_sdc_file()
+SDC_PIO_PATHS_COMMENT = r'''# the pio registers are quasi-static: the HPS writes an output pio through the bridge long before the design uses it,
+# and reads an input pio after the design has settled, so the paths between the pios and the design are relaxed'''
+
 QSYS_TCL_PART_1 = r'''
 # qsys scripting (.tcl) file for soc_system
 package require -exact qsys 16.0
@@ -1085,30 +1118,39 @@ set_instance_parameter_value hps_0 {spi_m_clk_div} {0}
 set_instance_parameter_value hps_0 {usb_mp_clk_div} {0}
 set_instance_parameter_value hps_0 {use_default_mpu_clk} {1}
 
-add_instance mm_bridge_0 altera_avalon_mm_bridge 22.1
+'''
+
+# the data width of the bridge is the width of the pios, the address width is computed from the address map
+# the max burst size is 1 unless the burst pio banks are used
+QSYS_TCL_MM_BRIDGE = r'''add_instance mm_bridge_0 altera_avalon_mm_bridge 22.1
 set_instance_parameter_value mm_bridge_0 {ADDRESS_UNITS} {SYMBOLS}
-set_instance_parameter_value mm_bridge_0 {ADDRESS_WIDTH} {10}
-set_instance_parameter_value mm_bridge_0 {DATA_WIDTH} {64}
+set_instance_parameter_value mm_bridge_0 {ADDRESS_WIDTH} {%(address_width)d}
+set_instance_parameter_value mm_bridge_0 {DATA_WIDTH} {%(data_width)d}
 set_instance_parameter_value mm_bridge_0 {LINEWRAPBURSTS} {0}
-set_instance_parameter_value mm_bridge_0 {MAX_BURST_SIZE} {1}
+set_instance_parameter_value mm_bridge_0 {MAX_BURST_SIZE} {%(max_burst_size)d}
 set_instance_parameter_value mm_bridge_0 {MAX_PENDING_RESPONSES} {4}
 set_instance_parameter_value mm_bridge_0 {PIPELINE_COMMAND} {1}
 set_instance_parameter_value mm_bridge_0 {PIPELINE_RESPONSE} {1}
 set_instance_parameter_value mm_bridge_0 {SYMBOL_WIDTH} {8}
-set_instance_parameter_value mm_bridge_0 {USE_AUTO_ADDRESS_WIDTH} {1}
+set_instance_parameter_value mm_bridge_0 {USE_AUTO_ADDRESS_WIDTH} {0}
 set_instance_parameter_value mm_bridge_0 {USE_RESPONSE} {0}
 '''
 
-PIO64_OUT_HW_TCL = r'''
+# the pio templates are parameterised by the data width, fill them with % {'width': width, 'msb': width - 1}
+# PIO_IN_HW_TCL takes 'read_latency' and 'read_wait_time' as well, (0, 1) for PIO_IN_HDL_SV, (read_latency, 0) for PIO_IN_PIPELINED_HDL_SV
+# PIO_OUT_HW_TCL and PIO_OUT_HDL_SV take 'bytes': width // 8 and 'byteenable_msb': width // 8 - 1 as well, PIO_OUT_HW_TCL takes 'readback_ports',
+# '' for PIO_OUT_HDL_SV or PIO_OUT_READBACK_PORTS for PIO_OUT_READBACK_HDL_SV
+# both _HW_TCL take 'sync_port', '' or PIO_OUT_COMMIT_PORT / PIO_IN_SNAPSHOT_PORT for PIO_OUT_BUFFERED_HDL_SV / PIO_IN_SNAPSHOT_HDL_SV
+PIO_OUT_HW_TCL = r'''
 package require -exact qsys 16.1
 
 set_module_property DESCRIPTION ""
-set_module_property NAME pio64_out
+set_module_property NAME pio%(width)d_out
 set_module_property VERSION 1.0
 set_module_property INTERNAL false
 set_module_property OPAQUE_ADDRESS_MAP true
 set_module_property AUTHOR ""
-set_module_property DISPLAY_NAME "Parallel IO 64 bit Output"
+set_module_property DISPLAY_NAME "Parallel IO %(width)d bit Output"
 set_module_property INSTANTIATE_IN_SYSTEM_MODULE true
 set_module_property EDITABLE true
 set_module_property REPORT_TO_TALKBACK false
@@ -1116,10 +1158,10 @@ set_module_property ALLOW_GREYBOX_GENERATION false
 set_module_property REPORT_HIERARCHY false
 
 add_fileset QUARTUS_SYNTH QUARTUS_SYNTH "" ""
-set_fileset_property QUARTUS_SYNTH TOP_LEVEL pio64_out
+set_fileset_property QUARTUS_SYNTH TOP_LEVEL pio%(width)d_out
 set_fileset_property QUARTUS_SYNTH ENABLE_RELATIVE_INCLUDE_PATHS false
 set_fileset_property QUARTUS_SYNTH ENABLE_FILE_OVERWRITE_MODE false
-add_fileset_file pio64_out.sv SYSTEM_VERILOG PATH ip/pio64/pio64_out.sv TOP_LEVEL_FILE
+add_fileset_file pio%(width)d_out.sv SYSTEM_VERILOG PATH ip/pio%(width)d/pio%(width)d_out.sv TOP_LEVEL_FILE
 
 add_interface clock clock end
 set_interface_property clock clockRate 0
@@ -1166,34 +1208,35 @@ set_interface_property s0 CMSIS_SVD_VARIABLES ""
 set_interface_property s0 SVD_ADDRESS_GROUP ""
 
 add_interface_port s0 avs_s0_write write Input 1
-add_interface_port s0 avs_s0_writedata writedata Input 64
-set_interface_assignment s0 embeddedsw.configuration.isFlash 0
+add_interface_port s0 avs_s0_writedata writedata Input %(width)d
+add_interface_port s0 avs_s0_byteenable byteenable Input %(bytes)d
+%(readback_ports)sset_interface_assignment s0 embeddedsw.configuration.isFlash 0
 set_interface_assignment s0 embeddedsw.configuration.isMemoryDevice 0
 set_interface_assignment s0 embeddedsw.configuration.isNonVolatileStorage 0
 set_interface_assignment s0 embeddedsw.configuration.isPrintableDevice 0
 
-add_interface pio64_out conduit end
-set_interface_property pio64_out associatedClock clock
-set_interface_property pio64_out associatedReset reset
-set_interface_property pio64_out ENABLED true
-set_interface_property pio64_out EXPORT_OF ""
-set_interface_property pio64_out PORT_NAME_MAP ""
-set_interface_property pio64_out CMSIS_SVD_VARIABLES ""
-set_interface_property pio64_out SVD_ADDRESS_GROUP ""
+add_interface pio%(width)d_out conduit end
+set_interface_property pio%(width)d_out associatedClock clock
+set_interface_property pio%(width)d_out associatedReset reset
+set_interface_property pio%(width)d_out ENABLED true
+set_interface_property pio%(width)d_out EXPORT_OF ""
+set_interface_property pio%(width)d_out PORT_NAME_MAP ""
+set_interface_property pio%(width)d_out CMSIS_SVD_VARIABLES ""
+set_interface_property pio%(width)d_out SVD_ADDRESS_GROUP ""
 
-add_interface_port pio64_out pio_out export Output 64
-'''
+add_interface_port pio%(width)d_out pio_out export Output %(width)d
+%(sync_port)s'''
 
-PIO64_IN_HW_TCL = r'''
+PIO_IN_HW_TCL = r'''
 package require -exact qsys 16.1
 
 set_module_property DESCRIPTION ""
-set_module_property NAME pio64_in
+set_module_property NAME pio%(width)d_in
 set_module_property VERSION 1.0
 set_module_property INTERNAL false
 set_module_property OPAQUE_ADDRESS_MAP true
 set_module_property AUTHOR ""
-set_module_property DISPLAY_NAME "Parallel IO 64 bit Input"
+set_module_property DISPLAY_NAME "Parallel IO %(width)d bit Input"
 set_module_property INSTANTIATE_IN_SYSTEM_MODULE true
 set_module_property EDITABLE true
 set_module_property REPORT_TO_TALKBACK false
@@ -1201,10 +1244,10 @@ set_module_property ALLOW_GREYBOX_GENERATION false
 set_module_property REPORT_HIERARCHY false
 
 add_fileset QUARTUS_SYNTH QUARTUS_SYNTH "" ""
-set_fileset_property QUARTUS_SYNTH TOP_LEVEL pio64_in
+set_fileset_property QUARTUS_SYNTH TOP_LEVEL pio%(width)d_in
 set_fileset_property QUARTUS_SYNTH ENABLE_RELATIVE_INCLUDE_PATHS false
 set_fileset_property QUARTUS_SYNTH ENABLE_FILE_OVERWRITE_MODE false
-add_fileset_file pio64_in.sv SYSTEM_VERILOG PATH ip/pio64/pio64_in.sv TOP_LEVEL_FILE
+add_fileset_file pio%(width)d_in.sv SYSTEM_VERILOG PATH ip/pio%(width)d/pio%(width)d_in.sv TOP_LEVEL_FILE
 
 add_interface clock clock end
 set_interface_property clock clockRate 0
@@ -1239,8 +1282,8 @@ set_interface_property s0 holdTime 0
 set_interface_property s0 linewrapBursts false
 set_interface_property s0 maximumPendingReadTransactions 0
 set_interface_property s0 maximumPendingWriteTransactions 0
-set_interface_property s0 readLatency 0
-set_interface_property s0 readWaitTime 1
+set_interface_property s0 readLatency %(read_latency)d
+set_interface_property s0 readWaitTime %(read_wait_time)d
 set_interface_property s0 setupTime 0
 set_interface_property s0 timingUnits Cycles
 set_interface_property s0 writeWaitTime 0
@@ -1251,59 +1294,106 @@ set_interface_property s0 CMSIS_SVD_VARIABLES ""
 set_interface_property s0 SVD_ADDRESS_GROUP ""
 
 add_interface_port s0 avs_s0_read read Input 1
-add_interface_port s0 avs_s0_readdata readdata Output 64
+add_interface_port s0 avs_s0_readdata readdata Output %(width)d
 set_interface_assignment s0 embeddedsw.configuration.isFlash 0
 set_interface_assignment s0 embeddedsw.configuration.isMemoryDevice 0
 set_interface_assignment s0 embeddedsw.configuration.isNonVolatileStorage 0
 set_interface_assignment s0 embeddedsw.configuration.isPrintableDevice 0
 
-add_interface pio64_in conduit end
-set_interface_property pio64_in associatedClock clock
-set_interface_property pio64_in associatedReset reset
-set_interface_property pio64_in ENABLED true
-set_interface_property pio64_in EXPORT_OF ""
-set_interface_property pio64_in PORT_NAME_MAP ""
-set_interface_property pio64_in CMSIS_SVD_VARIABLES ""
-set_interface_property pio64_in SVD_ADDRESS_GROUP ""
+add_interface pio%(width)d_in conduit end
+set_interface_property pio%(width)d_in associatedClock clock
+set_interface_property pio%(width)d_in associatedReset reset
+set_interface_property pio%(width)d_in ENABLED true
+set_interface_property pio%(width)d_in EXPORT_OF ""
+set_interface_property pio%(width)d_in PORT_NAME_MAP ""
+set_interface_property pio%(width)d_in CMSIS_SVD_VARIABLES ""
+set_interface_property pio%(width)d_in SVD_ADDRESS_GROUP ""
+
+add_interface_port pio%(width)d_in pio_in export Input %(width)d
+%(sync_port)s'''
+
+# writen in sv
+PIO_OUT_HDL_SV = r'''
+module pio%(width)d_out (
+  input logic clk,
+  input logic reset,
+
+  input logic avs_s0_write,
+  input logic [%(msb)d:0] avs_s0_writedata,
+  input logic [%(byteenable_msb)d:0] avs_s0_byteenable,
+
+  output logic [%(msb)d:0] pio_out
+);
+
+// only the enabled bytes are written, so a narrow write updates its port without a read-modify-write
+always_ff @ (posedge clk) begin
+  if (reset) begin
+    pio_out <= '0;
+  end else if (avs_s0_write) begin
+    for (int byte_index = 0; byte_index < %(bytes)d; byte_index++) begin
+      if (avs_s0_byteenable[byte_index]) begin
+        pio_out[byte_index * 8 +: 8] <= avs_s0_writedata[byte_index * 8 +: 8];
+      end
+    end
+  end else begin
+    pio_out <= pio_out;
+  end
+end
+
+endmodule
+'''
 
-add_interface_port pio64_in pio_in export Input 64
+# the read path of the output register
+PIO_OUT_READBACK_PORTS = r'''add_interface_port s0 avs_s0_read read Input 1
+add_interface_port s0 avs_s0_readdata readdata Output %(width)d
 '''
 
 # writen in sv
-PIO64_OUT_HDL_SV = r'''
-module pio64_out (
+PIO_OUT_READBACK_HDL_SV = r'''
+module pio%(width)d_out (
   input logic clk,
   input logic reset,
 
   input logic avs_s0_write,
-  input logic [63:0] avs_s0_writedata,
+  input logic [%(msb)d:0] avs_s0_writedata,
+  input logic [%(byteenable_msb)d:0] avs_s0_byteenable,
+  input logic avs_s0_read,
+  output logic [%(msb)d:0] avs_s0_readdata,
 
-  output logic [63:0] pio_out
+  output logic [%(msb)d:0] pio_out
 );
 
+// only the enabled bytes are written, so a narrow write updates its port without a read-modify-write
 always_ff @ (posedge clk) begin
   if (reset) begin
     pio_out <= '0;
   end else if (avs_s0_write) begin
-    pio_out <= avs_s0_writedata;
+    for (int byte_index = 0; byte_index < %(bytes)d; byte_index++) begin
+      if (avs_s0_byteenable[byte_index]) begin
+        pio_out[byte_index * 8 +: 8] <= avs_s0_writedata[byte_index * 8 +: 8];
+      end
+    end
   end else begin
     pio_out <= pio_out;
   end
 end
 
+// the output register is read back, so the software needs no shadow copy
+assign avs_s0_readdata = pio_out;
+
 endmodule
 '''
 
 # writen in sv
-PIO64_IN_HDL_SV = r'''
-module pio64_in (
+PIO_IN_HDL_SV = r'''
+module pio%(width)d_in (
   input logic clk,
   input logic reset,
 
   input logic avs_s0_read,
-  output logic [63:0] avs_s0_readdata,
+  output logic [%(msb)d:0] avs_s0_readdata,
 
-  input logic [63:0] pio_in
+  input logic [%(msb)d:0] pio_in
 );
 
 always_comb begin
@@ -1316,3 +1406,1658 @@ end
 
 endmodule
 '''
+
+# writen in sv
+# the registered read path, pio_in passes through read_latency registers, so the interconnect can issue a read every cycle, fill it with
+# % {'width': width, 'msb': width - 1, 'read_latency': read_latency}
+PIO_IN_PIPELINED_HDL_SV = r'''
+module pio%(width)d_in (
+  input logic clk,
+  input logic reset,
+
+  input logic avs_s0_read,
+  output logic [%(msb)d:0] avs_s0_readdata,
+
+  input logic [%(msb)d:0] pio_in
+);
+
+// the read data of a read in cycle t is pio_in sampled in cycle t, avs_s0_readdata holds it read_latency cycles later
+logic [%(msb)d:0] read_pipe [%(read_latency)d];
+
+always_ff @ (posedge clk) begin
+  read_pipe[0] <= pio_in;
+  for (int stage = 1; stage < %(read_latency)d; stage++) begin
+    read_pipe[stage] <= read_pipe[stage - 1];
+  end
+end
+
+assign avs_s0_readdata = read_pipe[%(read_latency)d - 1];
+
+endmodule
+'''
+
+# the double-buffered output pio, a write goes to the staged word, and the commit strobe of the pio_sync core applies the staged words of every output pio in the same cycle
+PIO_OUT_COMMIT_PORT = r'''add_interface_port pio%(width)d_out commit commit Input 1
+'''
+
+# writen in sv
+PIO_OUT_BUFFERED_HDL_SV = r'''
+module pio%(width)d_out (
+  input logic clk,
+  input logic reset,
+
+  input logic avs_s0_write,
+  input logic [%(msb)d:0] avs_s0_writedata,
+  input logic [%(byteenable_msb)d:0] avs_s0_byteenable,
+
+  output logic [%(msb)d:0] pio_out,
+  input logic commit
+);
+
+logic [%(msb)d:0] pio_staged;
+
+always_ff @ (posedge clk) begin
+  if (reset) begin
+    pio_staged <= '0;
+  end else if (avs_s0_write) begin
+    for (int byte_index = 0; byte_index < %(bytes)d; byte_index++) begin
+      if (avs_s0_byteenable[byte_index]) begin
+        pio_staged[byte_index * 8 +: 8] <= avs_s0_writedata[byte_index * 8 +: 8];
+      end
+    end
+  end
+end
+
+// a commit in the same cycle as a write applies the staged word before the write
+always_ff @ (posedge clk) begin
+  if (reset) begin
+    pio_out <= '0;
+  end else if (commit) begin
+    pio_out <= pio_staged;
+  end else begin
+    pio_out <= pio_out;
+  end
+end
+
+endmodule
+'''
+
+# the snapshot input pio, the snapshot strobe of the pio_sync core latches the design outputs of every input pio in the same cycle, and a read returns the latched word
+PIO_IN_SNAPSHOT_PORT = r'''add_interface_port pio%(width)d_in snapshot snapshot Input 1
+'''
+
+# writen in sv
+PIO_IN_SNAPSHOT_HDL_SV = r'''
+module pio%(width)d_in (
+  input logic clk,
+  input logic reset,
+
+  input logic avs_s0_read,
+  output logic [%(msb)d:0] avs_s0_readdata,
+
+  input logic [%(msb)d:0] pio_in,
+  input logic snapshot
+);
+
+logic [%(msb)d:0] pio_snapshot;
+
+always_ff @ (posedge clk) begin
+  if (reset) begin
+    pio_snapshot <= '0;
+  end else if (snapshot) begin
+    pio_snapshot <= pio_in;
+  end
+end
+
+assign avs_s0_readdata = pio_snapshot;
+
+endmodule
+'''
+
+# the burst pio banks, one avalon slave holds several pio words and accepts bursts, fill them with
+# % {'name': name, 'width': width, 'msb': width - 1, 'words': words, 'export_width': width * words, 'export_msb': width * words - 1,
+#    'address_width': address_width, 'address_msb': address_width - 1, 'burstcount_width': burstcount_width, 'burstcount_msb': burstcount_width - 1,
+#    'bytes': width // 8, 'byteenable_msb': width // 8 - 1}
+PIO_BANK_OUT_HW_TCL = r'''
+package require -exact qsys 16.1
+
+set_module_property DESCRIPTION ""
+set_module_property NAME %(name)s
+set_module_property VERSION 1.0
+set_module_property INTERNAL false
+set_module_property OPAQUE_ADDRESS_MAP true
+set_module_property AUTHOR ""
+set_module_property DISPLAY_NAME "Parallel IO %(width)d bit x %(words)d Output (burst)"
+set_module_property INSTANTIATE_IN_SYSTEM_MODULE true
+set_module_property EDITABLE true
+set_module_property REPORT_TO_TALKBACK false
+set_module_property ALLOW_GREYBOX_GENERATION false
+set_module_property REPORT_HIERARCHY false
+
+add_fileset QUARTUS_SYNTH QUARTUS_SYNTH "" ""
+set_fileset_property QUARTUS_SYNTH TOP_LEVEL %(name)s
+set_fileset_property QUARTUS_SYNTH ENABLE_RELATIVE_INCLUDE_PATHS false
+set_fileset_property QUARTUS_SYNTH ENABLE_FILE_OVERWRITE_MODE false
+add_fileset_file %(name)s.sv SYSTEM_VERILOG PATH ip/pio%(width)d/%(name)s.sv TOP_LEVEL_FILE
+
+add_interface clock clock end
+set_interface_property clock clockRate 0
+set_interface_property clock ENABLED true
+set_interface_property clock EXPORT_OF ""
+set_interface_property clock PORT_NAME_MAP ""
+set_interface_property clock CMSIS_SVD_VARIABLES ""
+set_interface_property clock SVD_ADDRESS_GROUP ""
+
+add_interface_port clock clk clk Input 1
+
+add_interface reset reset end
+set_interface_property reset associatedClock clock
+set_interface_property reset synchronousEdges DEASSERT
+set_interface_property reset ENABLED true
+set_interface_property reset EXPORT_OF ""
+set_interface_property reset PORT_NAME_MAP ""
+set_interface_property reset CMSIS_SVD_VARIABLES ""
+set_interface_property reset SVD_ADDRESS_GROUP ""
+
+add_interface_port reset reset reset Input 1
+
+add_interface s0 avalon end
+set_interface_property s0 addressUnits WORDS
+set_interface_property s0 associatedClock clock
+set_interface_property s0 associatedReset reset
+set_interface_property s0 bitsPerSymbol 8
+set_interface_property s0 burstOnBurstBoundariesOnly false
+set_interface_property s0 burstcountUnits WORDS
+set_interface_property s0 explicitAddressSpan 0
+set_interface_property s0 holdTime 0
+set_interface_property s0 linewrapBursts false
+set_interface_property s0 maximumPendingReadTransactions 0
+set_interface_property s0 maximumPendingWriteTransactions 0
+set_interface_property s0 readLatency 0
+set_interface_property s0 readWaitTime 1
+set_interface_property s0 setupTime 0
+set_interface_property s0 timingUnits Cycles
+set_interface_property s0 writeWaitTime 0
+set_interface_property s0 ENABLED true
+set_interface_property s0 EXPORT_OF ""
+set_interface_property s0 PORT_NAME_MAP ""
+set_interface_property s0 CMSIS_SVD_VARIABLES ""
+set_interface_property s0 SVD_ADDRESS_GROUP ""
+
+add_interface_port s0 avs_s0_address address Input %(address_width)d
+add_interface_port s0 avs_s0_burstcount burstcount Input %(burstcount_width)d
+add_interface_port s0 avs_s0_write write Input 1
+add_interface_port s0 avs_s0_writedata writedata Input %(width)d
+add_interface_port s0 avs_s0_byteenable byteenable Input %(bytes)d
+set_interface_assignment s0 embeddedsw.configuration.isFlash 0
+set_interface_assignment s0 embeddedsw.configuration.isMemoryDevice 0
+set_interface_assignment s0 embeddedsw.configuration.isNonVolatileStorage 0
+set_interface_assignment s0 embeddedsw.configuration.isPrintableDevice 0
+
+add_interface %(name)s conduit end
+set_interface_property %(name)s associatedClock clock
+set_interface_property %(name)s associatedReset reset
+set_interface_property %(name)s ENABLED true
+set_interface_property %(name)s EXPORT_OF ""
+set_interface_property %(name)s PORT_NAME_MAP ""
+set_interface_property %(name)s CMSIS_SVD_VARIABLES ""
+set_interface_property %(name)s SVD_ADDRESS_GROUP ""
+
+add_interface_port %(name)s pio_out export Output %(export_width)d
+'''
+
+PIO_BANK_IN_HW_TCL = r'''
+package require -exact qsys 16.1
+
+set_module_property DESCRIPTION ""
+set_module_property NAME %(name)s
+set_module_property VERSION 1.0
+set_module_property INTERNAL false
+set_module_property OPAQUE_ADDRESS_MAP true
+set_module_property AUTHOR ""
+set_module_property DISPLAY_NAME "Parallel IO %(width)d bit x %(words)d Input (burst)"
+set_module_property INSTANTIATE_IN_SYSTEM_MODULE true
+set_module_property EDITABLE true
+set_module_property REPORT_TO_TALKBACK false
+set_module_property ALLOW_GREYBOX_GENERATION false
+set_module_property REPORT_HIERARCHY false
+
+add_fileset QUARTUS_SYNTH QUARTUS_SYNTH "" ""
+set_fileset_property QUARTUS_SYNTH TOP_LEVEL %(name)s
+set_fileset_property QUARTUS_SYNTH ENABLE_RELATIVE_INCLUDE_PATHS false
+set_fileset_property QUARTUS_SYNTH ENABLE_FILE_OVERWRITE_MODE false
+add_fileset_file %(name)s.sv SYSTEM_VERILOG PATH ip/pio%(width)d/%(name)s.sv TOP_LEVEL_FILE
+
+add_interface clock clock end
+set_interface_property clock clockRate 0
+set_interface_property clock ENABLED true
+set_interface_property clock EXPORT_OF ""
+set_interface_property clock PORT_NAME_MAP ""
+set_interface_property clock CMSIS_SVD_VARIABLES ""
+set_interface_property clock SVD_ADDRESS_GROUP ""
+
+add_interface_port clock clk clk Input 1
+
+add_interface reset reset end
+set_interface_property reset associatedClock clock
+set_interface_property reset synchronousEdges DEASSERT
+set_interface_property reset ENABLED true
+set_interface_property reset EXPORT_OF ""
+set_interface_property reset PORT_NAME_MAP ""
+set_interface_property reset CMSIS_SVD_VARIABLES ""
+set_interface_property reset SVD_ADDRESS_GROUP ""
+
+add_interface_port reset reset reset Input 1
+
+add_interface s0 avalon end
+set_interface_property s0 addressUnits WORDS
+set_interface_property s0 associatedClock clock
+set_interface_property s0 associatedReset reset
+set_interface_property s0 bitsPerSymbol 8
+set_interface_property s0 burstOnBurstBoundariesOnly false
+set_interface_property s0 burstcountUnits WORDS
+set_interface_property s0 explicitAddressSpan 0
+set_interface_property s0 holdTime 0
+set_interface_property s0 linewrapBursts false
+set_interface_property s0 maximumPendingReadTransactions 1
+set_interface_property s0 maximumPendingWriteTransactions 0
+set_interface_property s0 readLatency 0
+set_interface_property s0 readWaitTime 1
+set_interface_property s0 setupTime 0
+set_interface_property s0 timingUnits Cycles
+set_interface_property s0 writeWaitTime 0
+set_interface_property s0 ENABLED true
+set_interface_property s0 EXPORT_OF ""
+set_interface_property s0 PORT_NAME_MAP ""
+set_interface_property s0 CMSIS_SVD_VARIABLES ""
+set_interface_property s0 SVD_ADDRESS_GROUP ""
+
+add_interface_port s0 avs_s0_address address Input %(address_width)d
+add_interface_port s0 avs_s0_burstcount burstcount Input %(burstcount_width)d
+add_interface_port s0 avs_s0_read read Input 1
+add_interface_port s0 avs_s0_readdata readdata Output %(width)d
+add_interface_port s0 avs_s0_readdatavalid readdatavalid Output 1
+add_interface_port s0 avs_s0_waitrequest waitrequest Output 1
+set_interface_assignment s0 embeddedsw.configuration.isFlash 0
+set_interface_assignment s0 embeddedsw.configuration.isMemoryDevice 0
+set_interface_assignment s0 embeddedsw.configuration.isNonVolatileStorage 0
+set_interface_assignment s0 embeddedsw.configuration.isPrintableDevice 0
+
+add_interface %(name)s conduit end
+set_interface_property %(name)s associatedClock clock
+set_interface_property %(name)s associatedReset reset
+set_interface_property %(name)s ENABLED true
+set_interface_property %(name)s EXPORT_OF ""
+set_interface_property %(name)s PORT_NAME_MAP ""
+set_interface_property %(name)s CMSIS_SVD_VARIABLES ""
+set_interface_property %(name)s SVD_ADDRESS_GROUP ""
+
+add_interface_port %(name)s pio_in export Input %(export_width)d
+'''
+
+# writen in sv
+PIO_BANK_OUT_HDL_SV = r'''
+module %(name)s (
+  input logic clk,
+  input logic reset,
+
+  input logic [%(address_msb)d:0] avs_s0_address,
+  input logic [%(burstcount_msb)d:0] avs_s0_burstcount,
+  input logic avs_s0_write,
+  input logic [%(msb)d:0] avs_s0_writedata,
+  input logic [%(byteenable_msb)d:0] avs_s0_byteenable,
+
+  output logic [%(export_msb)d:0] pio_out
+);
+
+// a burst starts at avs_s0_address, every following beat writes the next word
+logic [%(address_msb)d:0] beat_address;
+logic [%(burstcount_msb)d:0] beats_left;
+logic [%(address_msb)d:0] word_address;
+
+assign word_address = (beats_left == 0) ? avs_s0_address : beat_address;
+
+always_ff @ (posedge clk) begin
+  if (reset) begin
+    pio_out <= '0;
+    beat_address <= '0;
+    beats_left <= '0;
+  end else if (avs_s0_write) begin
+    for (int byte_index = 0; byte_index < %(bytes)d; byte_index++) begin
+      if (avs_s0_byteenable[byte_index]) begin
+        pio_out[word_address * %(width)d + byte_index * 8 +: 8] <= avs_s0_writedata[byte_index * 8 +: 8];
+      end
+    end
+    beat_address <= word_address + 1'b1;
+    if (beats_left == 0) begin
+      beats_left <= avs_s0_burstcount - 1'b1;
+    end else begin
+      beats_left <= beats_left - 1'b1;
+    end
+  end
+end
+
+endmodule
+'''
+
+# writen in sv
+PIO_BANK_IN_HDL_SV = r'''
+module %(name)s (
+  input logic clk,
+  input logic reset,
+
+  input logic [%(address_msb)d:0] avs_s0_address,
+  input logic [%(burstcount_msb)d:0] avs_s0_burstcount,
+  input logic avs_s0_read,
+  output logic [%(msb)d:0] avs_s0_readdata,
+  output logic avs_s0_readdatavalid,
+  output logic avs_s0_waitrequest,
+
+  input logic [%(export_msb)d:0] pio_in
+);
+
+// a burst starts at avs_s0_address, one word is returned every cycle
+logic [%(address_msb)d:0] beat_address;
+logic [%(burstcount_msb)d:0] beats_left;
+
+// a new read is accepted when the last burst is finished
+assign avs_s0_waitrequest = (beats_left != 0);
+
+always_ff @ (posedge clk) begin
+  if (reset) begin
+    avs_s0_readdata <= '0;
+    avs_s0_readdatavalid <= 1'b0;
+    beat_address <= '0;
+    beats_left <= '0;
+  end else if (beats_left != 0) begin
+    avs_s0_readdata <= pio_in[beat_address * %(width)d +: %(width)d];
+    avs_s0_readdatavalid <= 1'b1;
+    beat_address <= beat_address + 1'b1;
+    beats_left <= beats_left - 1'b1;
+  end else if (avs_s0_read) begin
+    avs_s0_readdata <= pio_in[avs_s0_address * %(width)d +: %(width)d];
+    avs_s0_readdatavalid <= 1'b1;
+    beat_address <= avs_s0_address + 1'b1;
+    beats_left <= avs_s0_burstcount - 1'b1;
+  end else begin
+    avs_s0_readdatavalid <= 1'b0;
+  end
+end
+
+endmodule
+'''
+
+# the vector sequencer, the stimulus memory and the response memory of the test vectors, fill them with
+# % {'width': width, 'msb': width - 1, 'depth': depth, 'depth_width': depth_width,
+#    'stimulus_words': stimulus_words, 'stimulus_word_width': stimulus_word_width, 'stimulus_width': width * stimulus_words, 'stimulus_msb': width * stimulus_words - 1,
+#    'stimulus_address_width': depth_width + stimulus_word_width, 'stimulus_address_msb': depth_width + stimulus_word_width - 1,
+#    'response_words': response_words, 'response_word_width': response_word_width, 'response_width': width * response_words, 'response_msb': width * response_words - 1,
+#    'response_address_width': depth_width + response_word_width, 'response_address_msb': depth_width + response_word_width - 1}
+VECTOR_SEQUENCER_HW_TCL = r'''
+package require -exact qsys 16.1
+
+set_module_property DESCRIPTION ""
+set_module_property NAME vector_sequencer
+set_module_property VERSION 1.0
+set_module_property INTERNAL false
+set_module_property OPAQUE_ADDRESS_MAP true
+set_module_property AUTHOR ""
+set_module_property DISPLAY_NAME "Vector Sequencer %(width)d bit x %(depth)d vectors"
+set_module_property INSTANTIATE_IN_SYSTEM_MODULE true
+set_module_property EDITABLE true
+set_module_property REPORT_TO_TALKBACK false
+set_module_property ALLOW_GREYBOX_GENERATION false
+set_module_property REPORT_HIERARCHY false
+
+add_fileset QUARTUS_SYNTH QUARTUS_SYNTH "" ""
+set_fileset_property QUARTUS_SYNTH TOP_LEVEL vector_sequencer
+set_fileset_property QUARTUS_SYNTH ENABLE_RELATIVE_INCLUDE_PATHS false
+set_fileset_property QUARTUS_SYNTH ENABLE_FILE_OVERWRITE_MODE false
+add_fileset_file vector_sequencer.sv SYSTEM_VERILOG PATH ip/vector_sequencer/vector_sequencer.sv TOP_LEVEL_FILE
+
+add_interface clock clock end
+set_interface_property clock clockRate 0
+set_interface_property clock ENABLED true
+set_interface_property clock EXPORT_OF ""
+set_interface_property clock PORT_NAME_MAP ""
+set_interface_property clock CMSIS_SVD_VARIABLES ""
+set_interface_property clock SVD_ADDRESS_GROUP ""
+
+add_interface_port clock clk clk Input 1
+
+add_interface reset reset end
+set_interface_property reset associatedClock clock
+set_interface_property reset synchronousEdges DEASSERT
+set_interface_property reset ENABLED true
+set_interface_property reset EXPORT_OF ""
+set_interface_property reset PORT_NAME_MAP ""
+set_interface_property reset CMSIS_SVD_VARIABLES ""
+set_interface_property reset SVD_ADDRESS_GROUP ""
+
+add_interface_port reset reset reset Input 1
+
+add_interface csr avalon end
+set_interface_property csr addressUnits WORDS
+set_interface_property csr associatedClock clock
+set_interface_property csr associatedReset reset
+set_interface_property csr bitsPerSymbol 8
+set_interface_property csr burstOnBurstBoundariesOnly false
+set_interface_property csr burstcountUnits WORDS
+set_interface_property csr explicitAddressSpan 0
+set_interface_property csr holdTime 0
+set_interface_property csr linewrapBursts false
+set_interface_property csr maximumPendingReadTransactions 0
+set_interface_property csr maximumPendingWriteTransactions 0
+set_interface_property csr readLatency 0
+set_interface_property csr readWaitTime 1
+set_interface_property csr setupTime 0
+set_interface_property csr timingUnits Cycles
+set_interface_property csr writeWaitTime 0
+set_interface_property csr ENABLED true
+set_interface_property csr EXPORT_OF ""
+set_interface_property csr PORT_NAME_MAP ""
+set_interface_property csr CMSIS_SVD_VARIABLES ""
+set_interface_property csr SVD_ADDRESS_GROUP ""
+
+add_interface_port csr avs_csr_address address Input 2
+add_interface_port csr avs_csr_read read Input 1
+add_interface_port csr avs_csr_readdata readdata Output %(width)d
+add_interface_port csr avs_csr_write write Input 1
+add_interface_port csr avs_csr_writedata writedata Input %(width)d
+set_interface_assignment csr embeddedsw.configuration.isFlash 0
+set_interface_assignment csr embeddedsw.configuration.isMemoryDevice 0
+set_interface_assignment csr embeddedsw.configuration.isNonVolatileStorage 0
+set_interface_assignment csr embeddedsw.configuration.isPrintableDevice 0
+
+add_interface stimulus avalon end
+set_interface_property stimulus addressUnits WORDS
+set_interface_property stimulus associatedClock clock
+set_interface_property stimulus associatedReset reset
+set_interface_property stimulus bitsPerSymbol 8
+set_interface_property stimulus burstOnBurstBoundariesOnly false
+set_interface_property stimulus burstcountUnits WORDS
+set_interface_property stimulus explicitAddressSpan 0
+set_interface_property stimulus holdTime 0
+set_interface_property stimulus linewrapBursts false
+set_interface_property stimulus maximumPendingReadTransactions 0
+set_interface_property stimulus maximumPendingWriteTransactions 0
+set_interface_property stimulus readLatency 0
+set_interface_property stimulus readWaitTime 1
+set_interface_property stimulus setupTime 0
+set_interface_property stimulus timingUnits Cycles
+set_interface_property stimulus writeWaitTime 0
+set_interface_property stimulus ENABLED true
+set_interface_property stimulus EXPORT_OF ""
+set_interface_property stimulus PORT_NAME_MAP ""
+set_interface_property stimulus CMSIS_SVD_VARIABLES ""
+set_interface_property stimulus SVD_ADDRESS_GROUP ""
+
+add_interface_port stimulus avs_stimulus_address address Input %(stimulus_address_width)d
+add_interface_port stimulus avs_stimulus_write write Input 1
+add_interface_port stimulus avs_stimulus_writedata writedata Input %(width)d
+set_interface_assignment stimulus embeddedsw.configuration.isFlash 0
+set_interface_assignment stimulus embeddedsw.configuration.isMemoryDevice 1
+set_interface_assignment stimulus embeddedsw.configuration.isNonVolatileStorage 0
+set_interface_assignment stimulus embeddedsw.configuration.isPrintableDevice 0
+
+add_interface response avalon end
+set_interface_property response addressUnits WORDS
+set_interface_property response associatedClock clock
+set_interface_property response associatedReset reset
+set_interface_property response bitsPerSymbol 8
+set_interface_property response burstOnBurstBoundariesOnly false
+set_interface_property response burstcountUnits WORDS
+set_interface_property response explicitAddressSpan 0
+set_interface_property response holdTime 0
+set_interface_property response linewrapBursts false
+set_interface_property response maximumPendingReadTransactions 0
+set_interface_property response maximumPendingWriteTransactions 0
+set_interface_property response readLatency 1
+set_interface_property response readWaitTime 0
+set_interface_property response setupTime 0
+set_interface_property response timingUnits Cycles
+set_interface_property response writeWaitTime 0
+set_interface_property response ENABLED true
+set_interface_property response EXPORT_OF ""
+set_interface_property response PORT_NAME_MAP ""
+set_interface_property response CMSIS_SVD_VARIABLES ""
+set_interface_property response SVD_ADDRESS_GROUP ""
+
+add_interface_port response avs_response_address address Input %(response_address_width)d
+add_interface_port response avs_response_read read Input 1
+add_interface_port response avs_response_readdata readdata Output %(width)d
+set_interface_assignment response embeddedsw.configuration.isFlash 0
+set_interface_assignment response embeddedsw.configuration.isMemoryDevice 1
+set_interface_assignment response embeddedsw.configuration.isNonVolatileStorage 0
+set_interface_assignment response embeddedsw.configuration.isPrintableDevice 0
+
+add_interface vector_sequencer conduit end
+set_interface_property vector_sequencer associatedClock clock
+set_interface_property vector_sequencer associatedReset reset
+set_interface_property vector_sequencer ENABLED true
+set_interface_property vector_sequencer EXPORT_OF ""
+set_interface_property vector_sequencer PORT_NAME_MAP ""
+set_interface_property vector_sequencer CMSIS_SVD_VARIABLES ""
+set_interface_property vector_sequencer SVD_ADDRESS_GROUP ""
+
+add_interface_port vector_sequencer active active Output 1
+add_interface_port vector_sequencer stimulus stimulus Output %(stimulus_width)d
+add_interface_port vector_sequencer response response Input %(response_width)d
+'''
+
+# writen in sv
+# csr word 0: write 1 to start a run, read bit 0 busy and bit 1 done
+# csr word 1: the number of vectors of the run
+# csr word 2: the capture delay, the number of clock cycles between applying a vector and capturing its response (0 - 15)
+# csr word 3: the number of responses captured by the run
+# the stimulus and the response memory hold one vector every (stimulus / response) words, the word w of the vector v is at the word address v * words + w
+VECTOR_SEQUENCER_HDL_SV = r'''
+module vector_sequencer (
+  input logic clk,
+  input logic reset,
+
+  input logic [1:0] avs_csr_address,
+  input logic avs_csr_read,
+  output logic [%(msb)d:0] avs_csr_readdata,
+  input logic avs_csr_write,
+  input logic [%(msb)d:0] avs_csr_writedata,
+
+  input logic [%(stimulus_address_msb)d:0] avs_stimulus_address,
+  input logic avs_stimulus_write,
+  input logic [%(msb)d:0] avs_stimulus_writedata,
+
+  input logic [%(response_address_msb)d:0] avs_response_address,
+  input logic avs_response_read,
+  output logic [%(msb)d:0] avs_response_readdata,
+
+  output logic active,
+  output logic [%(stimulus_msb)d:0] stimulus,
+  input logic [%(response_msb)d:0] response
+);
+
+logic busy;
+logic done;
+logic [%(depth_width)d:0] vector_count;
+logic [3:0] capture_delay;
+logic [%(depth_width)d:0] issued_count;
+logic [%(depth_width)d:0] captured_count;
+// applied[d] is set when the vector applied d cycles ago should be captured
+logic [15:0] applied;
+logic issue;
+logic capture;
+
+assign active = busy;
+assign issue = busy && (issued_count != vector_count);
+assign capture = busy && applied[capture_delay];
+
+// control and status registers
+always_ff @ (posedge clk) begin
+  if (reset) begin
+    busy <= 1'b0;
+    done <= 1'b0;
+    vector_count <= '0;
+    capture_delay <= 4'd1;
+    issued_count <= '0;
+    captured_count <= '0;
+    applied <= '0;
+  end else begin
+    applied <= {applied[14:0], issue};
+    if (issue) begin
+      issued_count <= issued_count + 1'b1;
+    end
+    if (capture) begin
+      captured_count <= captured_count + 1'b1;
+    end
+    if (busy && !issue && !capture && applied == '0) begin
+      busy <= 1'b0;
+      done <= 1'b1;
+    end
+    if (avs_csr_write && !busy) begin
+      case (avs_csr_address)
+        2'd0: begin
+          if (avs_csr_writedata[0]) begin
+            busy <= 1'b1;
+            done <= 1'b0;
+            issued_count <= '0;
+            captured_count <= '0;
+          end
+        end
+        2'd1: vector_count <= avs_csr_writedata[%(depth_width)d:0];
+        2'd2: capture_delay <= avs_csr_writedata[3:0];
+        default: ;
+      endcase
+    end
+  end
+end
+
+always_comb begin
+  avs_csr_readdata = '0;
+  case (avs_csr_address)
+    2'd0: avs_csr_readdata[1:0] = {done, busy};
+    2'd1: avs_csr_readdata[%(depth_width)d:0] = vector_count;
+    2'd2: avs_csr_readdata[3:0] = capture_delay;
+    default: avs_csr_readdata[%(depth_width)d:0] = captured_count;
+  endcase
+end
+
+// the stimulus memory, a bank for every word of the vector, so a whole vector is read in one cycle
+logic [%(depth_width)d - 1:0] issue_address;
+assign issue_address = issued_count[%(depth_width)d - 1:0];
+
+genvar word;
+generate
+  for (word = 0; word < %(stimulus_words)d; word++) begin : stimulus_bank
+    logic [%(msb)d:0] ram [%(depth)d];
+    logic [%(msb)d:0] data;
+    always_ff @ (posedge clk) begin
+      if (avs_stimulus_write && avs_stimulus_address[%(stimulus_word_width)d - 1:0] == word) begin
+        ram[avs_stimulus_address[%(stimulus_address_msb)d:%(stimulus_word_width)d]] <= avs_stimulus_writedata;
+      end
+      data <= ram[issue_address];
+    end
+    assign stimulus[word * %(width)d +: %(width)d] = data;
+  end
+endgenerate
+
+// the response memory, a bank for every word of the vector, so a whole response is written in one cycle
+logic [%(depth_width)d - 1:0] capture_address;
+logic [%(response_word_width)d - 1:0] read_word;
+logic [%(msb)d:0] read_data [%(response_words)d];
+assign capture_address = captured_count[%(depth_width)d - 1:0];
+assign avs_response_readdata = read_data[read_word];
+
+always_ff @ (posedge clk) begin
+  read_word <= avs_response_address[%(response_word_width)d - 1:0];
+end
+
+generate
+  for (word = 0; word < %(response_words)d; word++) begin : response_bank
+    logic [%(msb)d:0] ram [%(depth)d];
+    logic [%(msb)d:0] data;
+    always_ff @ (posedge clk) begin
+      if (capture) begin
+        ram[capture_address] <= response[word * %(width)d +: %(width)d];
+      end
+      data <= ram[avs_response_address[%(response_address_msb)d:%(response_word_width)d]];
+    end
+    assign read_data[word] = data;
+  end
+endgenerate
+
+endmodule
+'''
+
+# the msgdma streaming path, a msgdma reads the stimulus from the HPS SDRAM and streams it to the stream adapter, another msgdma writes the response stream back to the HPS SDRAM
+# the FPGA-to-SDRAM port of hps_0 is enabled here (F2SDRAM_Type is a tcl list, one element for each port), fill it with
+# % {'data_width': data_width, 'adapter': adapter instance name, 'stimulus_csr': address, 'stimulus_descriptor': address, 'response_csr': address, 'response_descriptor': address}
+QSYS_TCL_MSGDMA = r'''
+set_instance_parameter_value hps_0 {F2SDRAM_Type} {Avalon-MM\ Bidirectional}
+set_instance_parameter_value hps_0 {F2SDRAM_Width} {%(data_width)d}
+
+add_instance msgdma_stimulus_0 altera_msgdma 22.1
+set_instance_parameter_value msgdma_stimulus_0 {MODE} {1}
+set_instance_parameter_value msgdma_stimulus_0 {DATA_WIDTH} {%(data_width)d}
+set_instance_parameter_value msgdma_stimulus_0 {DATA_FIFO_DEPTH} {256}
+set_instance_parameter_value msgdma_stimulus_0 {DESCRIPTOR_FIFO_DEPTH} {16}
+set_instance_parameter_value msgdma_stimulus_0 {RESPONSE_PORT} {2}
+set_instance_parameter_value msgdma_stimulus_0 {MAX_BYTE} {33554432}
+set_instance_parameter_value msgdma_stimulus_0 {TRANSFER_TYPE} {Aligned Accesses}
+set_instance_parameter_value msgdma_stimulus_0 {BURST_ENABLE} {1}
+set_instance_parameter_value msgdma_stimulus_0 {MAX_BURST_COUNT} {16}
+set_instance_parameter_value msgdma_stimulus_0 {PACKET_ENABLE} {0}
+set_instance_parameter_value msgdma_stimulus_0 {ERROR_ENABLE} {0}
+set_instance_parameter_value msgdma_stimulus_0 {CHANNEL_ENABLE} {0}
+set_instance_parameter_value msgdma_stimulus_0 {ENHANCED_FEATURES} {0}
+
+add_instance msgdma_response_0 altera_msgdma 22.1
+set_instance_parameter_value msgdma_response_0 {MODE} {2}
+set_instance_parameter_value msgdma_response_0 {DATA_WIDTH} {%(data_width)d}
+set_instance_parameter_value msgdma_response_0 {DATA_FIFO_DEPTH} {256}
+set_instance_parameter_value msgdma_response_0 {DESCRIPTOR_FIFO_DEPTH} {16}
+set_instance_parameter_value msgdma_response_0 {RESPONSE_PORT} {2}
+set_instance_parameter_value msgdma_response_0 {MAX_BYTE} {33554432}
+set_instance_parameter_value msgdma_response_0 {TRANSFER_TYPE} {Aligned Accesses}
+set_instance_parameter_value msgdma_response_0 {BURST_ENABLE} {1}
+set_instance_parameter_value msgdma_response_0 {MAX_BURST_COUNT} {16}
+set_instance_parameter_value msgdma_response_0 {PACKET_ENABLE} {0}
+set_instance_parameter_value msgdma_response_0 {ERROR_ENABLE} {0}
+set_instance_parameter_value msgdma_response_0 {CHANNEL_ENABLE} {0}
+set_instance_parameter_value msgdma_response_0 {ENHANCED_FEATURES} {0}
+
+add_connection clk_0.clk hps_0.f2h_sdram0_clock
+add_connection clk_0.clk msgdma_stimulus_0.clock
+add_connection clk_0.clk msgdma_response_0.clock
+add_connection clk_0.clk_reset msgdma_stimulus_0.reset_n
+add_connection clk_0.clk_reset msgdma_response_0.reset_n
+
+add_connection msgdma_stimulus_0.mm_read hps_0.f2h_sdram0_data
+set_connection_parameter_value msgdma_stimulus_0.mm_read/hps_0.f2h_sdram0_data arbitrationPriority {1}
+set_connection_parameter_value msgdma_stimulus_0.mm_read/hps_0.f2h_sdram0_data baseAddress {0x0000}
+set_connection_parameter_value msgdma_stimulus_0.mm_read/hps_0.f2h_sdram0_data defaultConnection {0}
+add_connection msgdma_response_0.mm_write hps_0.f2h_sdram0_data
+set_connection_parameter_value msgdma_response_0.mm_write/hps_0.f2h_sdram0_data arbitrationPriority {1}
+set_connection_parameter_value msgdma_response_0.mm_write/hps_0.f2h_sdram0_data baseAddress {0x0000}
+set_connection_parameter_value msgdma_response_0.mm_write/hps_0.f2h_sdram0_data defaultConnection {0}
+
+add_connection msgdma_stimulus_0.st_source %(adapter)s.st_sink
+add_connection %(adapter)s.st_source msgdma_response_0.st_sink
+
+add_connection mm_bridge_0.m0 msgdma_stimulus_0.csr
+set_connection_parameter_value mm_bridge_0.m0/msgdma_stimulus_0.csr arbitrationPriority {1}
+set_connection_parameter_value mm_bridge_0.m0/msgdma_stimulus_0.csr baseAddress {0x%(stimulus_csr)04x}
+set_connection_parameter_value mm_bridge_0.m0/msgdma_stimulus_0.csr defaultConnection {0}
+add_connection mm_bridge_0.m0 msgdma_stimulus_0.descriptor_slave
+set_connection_parameter_value mm_bridge_0.m0/msgdma_stimulus_0.descriptor_slave arbitrationPriority {1}
+set_connection_parameter_value mm_bridge_0.m0/msgdma_stimulus_0.descriptor_slave baseAddress {0x%(stimulus_descriptor)04x}
+set_connection_parameter_value mm_bridge_0.m0/msgdma_stimulus_0.descriptor_slave defaultConnection {0}
+add_connection mm_bridge_0.m0 msgdma_response_0.csr
+set_connection_parameter_value mm_bridge_0.m0/msgdma_response_0.csr arbitrationPriority {1}
+set_connection_parameter_value mm_bridge_0.m0/msgdma_response_0.csr baseAddress {0x%(response_csr)04x}
+set_connection_parameter_value mm_bridge_0.m0/msgdma_response_0.csr defaultConnection {0}
+add_connection mm_bridge_0.m0 msgdma_response_0.descriptor_slave
+set_connection_parameter_value mm_bridge_0.m0/msgdma_response_0.descriptor_slave arbitrationPriority {1}
+set_connection_parameter_value mm_bridge_0.m0/msgdma_response_0.descriptor_slave baseAddress {0x%(response_descriptor)04x}
+set_connection_parameter_value mm_bridge_0.m0/msgdma_response_0.descriptor_slave defaultConnection {0}
+'''
+
+# the stream adapter between the msgdma streams and the design, fill them with
+# % {'width': width, 'msb': width - 1, 'symbols': width // 8,
+#    'stimulus_words': stimulus_words, 'stimulus_word_width': stimulus_word_width, 'stimulus_width': width * stimulus_words, 'stimulus_msb': width * stimulus_words - 1,
+#    'response_words': response_words, 'response_word_width': response_word_width, 'response_width': width * response_words, 'response_msb': width * response_words - 1}
+STREAM_ADAPTER_HW_TCL = r'''
+package require -exact qsys 16.1
+
+set_module_property DESCRIPTION ""
+set_module_property NAME stream_adapter
+set_module_property VERSION 1.0
+set_module_property INTERNAL false
+set_module_property OPAQUE_ADDRESS_MAP true
+set_module_property AUTHOR ""
+set_module_property DISPLAY_NAME "Stream Adapter %(width)d bit"
+set_module_property INSTANTIATE_IN_SYSTEM_MODULE true
+set_module_property EDITABLE true
+set_module_property REPORT_TO_TALKBACK false
+set_module_property ALLOW_GREYBOX_GENERATION false
+set_module_property REPORT_HIERARCHY false
+
+add_fileset QUARTUS_SYNTH QUARTUS_SYNTH "" ""
+set_fileset_property QUARTUS_SYNTH TOP_LEVEL stream_adapter
+set_fileset_property QUARTUS_SYNTH ENABLE_RELATIVE_INCLUDE_PATHS false
+set_fileset_property QUARTUS_SYNTH ENABLE_FILE_OVERWRITE_MODE false
+add_fileset_file stream_adapter.sv SYSTEM_VERILOG PATH ip/stream_adapter/stream_adapter.sv TOP_LEVEL_FILE
+
+add_interface clock clock end
+set_interface_property clock clockRate 0
+set_interface_property clock ENABLED true
+set_interface_property clock EXPORT_OF ""
+set_interface_property clock PORT_NAME_MAP ""
+set_interface_property clock CMSIS_SVD_VARIABLES ""
+set_interface_property clock SVD_ADDRESS_GROUP ""
+
+add_interface_port clock clk clk Input 1
+
+add_interface reset reset end
+set_interface_property reset associatedClock clock
+set_interface_property reset synchronousEdges DEASSERT
+set_interface_property reset ENABLED true
+set_interface_property reset EXPORT_OF ""
+set_interface_property reset PORT_NAME_MAP ""
+set_interface_property reset CMSIS_SVD_VARIABLES ""
+set_interface_property reset SVD_ADDRESS_GROUP ""
+
+add_interface_port reset reset reset Input 1
+
+add_interface csr avalon end
+set_interface_property csr addressUnits WORDS
+set_interface_property csr associatedClock clock
+set_interface_property csr associatedReset reset
+set_interface_property csr bitsPerSymbol 8
+set_interface_property csr burstOnBurstBoundariesOnly false
+set_interface_property csr burstcountUnits WORDS
+set_interface_property csr explicitAddressSpan 0
+set_interface_property csr holdTime 0
+set_interface_property csr linewrapBursts false
+set_interface_property csr maximumPendingReadTransactions 0
+set_interface_property csr maximumPendingWriteTransactions 0
+set_interface_property csr readLatency 0
+set_interface_property csr readWaitTime 1
+set_interface_property csr setupTime 0
+set_interface_property csr timingUnits Cycles
+set_interface_property csr writeWaitTime 0
+set_interface_property csr ENABLED true
+set_interface_property csr EXPORT_OF ""
+set_interface_property csr PORT_NAME_MAP ""
+set_interface_property csr CMSIS_SVD_VARIABLES ""
+set_interface_property csr SVD_ADDRESS_GROUP ""
+
+add_interface_port csr avs_csr_address address Input 2
+add_interface_port csr avs_csr_read read Input 1
+add_interface_port csr avs_csr_readdata readdata Output %(width)d
+add_interface_port csr avs_csr_write write Input 1
+add_interface_port csr avs_csr_writedata writedata Input %(width)d
+set_interface_assignment csr embeddedsw.configuration.isFlash 0
+set_interface_assignment csr embeddedsw.configuration.isMemoryDevice 0
+set_interface_assignment csr embeddedsw.configuration.isNonVolatileStorage 0
+set_interface_assignment csr embeddedsw.configuration.isPrintableDevice 0
+
+add_interface st_sink avalon_streaming end
+set_interface_property st_sink associatedClock clock
+set_interface_property st_sink associatedReset reset
+set_interface_property st_sink dataBitsPerSymbol 8
+set_interface_property st_sink errorDescriptor ""
+set_interface_property st_sink firstSymbolInHighOrderBits true
+set_interface_property st_sink maxChannel 0
+set_interface_property st_sink readyLatency 0
+set_interface_property st_sink ENABLED true
+set_interface_property st_sink EXPORT_OF ""
+set_interface_property st_sink PORT_NAME_MAP ""
+set_interface_property st_sink CMSIS_SVD_VARIABLES ""
+set_interface_property st_sink SVD_ADDRESS_GROUP ""
+
+add_interface_port st_sink asi_st_sink_data data Input %(width)d
+add_interface_port st_sink asi_st_sink_valid valid Input 1
+add_interface_port st_sink asi_st_sink_ready ready Output 1
+
+add_interface st_source avalon_streaming start
+set_interface_property st_source associatedClock clock
+set_interface_property st_source associatedReset reset
+set_interface_property st_source dataBitsPerSymbol 8
+set_interface_property st_source errorDescriptor ""
+set_interface_property st_source firstSymbolInHighOrderBits true
+set_interface_property st_source maxChannel 0
+set_interface_property st_source readyLatency 0
+set_interface_property st_source ENABLED true
+set_interface_property st_source EXPORT_OF ""
+set_interface_property st_source PORT_NAME_MAP ""
+set_interface_property st_source CMSIS_SVD_VARIABLES ""
+set_interface_property st_source SVD_ADDRESS_GROUP ""
+
+add_interface_port st_source aso_st_source_data data Output %(width)d
+add_interface_port st_source aso_st_source_valid valid Output 1
+add_interface_port st_source aso_st_source_ready ready Input 1
+
+add_interface stream_adapter conduit end
+set_interface_property stream_adapter associatedClock clock
+set_interface_property stream_adapter associatedReset reset
+set_interface_property stream_adapter ENABLED true
+set_interface_property stream_adapter EXPORT_OF ""
+set_interface_property stream_adapter PORT_NAME_MAP ""
+set_interface_property stream_adapter CMSIS_SVD_VARIABLES ""
+set_interface_property stream_adapter SVD_ADDRESS_GROUP ""
+
+add_interface_port stream_adapter active active Output 1
+add_interface_port stream_adapter stimulus stimulus Output %(stimulus_width)d
+add_interface_port stream_adapter response response Input %(response_width)d
+'''
+
+# writen in sv
+# csr word 0: bit 0 enables the adapter, the design is driven by the stimulus stream while it is set, writing it restarts the adapter
+# csr word 1: the capture delay, the number of clock cycles between applying a vector and capturing its response (0 - 15)
+# csr word 2: the number of vectors done since the adapter is enabled
+# a vector is stimulus words beats of the stimulus stream and its response is response words beats of the response stream, the same layout as the memories of the vector sequencer
+STREAM_ADAPTER_HDL_SV = r'''
+module stream_adapter (
+  input logic clk,
+  input logic reset,
+
+  input logic [1:0] avs_csr_address,
+  input logic avs_csr_read,
+  output logic [%(msb)d:0] avs_csr_readdata,
+  input logic avs_csr_write,
+  input logic [%(msb)d:0] avs_csr_writedata,
+
+  input logic [%(msb)d:0] asi_st_sink_data,
+  input logic asi_st_sink_valid,
+  output logic asi_st_sink_ready,
+
+  output logic [%(msb)d:0] aso_st_source_data,
+  output logic aso_st_source_valid,
+  input logic aso_st_source_ready,
+
+  output logic active,
+  output logic [%(stimulus_msb)d:0] stimulus,
+  input logic [%(response_msb)d:0] response
+);
+
+typedef enum logic [1:0] {LOAD, WAIT, SEND} state_t;
+state_t state;
+logic enable;
+logic [3:0] capture_delay;
+logic [3:0] delay_count;
+logic [31:0] vector_count;
+logic [%(stimulus_word_width)d - 1:0] load_word;
+logic [%(response_word_width)d - 1:0] send_word;
+logic [%(stimulus_msb)d:0] load_buffer;
+logic [%(stimulus_msb)d:0] loaded;
+logic [%(response_msb)d:0] response_buffer;
+logic [%(msb)d:0] sink_word;
+
+// the first symbol of a beat is in the high order bits, the words in the memory are little endian
+assign sink_word = {<<8{asi_st_sink_data}};
+assign aso_st_source_data = {<<8{response_buffer[send_word * %(width)d +: %(width)d]}};
+assign asi_st_sink_ready = enable && (state == LOAD);
+assign aso_st_source_valid = (state == SEND);
+assign active = enable;
+
+always_comb begin
+  loaded = load_buffer;
+  loaded[load_word * %(width)d +: %(width)d] = sink_word;
+end
+
+always_ff @ (posedge clk) begin
+  if (reset) begin
+    state <= LOAD;
+    enable <= 1'b0;
+    capture_delay <= 4'd1;
+    delay_count <= '0;
+    vector_count <= '0;
+    load_word <= '0;
+    send_word <= '0;
+    load_buffer <= '0;
+    response_buffer <= '0;
+    stimulus <= '0;
+  end else if (avs_csr_write && avs_csr_address == 2'd0) begin
+    enable <= avs_csr_writedata[0];
+    state <= LOAD;
+    vector_count <= '0;
+    load_word <= '0;
+  end else begin
+    if (avs_csr_write && avs_csr_address == 2'd1) begin
+      capture_delay <= avs_csr_writedata[3:0];
+    end
+    case (state)
+      LOAD: begin
+        if (asi_st_sink_valid && asi_st_sink_ready) begin
+          load_buffer <= loaded;
+          load_word <= load_word + 1'b1;
+          if (load_word == %(stimulus_words)d - 1) begin
+            stimulus <= loaded;
+            delay_count <= capture_delay;
+            state <= WAIT;
+          end
+        end
+      end
+      WAIT: begin
+        if (delay_count == 0) begin
+          response_buffer <= response;
+          send_word <= '0;
+          state <= SEND;
+        end else begin
+          delay_count <= delay_count - 1'b1;
+        end
+      end
+      default: begin
+        if (aso_st_source_ready) begin
+          send_word <= send_word + 1'b1;
+          if (send_word == %(response_words)d - 1) begin
+            vector_count <= vector_count + 1'b1;
+            state <= LOAD;
+          end
+        end
+      end
+    endcase
+  end
+end
+
+always_comb begin
+  avs_csr_readdata = '0;
+  case (avs_csr_address)
+    2'd0: avs_csr_readdata[0] = enable;
+    2'd1: avs_csr_readdata[3:0] = capture_delay;
+    default: avs_csr_readdata[31:0] = vector_count;
+  endcase
+end
+
+endmodule
+'''
+
+# the cycle counter, both slaves are 32 bit, reading the low word of a 64 bit counter latches its high word
+# free_running word 0: the low word of the free running cycle counter, word 1: the latched high word
+# latched word 0: write bit 0 to start (the counter is cleared) and bit 1 to stop, read bit 0 running
+# latched word 1: the low word of the cycles counted while running, word 2: the latched high word
+# the gate input starts the latched counter on its rising edge and stops it on its falling edge, so it counts the cycles gate is high
+CYCLE_COUNTER_HW_TCL = r'''
+package require -exact qsys 16.1
+
+set_module_property DESCRIPTION ""
+set_module_property NAME cycle_counter
+set_module_property VERSION 1.0
+set_module_property INTERNAL false
+set_module_property OPAQUE_ADDRESS_MAP true
+set_module_property AUTHOR ""
+set_module_property DISPLAY_NAME "Cycle Counter"
+set_module_property INSTANTIATE_IN_SYSTEM_MODULE true
+set_module_property EDITABLE true
+set_module_property REPORT_TO_TALKBACK false
+set_module_property ALLOW_GREYBOX_GENERATION false
+set_module_property REPORT_HIERARCHY false
+
+add_fileset QUARTUS_SYNTH QUARTUS_SYNTH "" ""
+set_fileset_property QUARTUS_SYNTH TOP_LEVEL cycle_counter
+set_fileset_property QUARTUS_SYNTH ENABLE_RELATIVE_INCLUDE_PATHS false
+set_fileset_property QUARTUS_SYNTH ENABLE_FILE_OVERWRITE_MODE false
+add_fileset_file cycle_counter.sv SYSTEM_VERILOG PATH ip/cycle_counter/cycle_counter.sv TOP_LEVEL_FILE
+
+add_interface clock clock end
+set_interface_property clock clockRate 0
+set_interface_property clock ENABLED true
+set_interface_property clock EXPORT_OF ""
+set_interface_property clock PORT_NAME_MAP ""
+set_interface_property clock CMSIS_SVD_VARIABLES ""
+set_interface_property clock SVD_ADDRESS_GROUP ""
+
+add_interface_port clock clk clk Input 1
+
+add_interface reset reset end
+set_interface_property reset associatedClock clock
+set_interface_property reset synchronousEdges DEASSERT
+set_interface_property reset ENABLED true
+set_interface_property reset EXPORT_OF ""
+set_interface_property reset PORT_NAME_MAP ""
+set_interface_property reset CMSIS_SVD_VARIABLES ""
+set_interface_property reset SVD_ADDRESS_GROUP ""
+
+add_interface_port reset reset reset Input 1
+
+add_interface free_running avalon end
+set_interface_property free_running addressUnits WORDS
+set_interface_property free_running associatedClock clock
+set_interface_property free_running associatedReset reset
+set_interface_property free_running bitsPerSymbol 8
+set_interface_property free_running burstOnBurstBoundariesOnly false
+set_interface_property free_running burstcountUnits WORDS
+set_interface_property free_running explicitAddressSpan 0
+set_interface_property free_running holdTime 0
+set_interface_property free_running linewrapBursts false
+set_interface_property free_running maximumPendingReadTransactions 0
+set_interface_property free_running maximumPendingWriteTransactions 0
+set_interface_property free_running readLatency 1
+set_interface_property free_running readWaitTime 0
+set_interface_property free_running setupTime 0
+set_interface_property free_running timingUnits Cycles
+set_interface_property free_running writeWaitTime 0
+set_interface_property free_running ENABLED true
+set_interface_property free_running EXPORT_OF ""
+set_interface_property free_running PORT_NAME_MAP ""
+set_interface_property free_running CMSIS_SVD_VARIABLES ""
+set_interface_property free_running SVD_ADDRESS_GROUP ""
+
+add_interface_port free_running avs_free_running_address address Input 1
+add_interface_port free_running avs_free_running_read read Input 1
+add_interface_port free_running avs_free_running_readdata readdata Output 32
+set_interface_assignment free_running embeddedsw.configuration.isFlash 0
+set_interface_assignment free_running embeddedsw.configuration.isMemoryDevice 0
+set_interface_assignment free_running embeddedsw.configuration.isNonVolatileStorage 0
+set_interface_assignment free_running embeddedsw.configuration.isPrintableDevice 0
+
+add_interface latched avalon end
+set_interface_property latched addressUnits WORDS
+set_interface_property latched associatedClock clock
+set_interface_property latched associatedReset reset
+set_interface_property latched bitsPerSymbol 8
+set_interface_property latched burstOnBurstBoundariesOnly false
+set_interface_property latched burstcountUnits WORDS
+set_interface_property latched explicitAddressSpan 0
+set_interface_property latched holdTime 0
+set_interface_property latched linewrapBursts false
+set_interface_property latched maximumPendingReadTransactions 0
+set_interface_property latched maximumPendingWriteTransactions 0
+set_interface_property latched readLatency 1
+set_interface_property latched readWaitTime 0
+set_interface_property latched setupTime 0
+set_interface_property latched timingUnits Cycles
+set_interface_property latched writeWaitTime 0
+set_interface_property latched ENABLED true
+set_interface_property latched EXPORT_OF ""
+set_interface_property latched PORT_NAME_MAP ""
+set_interface_property latched CMSIS_SVD_VARIABLES ""
+set_interface_property latched SVD_ADDRESS_GROUP ""
+
+add_interface_port latched avs_latched_address address Input 2
+add_interface_port latched avs_latched_read read Input 1
+add_interface_port latched avs_latched_readdata readdata Output 32
+add_interface_port latched avs_latched_write write Input 1
+add_interface_port latched avs_latched_writedata writedata Input 32
+set_interface_assignment latched embeddedsw.configuration.isFlash 0
+set_interface_assignment latched embeddedsw.configuration.isMemoryDevice 0
+set_interface_assignment latched embeddedsw.configuration.isNonVolatileStorage 0
+set_interface_assignment latched embeddedsw.configuration.isPrintableDevice 0
+
+add_interface cycle_counter conduit end
+set_interface_property cycle_counter associatedClock clock
+set_interface_property cycle_counter associatedReset reset
+set_interface_property cycle_counter ENABLED true
+set_interface_property cycle_counter EXPORT_OF ""
+set_interface_property cycle_counter PORT_NAME_MAP ""
+set_interface_property cycle_counter CMSIS_SVD_VARIABLES ""
+set_interface_property cycle_counter SVD_ADDRESS_GROUP ""
+
+add_interface_port cycle_counter gate gate Input 1
+'''
+
+# writen in sv
+CYCLE_COUNTER_HDL_SV = r'''
+module cycle_counter (
+  input logic clk,
+  input logic reset,
+
+  input logic avs_free_running_address,
+  input logic avs_free_running_read,
+  output logic [31:0] avs_free_running_readdata,
+
+  input logic [1:0] avs_latched_address,
+  input logic avs_latched_read,
+  output logic [31:0] avs_latched_readdata,
+  input logic avs_latched_write,
+  input logic [31:0] avs_latched_writedata,
+
+  input logic gate
+);
+
+logic [63:0] cycles;
+logic [31:0] cycles_high;
+logic [63:0] elapsed;
+logic [31:0] elapsed_high;
+logic running;
+logic gate_q;
+logic start;
+logic stop;
+
+assign start = (avs_latched_write && avs_latched_address == 2'd0 && avs_latched_writedata[0]) || (gate && !gate_q);
+assign stop = (avs_latched_write && avs_latched_address == 2'd0 && avs_latched_writedata[1]) || (!gate && gate_q);
+
+always_ff @ (posedge clk) begin
+  if (reset) begin
+    cycles <= '0;
+    cycles_high <= '0;
+    elapsed <= '0;
+    elapsed_high <= '0;
+    running <= 1'b0;
+    gate_q <= 1'b0;
+    avs_free_running_readdata <= '0;
+    avs_latched_readdata <= '0;
+  end else begin
+    cycles <= cycles + 1'b1;
+    gate_q <= gate;
+    if (start) begin
+      running <= 1'b1;
+      elapsed <= '0;
+    end else if (stop) begin
+      running <= 1'b0;
+    end else if (running) begin
+      elapsed <= elapsed + 1'b1;
+    end
+
+    // reading the low word latches the high word, so the 64 bit value is read without tearing
+    if (avs_free_running_read) begin
+      if (avs_free_running_address == 1'b0) begin
+        avs_free_running_readdata <= cycles[31:0];
+        cycles_high <= cycles[63:32];
+      end else begin
+        avs_free_running_readdata <= cycles_high;
+      end
+    end
+    if (avs_latched_read) begin
+      case (avs_latched_address)
+        2'd0: avs_latched_readdata <= {31'd0, running};
+        2'd1: begin
+          avs_latched_readdata <= elapsed[31:0];
+          elapsed_high <= elapsed[63:32];
+        end
+        2'd2: avs_latched_readdata <= elapsed_high;
+        default: avs_latched_readdata <= '0;
+      endcase
+    end
+  end
+end
+
+endmodule
+'''
+
+# the interrupt-capable input pio, the irq inputs are the design outputs marked as irq, fill them with % {'irq_width': irq_width, 'irq_msb': irq_width - 1}
+# word 0: the irq inputs, word 1: the interrupt mask, word 2: the edge capture, bit i is set by a rising edge of irq input i and cleared by writing 1 to it
+# the interrupt is asserted while a captured edge is not masked
+PIO_IRQ_HW_TCL = r'''
+package require -exact qsys 16.1
+
+set_module_property DESCRIPTION ""
+set_module_property NAME pio_irq
+set_module_property VERSION 1.0
+set_module_property INTERNAL false
+set_module_property OPAQUE_ADDRESS_MAP true
+set_module_property AUTHOR ""
+set_module_property DISPLAY_NAME "Parallel IO %(irq_width)d bit Interrupt"
+set_module_property INSTANTIATE_IN_SYSTEM_MODULE true
+set_module_property EDITABLE true
+set_module_property REPORT_TO_TALKBACK false
+set_module_property ALLOW_GREYBOX_GENERATION false
+set_module_property REPORT_HIERARCHY false
+
+add_fileset QUARTUS_SYNTH QUARTUS_SYNTH "" ""
+set_fileset_property QUARTUS_SYNTH TOP_LEVEL pio_irq
+set_fileset_property QUARTUS_SYNTH ENABLE_RELATIVE_INCLUDE_PATHS false
+set_fileset_property QUARTUS_SYNTH ENABLE_FILE_OVERWRITE_MODE false
+add_fileset_file pio_irq.sv SYSTEM_VERILOG PATH ip/pio_irq/pio_irq.sv TOP_LEVEL_FILE
+
+add_interface clock clock end
+set_interface_property clock clockRate 0
+set_interface_property clock ENABLED true
+set_interface_property clock EXPORT_OF ""
+set_interface_property clock PORT_NAME_MAP ""
+set_interface_property clock CMSIS_SVD_VARIABLES ""
+set_interface_property clock SVD_ADDRESS_GROUP ""
+
+add_interface_port clock clk clk Input 1
+
+add_interface reset reset end
+set_interface_property reset associatedClock clock
+set_interface_property reset synchronousEdges DEASSERT
+set_interface_property reset ENABLED true
+set_interface_property reset EXPORT_OF ""
+set_interface_property reset PORT_NAME_MAP ""
+set_interface_property reset CMSIS_SVD_VARIABLES ""
+set_interface_property reset SVD_ADDRESS_GROUP ""
+
+add_interface_port reset reset reset Input 1
+
+add_interface s0 avalon end
+set_interface_property s0 addressUnits WORDS
+set_interface_property s0 associatedClock clock
+set_interface_property s0 associatedReset reset
+set_interface_property s0 bitsPerSymbol 8
+set_interface_property s0 burstOnBurstBoundariesOnly false
+set_interface_property s0 burstcountUnits WORDS
+set_interface_property s0 explicitAddressSpan 0
+set_interface_property s0 holdTime 0
+set_interface_property s0 linewrapBursts false
+set_interface_property s0 maximumPendingReadTransactions 0
+set_interface_property s0 maximumPendingWriteTransactions 0
+set_interface_property s0 readLatency 1
+set_interface_property s0 readWaitTime 0
+set_interface_property s0 setupTime 0
+set_interface_property s0 timingUnits Cycles
+set_interface_property s0 writeWaitTime 0
+set_interface_property s0 ENABLED true
+set_interface_property s0 EXPORT_OF ""
+set_interface_property s0 PORT_NAME_MAP ""
+set_interface_property s0 CMSIS_SVD_VARIABLES ""
+set_interface_property s0 SVD_ADDRESS_GROUP ""
+
+add_interface_port s0 avs_s0_address address Input 2
+add_interface_port s0 avs_s0_read read Input 1
+add_interface_port s0 avs_s0_readdata readdata Output 32
+add_interface_port s0 avs_s0_write write Input 1
+add_interface_port s0 avs_s0_writedata writedata Input 32
+set_interface_assignment s0 embeddedsw.configuration.isFlash 0
+set_interface_assignment s0 embeddedsw.configuration.isMemoryDevice 0
+set_interface_assignment s0 embeddedsw.configuration.isNonVolatileStorage 0
+set_interface_assignment s0 embeddedsw.configuration.isPrintableDevice 0
+
+add_interface irq interrupt end
+set_interface_property irq associatedAddressablePoint s0
+set_interface_property irq associatedClock clock
+set_interface_property irq associatedReset reset
+set_interface_property irq bridgedReceiverOffset ""
+set_interface_property irq bridgesToReceiver ""
+set_interface_property irq ENABLED true
+set_interface_property irq EXPORT_OF ""
+set_interface_property irq PORT_NAME_MAP ""
+set_interface_property irq CMSIS_SVD_VARIABLES ""
+set_interface_property irq SVD_ADDRESS_GROUP ""
+
+add_interface_port irq ins_irq0_irq irq Output 1
+
+add_interface pio_irq conduit end
+set_interface_property pio_irq associatedClock clock
+set_interface_property pio_irq associatedReset reset
+set_interface_property pio_irq ENABLED true
+set_interface_property pio_irq EXPORT_OF ""
+set_interface_property pio_irq PORT_NAME_MAP ""
+set_interface_property pio_irq CMSIS_SVD_VARIABLES ""
+set_interface_property pio_irq SVD_ADDRESS_GROUP ""
+
+add_interface_port pio_irq irq_in irq_in Input %(irq_width)d
+'''
+
+# writen in sv
+PIO_IRQ_HDL_SV = r'''
+module pio_irq (
+  input logic clk,
+  input logic reset,
+
+  input logic [1:0] avs_s0_address,
+  input logic avs_s0_read,
+  output logic [31:0] avs_s0_readdata,
+  input logic avs_s0_write,
+  input logic [31:0] avs_s0_writedata,
+
+  output logic ins_irq0_irq,
+
+  input logic [%(irq_msb)d:0] irq_in
+);
+
+logic [%(irq_msb)d:0] irq_in_q;
+logic [%(irq_msb)d:0] irq_mask;
+logic [%(irq_msb)d:0] edge_capture;
+
+assign ins_irq0_irq = |(edge_capture & irq_mask);
+
+always_ff @ (posedge clk) begin
+  if (reset) begin
+    irq_in_q <= '0;
+    irq_mask <= '0;
+    edge_capture <= '0;
+    avs_s0_readdata <= '0;
+  end else begin
+    irq_in_q <= irq_in;
+    // a rising edge sets the bit, writing 1 clears it, an edge in the same cycle wins
+    if (avs_s0_write && avs_s0_address == 2'd2) begin
+      edge_capture <= (edge_capture & ~avs_s0_writedata[%(irq_msb)d:0]) | (irq_in & ~irq_in_q);
+    end else begin
+      edge_capture <= edge_capture | (irq_in & ~irq_in_q);
+    end
+    if (avs_s0_write && avs_s0_address == 2'd1) begin
+      irq_mask <= avs_s0_writedata[%(irq_msb)d:0];
+    end
+    if (avs_s0_read) begin
+      case (avs_s0_address)
+        2'd0: avs_s0_readdata <= 32'(irq_in);
+        2'd1: avs_s0_readdata <= 32'(irq_mask);
+        2'd2: avs_s0_readdata <= 32'(edge_capture);
+        default: avs_s0_readdata <= '0;
+      endcase
+    end
+  end
+end
+
+endmodule
+'''
+
+# the interrupt of the pio_irq core goes to the FPGA-to-HPS interrupt port of hps_0, fill it with % {'instance': instance name, 'irq_number': irq number}
+QSYS_TCL_IRQ = r'''
+set_instance_parameter_value hps_0 {F2SINTERRUPT_Enable} {1}
+add_connection hps_0.f2h_irq0 %(instance)s.irq
+set_connection_parameter_value hps_0.f2h_irq0/%(instance)s.irq irqNumber {%(irq_number)d}
+'''
+
+# the commit and snapshot strobes of the double-buffered pios, the slave is 32 bit and write only
+# word 0: write bit 0 to commit the staged words of the output pios, bit 1 to snapshot the input pios, both in one write commits first
+# the strobes are high for one cycle, the snapshot is delayed by snapshot_delay cycles (the multicycle of the pio paths), so a snapshot in the same write as a commit sees the settled design outputs
+# fill them with % {'snapshot_delay': snapshot_delay}, PIO_SYNC_HW_TCL has no placeholder
+PIO_SYNC_HW_TCL = r'''
+package require -exact qsys 16.1
+
+set_module_property DESCRIPTION ""
+set_module_property NAME pio_sync
+set_module_property VERSION 1.0
+set_module_property INTERNAL false
+set_module_property OPAQUE_ADDRESS_MAP true
+set_module_property AUTHOR ""
+set_module_property DISPLAY_NAME "Parallel IO Commit and Snapshot"
+set_module_property INSTANTIATE_IN_SYSTEM_MODULE true
+set_module_property EDITABLE true
+set_module_property REPORT_TO_TALKBACK false
+set_module_property ALLOW_GREYBOX_GENERATION false
+set_module_property REPORT_HIERARCHY false
+
+add_fileset QUARTUS_SYNTH QUARTUS_SYNTH "" ""
+set_fileset_property QUARTUS_SYNTH TOP_LEVEL pio_sync
+set_fileset_property QUARTUS_SYNTH ENABLE_RELATIVE_INCLUDE_PATHS false
+set_fileset_property QUARTUS_SYNTH ENABLE_FILE_OVERWRITE_MODE false
+add_fileset_file pio_sync.sv SYSTEM_VERILOG PATH ip/pio_sync/pio_sync.sv TOP_LEVEL_FILE
+
+add_interface clock clock end
+set_interface_property clock clockRate 0
+set_interface_property clock ENABLED true
+set_interface_property clock EXPORT_OF ""
+set_interface_property clock PORT_NAME_MAP ""
+set_interface_property clock CMSIS_SVD_VARIABLES ""
+set_interface_property clock SVD_ADDRESS_GROUP ""
+
+add_interface_port clock clk clk Input 1
+
+add_interface reset reset end
+set_interface_property reset associatedClock clock
+set_interface_property reset synchronousEdges DEASSERT
+set_interface_property reset ENABLED true
+set_interface_property reset EXPORT_OF ""
+set_interface_property reset PORT_NAME_MAP ""
+set_interface_property reset CMSIS_SVD_VARIABLES ""
+set_interface_property reset SVD_ADDRESS_GROUP ""
+
+add_interface_port reset reset reset Input 1
+
+add_interface s0 avalon end
+set_interface_property s0 addressUnits WORDS
+set_interface_property s0 associatedClock clock
+set_interface_property s0 associatedReset reset
+set_interface_property s0 bitsPerSymbol 8
+set_interface_property s0 burstOnBurstBoundariesOnly false
+set_interface_property s0 burstcountUnits WORDS
+set_interface_property s0 explicitAddressSpan 0
+set_interface_property s0 holdTime 0
+set_interface_property s0 linewrapBursts false
+set_interface_property s0 maximumPendingReadTransactions 0
+set_interface_property s0 maximumPendingWriteTransactions 0
+set_interface_property s0 readLatency 0
+set_interface_property s0 readWaitTime 1
+set_interface_property s0 setupTime 0
+set_interface_property s0 timingUnits Cycles
+set_interface_property s0 writeWaitTime 0
+set_interface_property s0 ENABLED true
+set_interface_property s0 EXPORT_OF ""
+set_interface_property s0 PORT_NAME_MAP ""
+set_interface_property s0 CMSIS_SVD_VARIABLES ""
+set_interface_property s0 SVD_ADDRESS_GROUP ""
+
+add_interface_port s0 avs_s0_write write Input 1
+add_interface_port s0 avs_s0_writedata writedata Input 32
+set_interface_assignment s0 embeddedsw.configuration.isFlash 0
+set_interface_assignment s0 embeddedsw.configuration.isMemoryDevice 0
+set_interface_assignment s0 embeddedsw.configuration.isNonVolatileStorage 0
+set_interface_assignment s0 embeddedsw.configuration.isPrintableDevice 0
+
+add_interface pio_sync conduit end
+set_interface_property pio_sync associatedClock clock
+set_interface_property pio_sync associatedReset reset
+set_interface_property pio_sync ENABLED true
+set_interface_property pio_sync EXPORT_OF ""
+set_interface_property pio_sync PORT_NAME_MAP ""
+set_interface_property pio_sync CMSIS_SVD_VARIABLES ""
+set_interface_property pio_sync SVD_ADDRESS_GROUP ""
+
+add_interface_port pio_sync commit commit Output 1
+add_interface_port pio_sync snapshot snapshot Output 1
+'''
+
+# writen in sv
+PIO_SYNC_HDL_SV = r'''
+module pio_sync (
+  input logic clk,
+  input logic reset,
+
+  input logic avs_s0_write,
+  input logic [31:0] avs_s0_writedata,
+
+  output logic commit,
+  output logic snapshot
+);
+
+// the written snapshot bit, shifted by one stage every cycle
+logic [%(snapshot_delay)d:0] snapshot_pending;
+
+always_ff @ (posedge clk) begin
+  if (reset) begin
+    commit <= 1'b0;
+    snapshot_pending <= '0;
+  end else begin
+    commit <= avs_s0_write & avs_s0_writedata[0];
+    snapshot_pending <= {snapshot_pending[%(snapshot_delay)d - 1:0], avs_s0_write & avs_s0_writedata[1]};
+  end
+end
+
+assign snapshot = snapshot_pending[%(snapshot_delay)d];
+
+endmodule
+'''
+
+# the clock control of the design, the design is clocked by dut_clk, the clock of the system gated by the clock enable, the slave is 32 bit
+# word 0: write bit 0 to free-run (1) or pause (0) the design, writing it cancels a step, read bit 0 free-running and bit 1 stepping
+# word 1: write N to advance the design exactly N cycles (from a pause), read the remaining cycles of the step
+# dut_clk is the output of a clock control block of the Cyclone V (cyclonev_clkena, the primitive ALTCLKCTRL instantiates), so it is on a global clock network,
+# the block registers the clock enable on the falling edge of the clock, so dut_clk has no glitch, the sdc has a generated clock at its output
+# the design free-runs after reset, as if it was clocked by the clock of the system
+CLOCK_CONTROL_HW_TCL = r'''
+package require -exact qsys 16.1
+
+set_module_property DESCRIPTION ""
+set_module_property NAME clock_control
+set_module_property VERSION 1.0
+set_module_property INTERNAL false
+set_module_property OPAQUE_ADDRESS_MAP true
+set_module_property AUTHOR ""
+set_module_property DISPLAY_NAME "Design Clock Control"
+set_module_property INSTANTIATE_IN_SYSTEM_MODULE true
+set_module_property EDITABLE true
+set_module_property REPORT_TO_TALKBACK false
+set_module_property ALLOW_GREYBOX_GENERATION false
+set_module_property REPORT_HIERARCHY false
+
+add_fileset QUARTUS_SYNTH QUARTUS_SYNTH "" ""
+set_fileset_property QUARTUS_SYNTH TOP_LEVEL clock_control
+set_fileset_property QUARTUS_SYNTH ENABLE_RELATIVE_INCLUDE_PATHS false
+set_fileset_property QUARTUS_SYNTH ENABLE_FILE_OVERWRITE_MODE false
+add_fileset_file clock_control.sv SYSTEM_VERILOG PATH ip/clock_control/clock_control.sv TOP_LEVEL_FILE
+
+add_interface clock clock end
+set_interface_property clock clockRate 0
+set_interface_property clock ENABLED true
+set_interface_property clock EXPORT_OF ""
+set_interface_property clock PORT_NAME_MAP ""
+set_interface_property clock CMSIS_SVD_VARIABLES ""
+set_interface_property clock SVD_ADDRESS_GROUP ""
+
+add_interface_port clock clk clk Input 1
+
+add_interface reset reset end
+set_interface_property reset associatedClock clock
+set_interface_property reset synchronousEdges DEASSERT
+set_interface_property reset ENABLED true
+set_interface_property reset EXPORT_OF ""
+set_interface_property reset PORT_NAME_MAP ""
+set_interface_property reset CMSIS_SVD_VARIABLES ""
+set_interface_property reset SVD_ADDRESS_GROUP ""
+
+add_interface_port reset reset reset Input 1
+
+add_interface s0 avalon end
+set_interface_property s0 addressUnits WORDS
+set_interface_property s0 associatedClock clock
+set_interface_property s0 associatedReset reset
+set_interface_property s0 bitsPerSymbol 8
+set_interface_property s0 burstOnBurstBoundariesOnly false
+set_interface_property s0 burstcountUnits WORDS
+set_interface_property s0 explicitAddressSpan 0
+set_interface_property s0 holdTime 0
+set_interface_property s0 linewrapBursts false
+set_interface_property s0 maximumPendingReadTransactions 0
+set_interface_property s0 maximumPendingWriteTransactions 0
+set_interface_property s0 readLatency 1
+set_interface_property s0 readWaitTime 0
+set_interface_property s0 setupTime 0
+set_interface_property s0 timingUnits Cycles
+set_interface_property s0 writeWaitTime 0
+set_interface_property s0 ENABLED true
+set_interface_property s0 EXPORT_OF ""
+set_interface_property s0 PORT_NAME_MAP ""
+set_interface_property s0 CMSIS_SVD_VARIABLES ""
+set_interface_property s0 SVD_ADDRESS_GROUP ""
+
+add_interface_port s0 avs_s0_address address Input 1
+add_interface_port s0 avs_s0_read read Input 1
+add_interface_port s0 avs_s0_readdata readdata Output 32
+add_interface_port s0 avs_s0_write write Input 1
+add_interface_port s0 avs_s0_writedata writedata Input 32
+set_interface_assignment s0 embeddedsw.configuration.isFlash 0
+set_interface_assignment s0 embeddedsw.configuration.isMemoryDevice 0
+set_interface_assignment s0 embeddedsw.configuration.isNonVolatileStorage 0
+set_interface_assignment s0 embeddedsw.configuration.isPrintableDevice 0
+
+add_interface clock_control conduit end
+set_interface_property clock_control associatedClock clock
+set_interface_property clock_control associatedReset reset
+set_interface_property clock_control ENABLED true
+set_interface_property clock_control EXPORT_OF ""
+set_interface_property clock_control PORT_NAME_MAP ""
+set_interface_property clock_control CMSIS_SVD_VARIABLES ""
+set_interface_property clock_control SVD_ADDRESS_GROUP ""
+
+add_interface_port clock_control dut_clk dut_clk Output 1
+'''
+
+# writen in sv
+CLOCK_CONTROL_HDL_SV = r'''
+module clock_control (
+  input logic clk,
+  input logic reset,
+
+  input logic avs_s0_address,
+  input logic avs_s0_read,
+  output logic [31:0] avs_s0_readdata,
+  input logic avs_s0_write,
+  input logic [31:0] avs_s0_writedata,
+
+  output logic dut_clk
+);
+
+logic free_running;
+logic [31:0] step_count;
+logic clock_enable;
+
+// a cycle of the design is a cycle of clk with clock_enable high, a step counts down one cycle each
+assign clock_enable = free_running | (step_count != '0);
+
+always_ff @ (posedge clk) begin
+  if (reset) begin
+    free_running <= 1'b1;
+    step_count <= '0;
+    avs_s0_readdata <= '0;
+  end else begin
+    if (avs_s0_write && avs_s0_address == 1'b0) begin
+      free_running <= avs_s0_writedata[0];
+      step_count <= '0;
+    end else if (avs_s0_write && avs_s0_address == 1'b1) begin
+      free_running <= 1'b0;
+      step_count <= avs_s0_writedata;
+    end else if (!free_running && step_count != '0) begin
+      step_count <= step_count - 1'b1;
+    end
+    if (avs_s0_read) begin
+      case (avs_s0_address)
+        1'b0: avs_s0_readdata <= {30'b0, step_count != '0, free_running};
+        default: avs_s0_readdata <= step_count;
+      endcase
+    end
+  end
+end
+
+// the clock gate, a clock control block of the device instead of fabric logic, the enable is registered on the falling edge of clk
+cyclonev_clkena #(
+  .clock_type("Global Clock"),
+  .ena_register_mode("falling edge"),
+  .lpm_type("cyclonev_clkena")
+) dut_clock_gate (
+  .inclk(clk),
+  .ena(clock_enable),
+  .outclk(dut_clk),
+  .enaout()
+);
+
+endmodule
+'''
+
+# the fixed 64 bit pios
+PIO64_OUT_HW_TCL = PIO_OUT_HW_TCL % {'width': 64, 'msb': 63, 'bytes': 8, 'byteenable_msb': 7, 'readback_ports': '', 'sync_port': ''}
+PIO64_IN_HW_TCL = PIO_IN_HW_TCL % {'width': 64, 'msb': 63, 'read_latency': 0, 'read_wait_time': 1, 'sync_port': ''}
+PIO64_OUT_HDL_SV = PIO_OUT_HDL_SV % {'width': 64, 'msb': 63, 'bytes': 8, 'byteenable_msb': 7}
+PIO64_IN_HDL_SV = PIO_IN_HDL_SV % {'width': 64, 'msb': 63}
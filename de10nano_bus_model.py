@@ -0,0 +1,192 @@
+'''
+de10nano_bus_model module, a stand-in of the generated soc system for testing the host and the board software without a DE10 Nano
+
+LOG: if this value is True, the log will printed in the console. if you don't want those logs bother you, you can set it as False
+
+BusModel: the pio registers at the addresses of the manifest, a clocked behaviour model of the design behind them and the free running cycle counter,
+          it has the write_lanes(), read_lanes() and write_register() of de10nano_runtime.Bridge, so a Runtime runs on it unchanged
+DutModel: the behaviour model of the design, subclass it, or wrap a function of the inputs with FunctionModel
+
+Example:
+    manifest = load_binary_manifest('soc_system.bin')
+    runtime = Runtime(manifest, BusModel(manifest, FunctionModel(lambda inputs: {'sum': inputs['a'] + inputs['b']})))
+    failed_steps, response_lanes = runtime.run_testbench(load_testbench())
+'''
+
+
+
+
+
+import numpy as np
+from de10nano_runtime import LANE_WIDTH, PIO_SYNC_COMMIT, PIO_SYNC_SNAPSHOT, Runtime
+
+
+
+
+
+LOG = True
+
+
+
+
+
+def print_log(str):
+    '''
+    Set the LOG for False, you will not see the 'INFO' in the console
+    '''
+    if LOG:
+        print(str)
+
+
+
+
+
+class DutModel:
+    '''
+    The behaviour model of the design, clocked by BusModel. The values of the ports are python ints by port name.
+    clock() gets the values of the design inputs in this cycle and returns the values of the design outputs after the clock edge, a missing output is 0.
+    The base model has no output, a registered design keeps its registers in the subclass and clears them in reset().
+    '''
+    def reset(self):
+        pass
+
+    def clock(self, inputs):
+        return dict()
+
+
+
+
+
+class FunctionModel(DutModel):
+    '''
+    The behaviour model of a combinational design, function gets the dict of the input values and returns the dict of the output values.
+    '''
+    def __init__(self, function):
+        self.function = function
+
+    def clock(self, inputs):
+        return self.function(inputs)
+
+
+
+
+
+class BusModel:
+    '''
+    The model of the soc system behind mm_bridge_0: words is the uint64 array of the bridge window, the same as the words of de10nano_runtime.Bridge.
+    A write to the output pio lanes updates the design inputs, every bridge transaction (a lane written or read) takes cycles_per_access clock cycles of the design,
+    and the design outputs of the last cycle are in the input pio lanes when they are read.
+    cycles counts the clock cycles, it is in the free running cycle counter lane as well if the manifest has a cycle counter. writes and reads count the transactions.
+    If the manifest has a pio_sync (double-buffered pios), the written lanes reach the design inputs only when they are committed, and the input pio lanes hold the design outputs of the last snapshot.
+    '''
+    def __init__(self, manifest, dut = None, cycles_per_access = 1):
+        self.manifest = manifest
+        self.dut = dut or DutModel()
+        self.cycles_per_access = cycles_per_access
+        self.words = np.zeros(manifest.span() // (LANE_WIDTH // 8), dtype=np.uint64)
+        # the ports are packed and unpacked the same way as on the board
+        self.runtime = Runtime(manifest, self)
+        # the bits of each word driven by the input pios, a lane may hold an output pio and an input pio (32 bit pios), a write keeps these bits
+        self.in_masks = np.zeros(len(self.words), dtype=np.uint64)
+        for port in manifest.ports.values():
+            if port.mode == 'in':
+                for column, lane_lsb, port_lane, port_shift, mask in port.fragments:
+                    self.in_masks[manifest.in_lane_indexes[column]] |= mask << lane_lsb
+        # the free running slave of the cycle counter is its first slave, its two 32 bit words are one 64 bit lane
+        counter = manifest.cores.get('cycle_counter')
+        self.counter_index = None if counter is None else counter[1] // (LANE_WIDTH // 8)
+        self.atomic = manifest.pio_sync is not None
+        self.reset()
+
+    def reset(self):
+        '''
+        Clears the pio registers, the counters and the design model
+        '''
+        self.words[:] = 0
+        self.cycles = 0
+        self.writes = 0
+        self.reads = 0
+        self.dut.reset()
+        self.inputs = self.unpack_ports(self.words[self.manifest.out_lane_indexes], 'out')
+        self.outputs = dict()
+
+    def unpack_ports(self, lanes, mode):
+        '''
+        Unpacks one vector of lanes into the dict of the port values (python ints)
+        '''
+        values = dict()
+        for name, value in self.runtime.unpack(lanes, mode).items():
+            if value.ndim == 1:
+                values[name] = int(value[0])
+            else:
+                values[name] = sum(int(lane) << (LANE_WIDTH * index) for index, lane in enumerate(value[0]))
+        return values
+
+    def pack_ports(self, values, mode):
+        '''
+        Packs the dict of the port values (python ints) into one vector of lanes
+        '''
+        port_lanes = dict()
+        for name, value in values.items():
+            port = self.manifest.ports[name]
+            value &= (1 << port.width) - 1
+            port_lanes[name] = np.array([[(value >> (LANE_WIDTH * index)) & ((1 << LANE_WIDTH) - 1) for index in range(port.lanes)]], dtype=np.uint64)
+        return self.runtime.pack(port_lanes, 1, mode)[0]
+
+    def clock(self, cycles = 1):
+        '''
+        Clocks the design model for cycles cycles with the current inputs, then updates the input pio lanes (unless they are double-buffered) and the cycle counter
+        '''
+        for _ in range(cycles):
+            self.outputs = self.dut.clock(self.inputs)
+        self.cycles += cycles
+        if not self.atomic:
+            self.latch_outputs()
+        if self.counter_index is not None:
+            self.words[self.counter_index] = self.cycles
+
+    def latch_outputs(self):
+        '''
+        Puts the design outputs of the last cycle into the input pio lanes
+        '''
+        if len(self.manifest.in_lane_indexes):
+            indexes = self.manifest.in_lane_indexes
+            in_masks = self.in_masks[indexes]
+            self.words[indexes] = (self.words[indexes] & ~in_masks) | (self.pack_ports(self.outputs, 'in') & in_masks)
+
+    def write_lanes(self, indexes, lanes):
+        '''
+        Writes the lanes at the word indexes, the design inputs change after each write (after the commit if the pios are double-buffered), the bits of the input pios in a lane are not written
+        '''
+        for index, lane in zip(np.atleast_1d(indexes), np.atleast_1d(lanes)):
+            self.words[index] = (np.uint64(lane) & ~self.in_masks[index]) | (self.words[index] & self.in_masks[index])
+            self.writes += 1
+            if not self.atomic:
+                self.inputs = self.unpack_ports(self.words[self.manifest.out_lane_indexes], 'out')
+            self.clock(self.cycles_per_access)
+
+    def write_register(self, address, value):
+        '''
+        Writes the pio_sync register: PIO_SYNC_COMMIT applies the written lanes to the design inputs, PIO_SYNC_SNAPSHOT latches the design outputs after the commit
+        '''
+        assert address == self.manifest.pio_sync, f'ERROR: no register of the model at address {address}'
+        self.writes += 1
+        if value & PIO_SYNC_COMMIT:
+            self.inputs = self.unpack_ports(self.words[self.manifest.out_lane_indexes], 'out')
+        self.clock(self.cycles_per_access)
+        if value & PIO_SYNC_SNAPSHOT:
+            self.latch_outputs()
+
+    def read_lanes(self, indexes):
+        '''
+        Reads the lanes at the word indexes, returns a copy
+        '''
+        lanes = np.empty(len(np.atleast_1d(indexes)), dtype=np.uint64)
+        for position, index in enumerate(np.atleast_1d(indexes)):
+            self.clock(self.cycles_per_access)
+            self.reads += 1
+            lanes[position] = self.words[index]
+        return lanes
+
+    def close(self):
+        print_log(f'INFO: {self.writes} writes, {self.reads} reads, {self.cycles} cycles')
@@ -0,0 +1,101 @@
+'''
+de10nano_lanes module, the lane layout and the binary manifest layout shared by de10nano_project_generator (host) and de10nano_runtime (board), it needs nothing but python
+
+The pio words are moved in 64 bit lanes, the aligned 64 bit words of the bridge window: the lane at byte address a holds the bits [8 * a, 8 * a + 63] of the window,
+so a wide pio spans several lanes, and two 32 bit pios share one lane.
+
+split_lane_fragment(): this function splits a fragment of a port in a pio into lane fragments
+lane_addresses(): this function returns the sorted lane addresses of each pio mode, a packed batch (or a compiled test table) has one column for each of them
+manifest_struct_format(), manifest_dtype(): these functions turn a MANIFEST_* table layout into the struct format the generator packs it with, and the numpy dtype the runtime views it with
+'''
+
+
+
+
+
+# the width of the lanes the pio words are moved in
+LANE_WIDTH = 64
+
+# the binary manifest soc_system.bin, little endian, every table starts at a multiple of 8 bytes, see generate_manifest_file() of de10nano_project_generator
+# a table layout is the list of (field name, struct format character) of one entry, without padding
+MANIFEST_MAGIC = b'D10M'
+MANIFEST_VERSION = 2
+# the (count, offset) of the port, fragment, pio, slave, core and core port tables, the (offset, size) of the strings and of the testbench
+MANIFEST_HEADER = [('magic', '4s'), ('version', 'H'), ('address_width', 'H'),
+                   ('port_count', 'I'), ('port_offset', 'I'), ('fragment_count', 'I'), ('fragment_offset', 'I'),
+                   ('pio_count', 'I'), ('pio_offset', 'I'), ('slave_count', 'I'), ('slave_offset', 'I'),
+                   ('strings_offset', 'I'), ('strings_size', 'I'), ('testbench_offset', 'I'), ('testbench_size', 'I'),
+                   ('core_count', 'I'), ('core_offset', 'I'), ('core_port_count', 'I'), ('core_port_offset', 'I')]
+# mode is the index in MANIFEST_MODES of the mode of its pios, the fragments of a port are fragment_count entries of the fragment table from fragment_index
+MANIFEST_PORT = [('name_offset', 'I'), ('name_size', 'H'), ('mode', 'B'), ('reserved', 'B'), ('width', 'I'), ('fragment_index', 'I'), ('fragment_count', 'I')]
+# the 64 bit lane fragments of split_lane_fragment(), with their masks
+MANIFEST_FRAGMENT = [('mask', 'Q'), ('lane_address', 'I'), ('lane_lsb', 'B'), ('port_lane', 'B'), ('port_shift', 'B'), ('bits', 'B')]
+MANIFEST_PIO = [('name_offset', 'I'), ('name_size', 'I'), ('address', 'I'), ('width', 'H'), ('mode', 'B'), ('reserved', 'B')]
+MANIFEST_SLAVE = [('name_offset', 'I'), ('name_size', 'I'), ('base', 'I'), ('span', 'I')]
+# kind is the index in MANIFEST_CORE_KINDS, address is the base of the first slave of the core (the others are in the slave table),
+# parameter is the irq number of a pio_irq and the snapshot delay of a pio_sync, 0 for the others,
+# the ports of a core (the irq ports of a pio_irq, by bit) are port_count entries of the core port table from port_index
+MANIFEST_CORE = [('name_offset', 'I'), ('name_size', 'H'), ('kind', 'B'), ('reserved', 'B'), ('address', 'I'), ('parameter', 'I'), ('port_index', 'I'), ('port_count', 'I')]
+# the index of the port in the port table
+MANIFEST_CORE_PORT = [('port', 'I')]
+MANIFEST_MODES = ('out', 'in')
+MANIFEST_CORE_KINDS = ('cycle_counter', 'pio_irq', 'pio_sync', 'clock_control')
+
+# the numpy type of each struct format character
+NUMPY_TYPES = {'4s': 'S4', 'B': 'u1', 'H': '<u2', 'I': '<u4', 'Q': '<u8'}
+
+
+
+
+
+def split_lane_fragment(address, pio_lsb, port_lsb, bits):
+    '''
+    This function splits the fragment of a port (bits bits from port_lsb, in the pio at address from pio_lsb) into lane fragments,
+    returns the list of (lane address, lane lsb, port lane, port shift, bits), no lane fragment crosses a lane or a lane of the port.
+    The lane is found from the absolute bit position, so a pio narrower than a lane (a 32 bit pio at address 4) shares the lane with its neighbour.
+    '''
+    lane_fragments = list()
+    while bits > 0:
+        bit = address * 8 + pio_lsb
+        lane_lsb = bit % LANE_WIDTH
+        port_shift = port_lsb % LANE_WIDTH
+        lane_bits = min(bits, LANE_WIDTH - lane_lsb, LANE_WIDTH - port_shift)
+        lane_fragments.append((bit // LANE_WIDTH * (LANE_WIDTH // 8), lane_lsb, port_lsb // LANE_WIDTH, port_shift, lane_bits))
+        pio_lsb += lane_bits
+        port_lsb += lane_bits
+        bits -= lane_bits
+    return lane_fragments
+
+
+
+
+
+def lane_addresses(mode_fragments):
+    '''
+    This function gets the (mode, lane fragments) of the ports and returns the dict of the sorted lane addresses by mode ('out' and 'in').
+    The column of a lane in a packed batch is its position in this list, a lane shared by an output and an input pio is in both lists.
+    '''
+    addresses = {'out': set(), 'in': set()}
+    for mode, lane_fragments in mode_fragments:
+        addresses[mode].update(fragment[0] for fragment in lane_fragments)
+    return {mode: sorted(mode_addresses) for mode, mode_addresses in addresses.items()}
+
+
+
+
+
+def manifest_struct_format(layout):
+    '''
+    This function returns the struct format of a MANIFEST_* table layout, little endian without padding
+    '''
+    return '<' + ''.join(code for name, code in layout)
+
+
+
+
+
+def manifest_dtype(layout):
+    '''
+    This function returns the numpy dtype description (a list of (field name, type)) of a MANIFEST_* table layout, it is the same binary layout as manifest_struct_format()
+    '''
+    return [(name, NUMPY_TYPES[code]) for name, code in layout]
@@ -15,10 +15,21 @@ The rest of the function is the private function.
 
 
 from xml.dom import minidom
+import xml.etree.ElementTree as ET
+import mmap
+import hashlib
+import bisect
+import marshal
 import re
+import struct
 from HDL_n_Tcl import *
+import de10nano_lanes
+from de10nano_lanes import LANE_WIDTH, split_lane_fragment, lane_addresses
 import os
+import sys
+import glob
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 
 
 
@@ -26,17 +37,44 @@ import subprocess
 
 LOG = True
 
+# the data widths of the pio cores which can be generated
+PIO_WIDTHS = (32, 64, 128, 256)
+
+# the burst sizes (in words) of the burst pio banks, 1 means no burst
+BURST_SIZES = (1, 2, 4, 8, 16, 32, 64, 128)
+
+# the read latencies (in clock cycles) of the input pios, 0 means the combinational read path
+READ_LATENCIES = (0, 1, 2, 3, 4)
+
+# the on-chip memory bits the vector sequencer may use, the Cyclone V on the DE10 Nano has 5570 Kbits of M10K blocks
+MAX_VECTOR_RAM_BITS = 4 * 1024 * 1024
+
+# the binary manifest soc_system.bin, the table layouts are in de10nano_lanes, see generate_manifest_file()
+MANIFEST_HEADER = struct.Struct(de10nano_lanes.manifest_struct_format(de10nano_lanes.MANIFEST_HEADER))
+MANIFEST_PORT = struct.Struct(de10nano_lanes.manifest_struct_format(de10nano_lanes.MANIFEST_PORT))
+MANIFEST_FRAGMENT = struct.Struct(de10nano_lanes.manifest_struct_format(de10nano_lanes.MANIFEST_FRAGMENT))
+MANIFEST_PIO = struct.Struct(de10nano_lanes.manifest_struct_format(de10nano_lanes.MANIFEST_PIO))
+MANIFEST_SLAVE = struct.Struct(de10nano_lanes.manifest_struct_format(de10nano_lanes.MANIFEST_SLAVE))
+MANIFEST_CORE = struct.Struct(de10nano_lanes.manifest_struct_format(de10nano_lanes.MANIFEST_CORE))
+MANIFEST_CORE_PORT = struct.Struct(de10nano_lanes.manifest_struct_format(de10nano_lanes.MANIFEST_CORE_PORT))
+
+# the list of the generated files under the output path, the files of an earlier run which are not in the list of this run are removed, see remove_stale_files()
+GENERATED_FILES_LIST = 'generated_files.txt'
+
 
 
 
 
 class Pio:
-    def __init__(self, name, mode, address):
+    def __init__(self, name, mode, address, width = 64):
         self.mode = mode
-        self.available_bit = 63 # Means the highest available bit, when the pio is full, this value should be -1
+        self.width = width
+        self.available_bit = width - 1 # Means the highest available bit, when the pio is full, this value should be -1
         self.pio_name = name
         self.export_name = name + '_export'
         self.address = address
+        self.module_name = f'pio{width}_{mode}'
+        self.span = width // 8
 
     def connect(self, width):
         assert self.available_bit+1 >= width, "ERROR: Available bits is not enough."
@@ -46,6 +84,28 @@ class Pio:
 
 
 
+class PioBank:
+    '''
+    A burst pio bank is one avalon slave which holds several pio words (words is a power of two), so the HPS can write or read all of them in one burst.
+    The pios in the bank keep their own name and export, and their address is the address of their word in the bank.
+    '''
+    def __init__(self, name, mode, address, width, words, pios):
+        self.mode = mode
+        self.width = width
+        self.words = words
+        self.pios = pios
+        self.pio_name = name
+        self.export_name = name + '_export'
+        self.address = address
+        self.module_name = f'pio{width}x{words}_{mode}'
+        self.span = width // 8 * words
+        for word, pio in enumerate(pios):
+            pio.address = address + word * pio.span
+
+
+
+
+
 class Port:
     def __init__(self, name, mode, type_str, description):
         self.name = name
@@ -72,6 +132,72 @@ class Port:
 
 
 
+class HDLGenProject:
+    '''
+    The in-memory model of one HDLGen project. It is built once by parse_hdlgen_project(), then every generate_* function reads from it, so the .hdlgen files are only parsed one time.
+
+    name: name of the design (top module)
+    location: the project folder of the design
+    environment: the HDLGen environment folder, the Package folder is under it
+    ports: list of Port of the design, the clk port is not included
+    components: list of the hdl path of each subcomponent, taken from mainPackage.hdlgen
+    testbench: the TBNote text of the project
+    '''
+    def __init__(self, name, location, environment, ports, components, testbench):
+        self.name = name
+        self.location = location
+        self.environment = environment
+        self.ports = ports
+        self.components = components
+        self.testbench = testbench
+
+
+
+
+
+class GeneratorOptions:
+    '''
+    The options of de10nano_project_generator(), the default options generate the same system as before.
+
+    access_hint: list of port name lists, the ports in one list are written or read together in a test step, so they are packed into the same pio.
+                 If it is None, the ports are packed without access groups, unless access_from_testbench is True.
+    pio_width: data width of the pio cores and the mm bridge, one of PIO_WIDTHS. If it is None, it is chosen by choose_pio_width().
+    burst_size: one of BURST_SIZES, if it is larger than 1, the pios are grouped into burst pio banks of burst_size words, and mm_bridge_0 accepts bursts of that size.
+    vector_depth: if it is not None, a vector sequencer with on-chip memory for vector_depth (a power of two) stimulus and response vectors is added, see VectorSequencer.
+    dma_stream: if it is True, two msgdma cores stream the stimulus from the HPS SDRAM to the design and the response back, see StreamAdapter.
+    read_latency: one of READ_LATENCIES, if it is larger than 0, the input pios register their read data for read_latency cycles, so the reads are pipelined and the design outputs are off the interconnect timing path.
+                  The burst pio banks always register their read data.
+    pio_multicycle: if it is not None, the paths between the pios and the design are relaxed in the generated sdc, with a setup multicycle of pio_multicycle cycles, or false paths if it is 0,
+                    see generate_sdc_file(). If it is None, those paths keep the single cycle constraint of the clocks.
+    cycle_counter: if it is True, a cycle counter with a free running counter slave and a start/stop latched counter slave is added, see CycleCounter.
+    irq_ports: list of the names of the output ports of the design which signal done, they interrupt the HPS through an interrupt-capable pio, see IrqPio.
+    pio_out_readback: if it is True, the output pios can be read back, so the software needs no shadow copy of them. The burst pio banks are write only.
+    atomic_pios: if it is True, the pios are double-buffered: the writes to the output pios are staged until a commit, and the input pios are read from a snapshot, see PioSync.
+                 It needs the single word pios (burst_size 1, read_latency 0), and the output pios are write only.
+    clock_control: if it is True, the design is clocked through a clock gate, so the HPS can free-run it, pause it or advance it exactly N cycles, see ClockControl.
+    access_from_testbench: if it is True and access_hint is None, the access groups are derived from the test table in the TBNote, see derive_access_groups().
+                           It changes the packing of the ports (and so the pio layout) of the default options.
+    '''
+    def __init__(self, access_hint = None, pio_width = None, burst_size = 1, vector_depth = None, dma_stream = False, read_latency = 0, pio_multicycle = None,
+                 cycle_counter = False, irq_ports = None, pio_out_readback = False, atomic_pios = False, clock_control = False, access_from_testbench = False):
+        self.access_hint = access_hint
+        self.pio_width = pio_width
+        self.burst_size = burst_size
+        self.vector_depth = vector_depth
+        self.dma_stream = dma_stream
+        self.read_latency = read_latency
+        self.pio_multicycle = pio_multicycle
+        self.cycle_counter = cycle_counter
+        self.irq_ports = irq_ports
+        self.pio_out_readback = pio_out_readback
+        self.atomic_pios = atomic_pios
+        self.clock_control = clock_control
+        self.access_from_testbench = access_from_testbench
+
+
+
+
+
 def mode_convert(mode):
     '''
     This function is for helping compare the direction of port and parallel IO, since the the direaction of your design and the parallel IO is opposite
@@ -98,23 +224,976 @@ def print_log(str):
 
 
 
-def generate_project_tcl(HDLGen_project_path, output_path = ''):
+def iter_hdlgen_elements(hdlgen_path, wanted_paths):
     '''
-    The generate_project_tcl function creates a TCL script for adding VHDL files to a Quartus project from an HDLGen project file. It extracts component paths from mainPackage.hdlgen, constructs TCL commands, and includes the top module and MainPackage.vhd. The script is saved to a specified location.
+    This function streams a .hdlgen file instead of loading the whole DOM. The file is memory-mapped and read by ElementTree.iterparse, every element whose tag path ends with one of wanted_paths (for example 'entityIOPorts/signal') is yielded as (tag_path, element).
+    After the caller got the element, it is cleared and removed from its parent, and so is every other element once it ends (unless it is inside a wanted element),
+    so the memory use stays flat no matter how many signals or how long the TBNote is.
+
+    Parameters:
+
+    hdlgen_path: Path to the .hdlgen file.
+    wanted_paths: tag paths to yield, separated by '/', matched against the end of the full tag path.
+    '''
+    # only build the tag path when the tag itself is the last tag of a wanted path
+    wanted_tags = {wanted_path.split('/')[-1] for wanted_path in wanted_paths}
+    # an empty file can not be memory-mapped
+    assert os.path.getsize(hdlgen_path) > 0, f'ERROR: {hdlgen_path} is empty'
+    with open(hdlgen_path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            tag_stack = list()
+            element_stack = list()
+            # the tag path of each open element, None if it is not wanted
+            wanted_stack = list()
+            # the number of open wanted elements, their children are kept until the wanted element is yielded
+            wanted_depth = 0
+            events = ET.iterparse(mapped_file, events=('start', 'end'))
+            while True:
+                try:
+                    event, element = next(events)
+                except StopIteration:
+                    break
+                except ET.ParseError as e:
+                    assert False, f'ERROR: {hdlgen_path} is not a valid .hdlgen file: {e}'
+                if event == 'start':
+                    tag_stack.append(element.tag)
+                    element_stack.append(element)
+                    tag_path = None
+                    if element.tag in wanted_tags:
+                        full_path = '/'.join(tag_stack)
+                        if any(full_path == wanted_path or full_path.endswith('/' + wanted_path) for wanted_path in wanted_paths):
+                            tag_path = full_path
+                            wanted_depth += 1
+                    wanted_stack.append(tag_path)
+                    continue
+                tag_stack.pop()
+                element_stack.pop()
+                tag_path = wanted_stack.pop()
+                if tag_path is not None:
+                    wanted_depth -= 1
+                    yield tag_path, element
+                elif wanted_depth:
+                    continue
+                # release the element once it has been read or skipped
+                element.clear()
+                if element_stack:
+                    element_stack[-1].remove(element)
+
+
+
+
+
+def parse_port_value(value_str):
+    '''
+    This function converts one value of the testbench table into an int.
+    Supported formats: 0x/0b/0o prefixed numbers, VHDL literals such as x"AB", b"0101" or "0101" (binary), and digits without prefix, which are always hex (10 is 0x10, 0101 is 0x101).
+    Don't care values (X, U, -, empty) return None, any other value raises ValueError.
+    '''
+    value_str = value_str.strip().replace('_', '')
+    if value_str == '' or set(value_str.upper()) <= {'X', 'U', '-', 'Z'}:
+        return None
+    vhdl_literal = re.fullmatch(r'([xXbBoO]?)"([0-9a-fA-F]+)"', value_str) or re.fullmatch(r"([xXbBoO]?)'([01])'", value_str)
+    try:
+        if vhdl_literal:
+            base = {'': 2, 'b': 2, 'o': 8, 'x': 16}[vhdl_literal.group(1).lower()]
+            return int(vhdl_literal.group(2), base)
+        # a value with a prefix is never read as hex digits, 0b12 is rejected rather than read as 0xB12
+        if re.match(r'0[xXbBoO]', value_str):
+            if re.fullmatch(r'0[xX][0-9a-fA-F]+|0[bB][01]+|0[oO][0-7]+', value_str):
+                return int(value_str, 0)
+        elif re.fullmatch(r'[0-9a-fA-F]+', value_str):
+            return int(value_str, 16)
+    except ValueError:
+        pass
+    raise ValueError(f'ERROR: Testbench value is not supported: {value_str}')
+
+
+
+
+
+def parse_testbench_table(testbench, ports):
+    '''
+    This function finds the test table in the TBNote text. The columns can be separated by '|', ',', tab or two or more spaces (aligned columns), a line of prose has none of them.
+    The header of the table is the first such line whose column names are single words and name at least one input and one output port of the design.
+    Every following line with the same number of columns is one test step, the columns which are not a port (test number, note, delay...) are ignored, and a line starting with '#' or '--' is a comment.
+    A line after the header with another number of columns is reported as an ERROR and skipped.
+
+    Returns (port_indexes, rows), port_indexes is the port index of each port column, rows is the list of test steps, each step is the list of values (int or None) of those columns.
+    '''
+    port_index_of_name = {port.name: port_index for port_index, port in enumerate(ports)}
+
+    def split_line(line, separator):
+        if separator is None:
+            return re.split(r' {2,}', line.strip())
+        return [field.strip() for field in line.strip().strip(separator).split(separator)]
+
+    header = None
+    rows = list()
+    for line_number, line in enumerate((testbench or '').splitlines(), 1):
+        if not line.strip() or line.strip().startswith(('#', '--')):
+            continue
+        if header is None:
+            for separator in ('|', ',', '\t', None):
+                if separator is not None and separator in line:
+                    break
+            if separator is None and not re.search(r'\S {2,}\S', line):
+                continue
+            fields = split_line(line, separator)
+            modes = {ports[port_index_of_name[field]].mode for field in fields if field in port_index_of_name}
+            if all(re.fullmatch(r'\S+', field) for field in fields) and {'in', 'out'} <= modes:
+                header = fields
+                columns = [(column, port_index_of_name[field]) for column, field in enumerate(fields) if field in port_index_of_name]
+            continue
+        fields = split_line(line, separator)
+        if len(fields) != len(header):
+            print_log(f'ERROR: line {line_number} of the TBNote has {len(fields)} columns, the header has {len(header)}, it is skipped: {line.strip()}')
+            continue
+        rows.append([parse_port_value(fields[column]) for column, _ in columns])
+
+    if header is None:
+        return list(), list()
+    return [port_index for _, port_index in columns], rows
+
+
+
+
+
+def derive_access_groups(project):
+    '''
+    This function derives the access groups from the test table in the TBNote:
+    the input ports which change in the same test step are written together, and all the output ports in the table are read together in every step.
+    The first step is skipped, since it sets every input.
+    '''
+    port_indexes, rows = parse_testbench_table(project.testbench, project.ports)
+    access_groups = list()
+    input_columns = [column for column, port_index in enumerate(port_indexes) if project.ports[port_index].mode == 'in']
+    output_group = [port_index for port_index in port_indexes if project.ports[port_index].mode == 'out']
+    for previous_row, row in zip(rows, rows[1:]):
+        changed = [port_indexes[column] for column in input_columns if row[column] is not None and row[column] != previous_row[column]]
+        if len(changed) > 1:
+            access_groups.append(changed)
+    if len(output_group) > 1:
+        access_groups.append(output_group)
+    print_log(f'INFO: {len(access_groups)} access groups derived from the testbench')
+    return access_groups
+
+
+
+
+
+def main_package_hdlgen_path(environment):
+    '''
+    The mainPackage.hdlgen is under the Package folder of the environment
+    '''
+    return environment + r'\Package\mainPackage.hdlgen'
+
+
+
+
+
+def parse_hdlgen_project(HDLGen_project_path, cache = None):
+    '''
+    This function parses the TopModule.hdlgen file and its mainPackage.hdlgen file one time, and returns a HDLGenProject. All the generate_* functions use the returned project, so no one need to parse the xml again.
+    Both files are read by iter_hdlgen_elements(), only the settings, the entityIOPorts signals, the TBNote and the component dirs are kept.
 
     Parameters:
 
     HDLGen_project_path: Path to the HDLGen project file.
-    output_path (optional): Directory to save the generated TCL script. Defaults to the current directory if not specified.
+    cache (optional): a ProjectCache, if the project is unchanged since it was cached, the xml is not parsed at all.
     '''
-    print_log('INFO: generate_project_tcl()')
-    # In the TopModule.hdlgen file, in the label <HDLGen> <ProjectManager> <settings> <environment>
-    # You can get the location of the Package folder, and the mainPackage.hdlgen is under the Package folder
+    print_log('INFO: parse_hdlgen_project()')
+    if cache is not None:
+        project = cache.load(HDLGen_project_path)
+        if project is not None:
+            return project
+
+    name = None
+    location = None
+    environment = None
+    testbench = None
+    ports = list()
+
+    # In the TopModule.hdlgen file, in the label <HDLGen> <ProjectManager> <settings>
+    # You can get the name, the location and the environment of the design
+    for tag_path, element in iter_hdlgen_elements(HDLGen_project_path, ('settings', 'entityIOPorts/signal', 'TBNote')):
+        if tag_path.endswith('settings'):
+            if name is None:
+                name = element.findtext('name')
+                location = element.findtext('location')
+                environment = element.findtext('environment')
+        elif tag_path.endswith('signal'):
+            # got signal information from project xml
+            port_name = element.findtext('name')
+            if port_name == 'clk':
+                print_log('INFO: clk detected')
+                continue
+            mode = element.findtext('mode')
+            type_str = element.findtext('type')
+            description = element.findtext('description')
+            # save the port infromation in the list
+            port = Port(port_name, mode, type_str, description)
+            print_log(f"INFO: signal name: {port.name}, signal mode: {port.mode}, signal type: {port.type_str}, signal width: {port.width}")
+            ports.append(port)
+        elif testbench is None:
+            testbench = element.text
+
+    assert name is not None and environment is not None, f'ERROR: No settings found in {HDLGen_project_path}'
+    assert testbench is not None, f'ERROR: No TBNote found in {HDLGen_project_path}'
+
+    # The mainPackage.hdlgen is under the Package folder of the environment
     # And under the mainPackage.hdlgen, in the label <HDLGen> <components>, you will see many <component> label
     # And each component label has a <dir> label, the <dir> label contains the path of hdl of each subconponents
+    mainPackage_hdlgen_path = main_package_hdlgen_path(environment)
+    print_log(f'INFO: path of mainPackage.hdlgen: {mainPackage_hdlgen_path}')
+    components = list()
+    for tag_path, element in iter_hdlgen_elements(mainPackage_hdlgen_path, ('components/component/dir',)):
+        components.append(element.text.replace('\\','/'))
+
+    project = HDLGenProject(name, location, environment, ports, components, testbench)
+    if cache is not None:
+        cache.store(HDLGen_project_path, project)
+    return project
+
+
+
+
+
+def file_digest(file_path):
+    '''
+    Return the sha256 hex digest of the content of the file
+    '''
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+
+
+
+class ProjectCache:
+    '''
+    A persistent cache of parsed HDLGen projects, stored in cache_dir.
+
+    Each entry is one compact binary (marshal) file named by the sha256 of the TopModule.hdlgen content, and it also records the sha256 of the mainPackage.hdlgen, so an entry is only used when both files are unchanged.
+    The marshal format is only valid for the python version which wrote it, so the name of an entry has the python version as well, each version keeps its own entries in a shared cache_dir.
+    The modification time of an entry is its last use time, when the total size of the entries is larger than max_size, the least recently used entries are deleted.
+    '''
+    CACHE_VERSION = 1
+    PYTHON_VERSION = 'py%d%d' % sys.version_info[:2]
+
+    def __init__(self, cache_dir, max_size = 64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+    def entry_path(self, HDLGen_project_path):
+        return os.path.join(self.cache_dir, f'{file_digest(HDLGen_project_path)}.{self.PYTHON_VERSION}.bin')
+
+    def load(self, HDLGen_project_path):
+        '''
+        Return the cached HDLGenProject, or None if the project is not cached or has been changed
+        '''
+        entry_path = self.entry_path(HDLGen_project_path)
+        try:
+            with open(entry_path, 'rb') as entry_file:
+                entry = marshal.load(entry_file)
+            version, mainPackage_digest, name, location, environment, ports, components, testbench = entry
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != self.CACHE_VERSION:
+            return None
+        try:
+            if file_digest(main_package_hdlgen_path(environment)) != mainPackage_digest:
+                print_log(f'INFO: mainPackage.hdlgen changed, cache entry is out of date: {entry_path}')
+                return None
+        except OSError:
+            return None
+        # mark the entry as the most recently used one, the cache may be read only or the entry evicted meanwhile
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        print_log(f'INFO: project loaded from cache: {entry_path}')
+        ports = [Port(*port) for port in ports]
+        return HDLGenProject(name, location, environment, ports, list(components), testbench)
+
+    def store(self, HDLGen_project_path, project):
+        '''
+        Save the project in the cache, then evict the least recently used entries if the cache is too large
+        '''
+        entry_path = self.entry_path(HDLGen_project_path)
+        mainPackage_digest = file_digest(main_package_hdlgen_path(project.environment))
+        ports = [(port.name, port.mode, port.type_str, port.description) for port in project.ports]
+        entry = (self.CACHE_VERSION, mainPackage_digest, project.name, project.location, project.environment, ports, project.components, project.testbench)
+        # write to a temporary file first, so a broken entry is never left in the cache
+        temp_path = entry_path + f'.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as entry_file:
+            marshal.dump(entry, entry_file)
+        os.replace(temp_path, entry_path)
+        print_log(f'INFO: project saved in cache: {entry_path}')
+        self.evict()
+
+    def invalidate(self, HDLGen_project_path):
+        '''
+        Delete the cache entry of the project, return True if there was one
+        '''
+        entry_path = self.entry_path(HDLGen_project_path)
+        if os.path.exists(entry_path):
+            os.remove(entry_path)
+            return True
+        return False
+
+    def clear(self):
+        '''
+        Delete all the entries in the cache
+        '''
+        for entry_name in os.listdir(self.cache_dir):
+            if entry_name.endswith('.bin'):
+                os.remove(os.path.join(self.cache_dir, entry_name))
+
+    def evict(self):
+        entries = list()
+        total_size = 0
+        for entry_name in os.listdir(self.cache_dir):
+            if not entry_name.endswith('.bin'):
+                continue
+            entry_path = os.path.join(self.cache_dir, entry_name)
+            try:
+                entry_stat = os.stat(entry_path)
+            except OSError:
+                # another process may have evicted it already
+                continue
+            entries.append((entry_stat.st_mtime, entry_stat.st_size, entry_path))
+            total_size += entry_stat.st_size
+        entries.sort()
+        for _, entry_size, entry_path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(entry_path)
+            except OSError:
+                pass
+            total_size -= entry_size
+            print_log(f'INFO: cache entry evicted: {entry_path}')
+
+
+
+
+
+class ChangedFiles(list):
+    '''
+    The changed_files list of de10nano_project_generator(): the files which are changed, and in generated, every file written by write_output_file() (changed or not),
+    so the files generated by an earlier run which are not generated any more can be found, see remove_stale_files().
+    '''
+    def __init__(self):
+        super().__init__()
+        self.generated = set()
+
+
+
+
+
+def write_output_file(file_path, content, changed_files = None):
+    '''
+    This function writes a generated file only when its content is different from the file already on disk, so the mtime of an unchanged file is kept and Quartus/Qsys do not treat it as stale.
+    The content is written to a temporary file first, if the hash of the temporary file is the same as the existing file, the temporary file is deleted, otherwise it atomically replaces the existing file.
+    If changed_files is a list, the file_path is appended to it when the file is changed. Returns True if the file is changed.
+    If changed_files is a ChangedFiles, the file_path is added to its generated set as well.
+    content is a str, or bytes for a binary file.
+    '''
+    if isinstance(changed_files, ChangedFiles):
+        changed_files.generated.add(file_path)
+    temp_path = file_path + f'.{os.getpid()}.tmp'
+    with open(temp_path, 'wb' if isinstance(content, bytes) else 'w') as temp_file:
+        temp_file.write(content)
+    if os.path.exists(file_path) and file_digest(file_path) == file_digest(temp_path):
+        os.remove(temp_path)
+        print_log(f'INFO: unchanged: {file_path}')
+        return False
+    os.replace(temp_path, file_path)
+    print_log(f'INFO: written: {file_path}')
+    if changed_files is not None:
+        changed_files.append(file_path)
+    return True
+
+
+
+
+
+def pack_ports(widths, port_indexes, pio_width = 64, access_groups = None):
+    '''
+    This function packs the ports of one direction into as few pios as possible, with the best-fit decreasing algorithm:
+    the widest item is placed first, and each item goes into the pio with the least free bits which can still hold it.
+    The pios are indexed by their free bits (free_bins[n] is the list of pios which have n free bits), so finding the best pio only looks at pio_width + 1 buckets.
+
+    An item is a single port, or a group of ports in access_groups (ports which are accessed together), so the ports of a group always land in the same pio.
+    A group wider than a pio is packed on its own first, each of its pios becomes one item.
+
+    widths[port_index] is the number of bits of the port to pack.
+    Returns a list of bins, each bin is the list of port indexes in one pio, in the order of the ports.
+    '''
+    items = list()
+    grouped = set()
+    for group in access_groups or []:
+        group = sorted(set(group) & set(port_indexes))
+        if not group:
+            continue
+        grouped.update(group)
+        if sum(widths[port_index] for port_index in group) <= pio_width:
+            items.append(group)
+        else:
+            items.extend(pack_ports(widths, group, pio_width))
+    items.extend([port_index] for port_index in port_indexes if port_index not in grouped)
+
+    bins = list()
+    free_bins = [list() for _ in range(pio_width + 1)]
+    for item in sorted(items, key=lambda item: (-sum(widths[index] for index in item), item)):
+        width = sum(widths[port_index] for port_index in item)
+        assert width <= pio_width, f"ERROR: Port {item[0]} is {width} bits, it is wider than a pio ({pio_width} bits)"
+        bin_index = None
+        for free_bits in range(width, pio_width + 1):
+            if free_bins[free_bits]:
+                bin_index = free_bins[free_bits].pop()
+                break
+        if bin_index is None:
+            bin_index = len(bins)
+            bins.append(list())
+            free_bits = pio_width
+        bins[bin_index].extend(item)
+        free_bins[free_bits - width].append(bin_index)
+    return [sorted(port_bin) for port_bin in bins]
+
+
+
+
+
+def merge_access_groups(access_groups):
+    '''
+    This function merges the access groups which share a port, so every port is in one group at most.
+    '''
+    parent = dict()
+
+    def find(port_index):
+        while parent[port_index] != port_index:
+            parent[port_index] = parent[parent[port_index]]
+            port_index = parent[port_index]
+        return port_index
+
+    for group in access_groups:
+        group = list(group)
+        for port_index in group:
+            parent.setdefault(port_index, port_index)
+        for port_index in group[1:]:
+            parent[find(port_index)] = find(group[0])
+
+    merged_groups = dict()
+    for port_index in parent:
+        merged_groups.setdefault(find(port_index), list()).append(port_index)
+    return sorted(sorted(group) for group in merged_groups.values())
+
+
+
+
+
+def split_access_groups(ports, access_groups):
+    '''
+    This function splits every access group by the pio mode of its ports, since an input port and an output port of the design are never in the same pio.
+    Returns the list of (pio mode, group), a group with ports of one mode is kept as it is.
+    '''
+    mode_groups = list()
+    for group in access_groups:
+        for pio_mode in ('out', 'in'):
+            mode_group = [port_index for port_index in group if mode_convert(ports[port_index].mode) == pio_mode]
+            if mode_group:
+                mode_groups.append((pio_mode, mode_group))
+    return mode_groups
+
+
+
+
+
+class AddressMap:
+    '''
+    The address map of the slaves behind mm_bridge_0, the addresses are byte addresses (mm_bridge_0 uses SYMBOLS address units).
+
+    Every slave spans a power of two bytes and its base address is aligned to its span, as platform designer requires.
+    allocate() places a slave at the lowest free aligned address: the gaps left by the alignment are remembered and reused by later slaves, so the map stays compact.
+    reserve() places a slave at a given address, it raises ValueError if the address is not aligned or collides with another slave.
+    '''
+    # the HPS-to-FPGA bridge window of the Cyclone V HPS is 0xC0000000 - 0xFBFFFFFF
+    MAX_ADDRESS = 0x3C000000
+
+    def __init__(self):
+        self.slaves = list() # (base, span, name), sorted by base
+        self.gaps = list() # (base, size) of the unused space below top
+        self.top = 0 # the first address above all the slaves
+
+    def span_of(self, span):
+        return 1 << max(0, (span - 1).bit_length())
+
+    def allocate(self, name, span):
+        '''
+        Place the slave name with span bytes at the lowest free address, returns the base address
+        '''
+        span = self.span_of(span)
+        for gap_index, (gap_base, gap_size) in enumerate(self.gaps):
+            base = -(-gap_base // span) * span
+            if base + span <= gap_base + gap_size:
+                del self.gaps[gap_index]
+                if base > gap_base:
+                    self.gaps.append((gap_base, base - gap_base))
+                if base + span < gap_base + gap_size:
+                    self.gaps.append((base + span, gap_base + gap_size - base - span))
+                self.gaps.sort()
+                return self._insert(name, base, span)
+        base = -(-self.top // span) * span
+        if base > self.top:
+            self.gaps.append((self.top, base - self.top))
+        return self._insert(name, base, span)
+
+    def reserve(self, name, base, span):
+        '''
+        Place the slave name with span bytes at base, returns the base address
+        '''
+        span = self.span_of(span)
+        if base % span:
+            raise ValueError(f'ERROR: Base address 0x{base:x} of {name} is not aligned to its span 0x{span:x}')
+        index = bisect.bisect_left(self.slaves, (base,))
+        for other_base, other_span, other_name in self.slaves[max(0, index - 1):index + 1]:
+            if base < other_base + other_span and other_base < base + span:
+                raise ValueError(f'ERROR: {name} at 0x{base:x} collides with {other_name} at 0x{other_base:x}')
+        # the reserved space is not free any more
+        gaps = list()
+        for gap_base, gap_size in self.gaps:
+            if base < gap_base + gap_size and gap_base < base + span:
+                if gap_base < base:
+                    gaps.append((gap_base, base - gap_base))
+                if base + span < gap_base + gap_size:
+                    gaps.append((base + span, gap_base + gap_size - base - span))
+            else:
+                gaps.append((gap_base, gap_size))
+        if base > self.top:
+            gaps.append((self.top, base - self.top))
+        self.gaps = sorted(gaps)
+        return self._insert(name, base, span)
+
+    def _insert(self, name, base, span):
+        if base + span > self.MAX_ADDRESS:
+            raise ValueError(f'ERROR: {name} at 0x{base:x} is out of the HPS-to-FPGA bridge window (0x{self.MAX_ADDRESS:x} bytes)')
+        bisect.insort(self.slaves, (base, span, name))
+        self.top = max(self.top, base + span)
+        return base
+
+    def address_width(self):
+        '''
+        The number of byte address bits mm_bridge_0 needs to reach every slave
+        '''
+        return max(1, (self.top - 1).bit_length())
+
+
+
+
+
+def count_pios(ports, access_groups = None, pio_width = 64):
+    '''
+    This function returns the number of pios allocate_pios() places for the ports, without placing them.
+    '''
+    access_groups = merge_access_groups(access_groups or [])
+    pio_count = 0
+    for pio_mode in ('out', 'in'):
+        widths = dict()
+        for port_index, port in enumerate(ports):
+            if mode_convert(port.mode) != pio_mode:
+                continue
+            if port.width <= pio_width:
+                widths[port_index] = port.width
+                continue
+            # the full slices of a wide port get a pio each
+            pio_count += port.width // pio_width
+            if port.width % pio_width:
+                widths[port_index] = port.width % pio_width
+        pio_count += len(pack_ports(widths, list(widths), pio_width, access_groups))
+    return pio_count
+
+
+
+
+
+def choose_pio_width(ports, access_groups = None):
+    '''
+    This function chooses the pio width of the design among 64 bit and the wider pios up to the smallest one which can hold the widest port.
+    The width with the fewest pio bits (the registers of the pios) is chosen, the wider one on a tie, so wide datapaths move in fewer and wider transfers,
+    but a single wide port does not make every pio wide: it is split across the narrower pios.
+    '''
+    widest = max((port.width for port in ports), default=1)
+    candidates = list()
+    for pio_width in PIO_WIDTHS:
+        if pio_width >= 64:
+            candidates.append(pio_width)
+            if pio_width >= widest:
+                break
+    pio_bits = {pio_width: pio_width * count_pios(ports, access_groups, pio_width) for pio_width in candidates}
+    pio_width = min(candidates, key=lambda pio_width: (pio_bits[pio_width], -pio_width))
+    print_log(f'INFO: pio width {pio_width} chosen, pio bits of each width: {", ".join(f"{width}: {bits}" for width, bits in pio_bits.items())}')
+    return pio_width
+
+
+
+
+
+def allocate_pios(ports, access_groups = None, pio_width = 64, address_map = None):
+    '''
+    This function maps the ports of the design to the pios. The ports of each direction are packed by pack_ports(), so the ports of different direction never share a pio and the number of pios is minimised.
+    A port wider than a pio is split: each full pio_width slice gets its own pio, those pios are consecutive words, and the remaining high bits are packed like a normal port.
+    access_groups (optional) is a list of port index lists, the ports in one list are written or read together, so they are packed into the same pio when possible.
+    pio_width (optional) is the data width of every pio, each pio spans one word (pio_width / 8 bytes).
+    address_map (optional) is the AddressMap the pios are allocated in, a new one is used if it is None.
+
+    Returns (pios, connection_list), each connection is (port index, pio index, start bit, end bit, port lsb), the port bits [port lsb + start bit - end bit : port lsb] are connected to the pio bits [start bit : end bit]
+    '''
+    print_log('INFO: allocate_pios()')
+    access_groups = merge_access_groups(access_groups or [])
+    if address_map is None:
+        address_map = AddressMap()
+    pios = list()
+    connection_list = list()
+    # the direction of pio is opposite to the port, the input ports of the design are driven by pio_out
+    for pio_mode in ('out', 'in'):
+        port_indexes = [port_index for port_index, port in enumerate(ports) if mode_convert(port.mode) == pio_mode]
+        widths = dict()
+        for port_index in port_indexes:
+            width = ports[port_index].width
+            if width <= pio_width:
+                widths[port_index] = width
+                continue
+            # the full slices of a wide port, from the lowest bits
+            for slice_index in range(width // pio_width):
+                pio_name = f"pio_{pio_mode}_{len(pios)}"
+                pio = Pio(pio_name, pio_mode, address_map.allocate(pio_name, pio_width // 8), pio_width)
+                pios.append(pio)
+                pio.connect(pio_width)
+                connection_list.append((port_index, len(pios) - 1, pio_width - 1, 0, slice_index * pio_width))
+                print_log(f"INFO: port index: {port_index}, pio index: {len(pios) - 1}, start bit: {pio_width - 1}, end bit: 0, port lsb: {slice_index * pio_width}")
+            if width % pio_width:
+                widths[port_index] = width % pio_width
+        for port_bin in pack_ports(widths, list(widths), pio_width, access_groups):
+            pio_name = f"pio_{pio_mode}_{len(pios)}"
+            pio = Pio(pio_name, pio_mode, address_map.allocate(pio_name, pio_width // 8), pio_width)
+            pios.append(pio)
+            for port_index in port_bin:
+                # the high bits of a split port, or the whole port
+                port_lsb = ports[port_index].width - widths[port_index]
+                start_bit = pio.available_bit
+                pio.connect(widths[port_index])
+                end_bit = pio.available_bit + 1
+                connection_list.append((port_index, len(pios) - 1, start_bit, end_bit, port_lsb))
+                print_log(f"INFO: port index: {port_index}, pio index: {len(pios) - 1}, start bit: {start_bit}, end bit: {end_bit}, port lsb: {port_lsb}")
+    # keep the connections in the order of the ports
+    connection_list.sort()
+
+    used_bits = sum(port.width for port in ports)
+    total_bits = pio_width * len(pios)
+    if total_bits:
+        print_log(f'INFO: pio bit utilisation: {used_bits}/{total_bits} ({100 * used_bits / total_bits:.1f}%)')
+    return pios, connection_list
+
+
+
+
+
+def assign_pio_banks(pios, burst_size, address_map):
+    '''
+    This function groups the pios into burst pio banks: the consecutive pios of the same direction are put in a bank, at most burst_size pios in a bank.
+    The banks are allocated in address_map, and the pios get the address of their word in the bank, so the words of a bank (and the slices of a split port) are consecutive.
+    '''
+    print_log('INFO: assign_pio_banks()')
+    banks = list()
+    for pio_mode in ('out', 'in'):
+        mode_pios = [pio for pio in pios if pio.mode == pio_mode]
+        for first in range(0, len(mode_pios), burst_size):
+            bank_pios = mode_pios[first:first + burst_size]
+            # a bank has a power of two words, at least 2 so that it has an address
+            words = max(2, 1 << (len(bank_pios) - 1).bit_length())
+            bank_name = f'pio_bank_{pio_mode}_{len(banks)}'
+            width = bank_pios[0].width
+            address = address_map.allocate(bank_name, width // 8 * words)
+            banks.append(PioBank(bank_name, pio_mode, address, width, words, bank_pios))
+            print_log(f'INFO: {bank_name}: {len(bank_pios)} pios, {words} words, address {address}')
+    return banks
+
+
+
+
+
+def generate_pio_bank_ip(banks, output_path = '', changed_files = None):
+    '''
+    This function writes the _hw.tcl file and the sv file of each kind of burst pio bank in banks, the sv files are under output_path/ip/pio{width}
+    '''
+    written = set()
+    for bank in banks:
+        if bank.module_name in written:
+            continue
+        written.add(bank.module_name)
+        address_width = (bank.words - 1).bit_length()
+        burstcount_width = address_width + 1
+        template_values = {'name': bank.module_name, 'width': bank.width, 'msb': bank.width - 1, 'words': bank.words,
+                           'export_width': bank.width * bank.words, 'export_msb': bank.width * bank.words - 1,
+                           'address_width': address_width, 'address_msb': address_width - 1,
+                           'burstcount_width': burstcount_width, 'burstcount_msb': burstcount_width - 1,
+                           'bytes': bank.width // 8, 'byteenable_msb': bank.width // 8 - 1}
+        if bank.mode == 'out':
+            hw_tcl, hdl_sv = PIO_BANK_OUT_HW_TCL, PIO_BANK_OUT_HDL_SV
+        else:
+            hw_tcl, hdl_sv = PIO_BANK_IN_HW_TCL, PIO_BANK_IN_HDL_SV
+        write_output_file(output_path + f'{bank.module_name}_hw.tcl', hw_tcl % template_values, changed_files)
+
+        ip_path = output_path + rf'ip\pio{bank.width}' # create the path first if not exist
+        if not os.path.exists(ip_path):
+            os.makedirs(ip_path)
+        write_output_file(ip_path + rf'\{bank.module_name}.sv', hdl_sv % template_values, changed_files)
+
+
+
+
+
+def generate_pio_ip(pio_width, output_path = '', changed_files = None, read_latency = 0, out_readback = False, buffered = False):
+    '''
+    This function writes the pio{pio_width}_in and pio{pio_width}_out cores: the _hw.tcl files under output_path, and the sv files under output_path/ip/pio{pio_width}
+    If read_latency is larger than 0, pio{pio_width}_in has the pipelined read path with a fixed read latency, otherwise the combinational read path.
+    If out_readback is True, pio{pio_width}_out has a read path of its output register.
+    If buffered is True, pio{pio_width}_out applies its staged word on the commit strobe and pio{pio_width}_in is read from the snapshot of the snapshot strobe (read_latency and out_readback are ignored).
+    '''
+    template_values = {'width': pio_width, 'msb': pio_width - 1, 'read_latency': read_latency, 'read_wait_time': 0 if read_latency else 1,
+                       'bytes': pio_width // 8, 'byteenable_msb': pio_width // 8 - 1}
+    if buffered:
+        read_latency = 0
+        out_readback = False
+        template_values.update({'read_latency': 0, 'read_wait_time': 1})
+    template_values['readback_ports'] = PIO_OUT_READBACK_PORTS % template_values if out_readback else ''
+    in_template_values = dict(template_values, sync_port=PIO_IN_SNAPSHOT_PORT % template_values if buffered else '')
+    out_template_values = dict(template_values, sync_port=PIO_OUT_COMMIT_PORT % template_values if buffered else '')
+
+    # write the _hw.tcl file
+    pio_in_tcl_file_name = f'pio{pio_width}_in_hw.tcl'
+    write_output_file(output_path + pio_in_tcl_file_name, PIO_IN_HW_TCL % in_template_values, changed_files)
+
+    pio_out_tcl_file_name = f'pio{pio_width}_out_hw.tcl'
+    write_output_file(output_path + pio_out_tcl_file_name, PIO_OUT_HW_TCL % out_template_values, changed_files)
+
+    # write the sv file
+    ip_path = output_path + rf'ip\pio{pio_width}' # create the path first if not exist
+    if not os.path.exists(ip_path):
+        os.makedirs(ip_path)
+
+    pio_in_hdl_sv_file_name = rf'\pio{pio_width}_in.sv'
+    if buffered:
+        pio_in_hdl_sv = PIO_IN_SNAPSHOT_HDL_SV
+    else:
+        pio_in_hdl_sv = PIO_IN_PIPELINED_HDL_SV if read_latency else PIO_IN_HDL_SV
+    write_output_file(ip_path + pio_in_hdl_sv_file_name, pio_in_hdl_sv % template_values, changed_files)
+
+    pio_out_hdl_sv_file_name = rf'\pio{pio_width}_out.sv'
+    if buffered:
+        pio_out_hdl_sv = PIO_OUT_BUFFERED_HDL_SV
+    else:
+        pio_out_hdl_sv = PIO_OUT_READBACK_HDL_SV if out_readback else PIO_OUT_HDL_SV
+    write_output_file(ip_path + pio_out_hdl_sv_file_name, pio_out_hdl_sv % template_values, changed_files)
+
+
+
+
+
+class Core:
+    '''
+    The base of the custom cores behind mm_bridge_0. A core is one instance instance_name of the module module_name, its conduit to the top module is export_name.
+    slaves is the list of (interface name, base address, span) of its avalon slaves, each allocated in address_map by allocate_slave().
+    The module is written by generate_core_ip() from the HW_TCL and HDL_SV templates of HDL_n_Tcl.py, filled with template_values(),
+    and the core is described in soc_system.xml by the element xml_tag with the children of xml_children().
+    '''
+    module_name = None
+    HW_TCL = None
+    HDL_SV = None
+
+    def __init__(self, name):
+        self.instance_name = name
+        self.export_name = name + '_export'
+        self.slaves = list() # (interface name, base address, span)
+        self.xml_tag = self.module_name
+
+    def allocate_slave(self, address_map, interface, span):
+        address = address_map.allocate(f'{self.instance_name}.{interface}', span)
+        self.slaves.append((interface, address, span))
+        print_log(f'INFO: {self.instance_name}.{interface}: address {address}, span {span}')
+        return address
+
+    def template_values(self):
+        return dict()
+
+    def xml_children(self, project):
+        '''
+        The (tag, text) children of the element of the core in soc_system.xml: its name and the address of each slave, the address of the s0 slave is just address
+        '''
+        return [('name', self.instance_name)] + [('address' if interface == 's0' else f'{interface}_address', f'{address}') for interface, address, span in self.slaves]
+
+
+
+
+
+def generate_core_ip(core, output_path = '', changed_files = None):
+    '''
+    This function writes the _hw.tcl file and the sv file of a Core, the sv file is under output_path/ip/<module name of the core>
+    '''
+    template_values = core.template_values()
+    write_output_file(output_path + f'{core.module_name}_hw.tcl', core.HW_TCL % template_values, changed_files)
+
+    ip_path = output_path + rf'ip\{core.module_name}' # create the path first if not exist
+    if not os.path.exists(ip_path):
+        os.makedirs(ip_path)
+    write_output_file(ip_path + rf'\{core.module_name}.sv', core.HDL_SV % template_values, changed_files)
+
+
+
+
+
+def vector_layout(pios):
+    '''
+    This function returns the layout of the test vectors: (stimulus pios, response pios, stimulus words, response words).
+    A stimulus vector is the words of the output pios and a response vector is the words of the input pios, in the order of the pios, so the vectors have the same bit layout as the pios.
+    A vector has a power of two words, at least 2 so that a word has an address.
+    '''
+    stimulus_pios = [pio for pio in pios if pio.mode == 'out']
+    response_pios = [pio for pio in pios if pio.mode == 'in']
+    stimulus_words = max(2, 1 << (len(stimulus_pios) - 1).bit_length())
+    response_words = max(2, 1 << (len(response_pios) - 1).bit_length())
+    return stimulus_pios, response_pios, stimulus_words, response_words
+
+
+
+
+
+def vector_template_values(core):
+    '''
+    This function returns the values of the vector layout placeholders in the templates of a core which drives the design with test vectors
+    '''
+    width = core.width
+    return {'width': width, 'msb': width - 1,
+            'stimulus_words': core.stimulus_words, 'stimulus_word_width': (core.stimulus_words - 1).bit_length(),
+            'stimulus_width': width * core.stimulus_words, 'stimulus_msb': width * core.stimulus_words - 1,
+            'response_words': core.response_words, 'response_word_width': (core.response_words - 1).bit_length(),
+            'response_width': width * core.response_words, 'response_msb': width * core.response_words - 1}
+
+
+
+
+
+def vector_xml_children(core):
+    '''
+    This function returns the (tag, text) children of the element in soc_system.xml of a core which drives the design with test vectors: its settings, its slaves and its vector layout
+    '''
+    children = [('name', core.instance_name)] + core.settings
+    children += [(f'{interface}_address', f'{address}') for interface, address, span in core.slaves]
+    children += [('stimulus_words', f'{core.stimulus_words}')]
+    children += [('stimulus_pio', f'{pio.address}') for pio in core.stimulus_pios]
+    children += [('response_words', f'{core.response_words}')]
+    children += [('response_pio', f'{pio.address}') for pio in core.response_pios]
+    return children
+
+
+
+
+
+class VectorSequencer(Core):
+    '''
+    The vector sequencer holds the stimulus memory and the response memory of depth test vectors. When the HPS starts a run, it applies one stimulus vector to the design every clock cycle and captures the response of each vector.
+    The vectors are laid out by vector_layout().
+    The csr, stimulus and response slaves are allocated in address_map, the registers of the csr slave are described in HDL_n_Tcl.py.
+    '''
+    module_name = 'vector_sequencer'
+    HW_TCL = VECTOR_SEQUENCER_HW_TCL
+    HDL_SV = VECTOR_SEQUENCER_HDL_SV
+
+    def __init__(self, name, pios, pio_width, depth, address_map):
+        super().__init__(name)
+        self.width = pio_width
+        self.depth = depth
+        self.settings = [('depth', f'{depth}')]
+        self.stimulus_pios, self.response_pios, self.stimulus_words, self.response_words = vector_layout(pios)
+        self.ram_bits = (self.stimulus_words + self.response_words) * pio_width * depth
+        for interface, span in (('csr', 4 * pio_width // 8),
+                                ('stimulus', depth * self.stimulus_words * pio_width // 8),
+                                ('response', depth * self.response_words * pio_width // 8)):
+            self.allocate_slave(address_map, interface, span)
+
+    def template_values(self):
+        template_values = vector_template_values(self)
+        depth_width = (self.depth - 1).bit_length()
+        stimulus_address_width = depth_width + template_values['stimulus_word_width']
+        response_address_width = depth_width + template_values['response_word_width']
+        template_values.update({'depth': self.depth, 'depth_width': depth_width,
+                                'stimulus_address_width': stimulus_address_width, 'stimulus_address_msb': stimulus_address_width - 1,
+                                'response_address_width': response_address_width, 'response_address_msb': response_address_width - 1})
+        return template_values
+
+    def xml_children(self, project):
+        return vector_xml_children(self)
+
+
+
+
+
+class StreamAdapter(Core):
+    '''
+    The stream adapter sits between two msgdma cores and the design: msgdma_stimulus_0 reads the stimulus vectors from the HPS SDRAM and streams them to the adapter, which applies each vector to the design and streams its response to msgdma_response_0, which writes it back to the HPS SDRAM.
+    The vectors are laid out by vector_layout(), the same layout as the memories of the vector sequencer, so the CPU only writes the descriptors.
+    The csr slave of the adapter and the csr and descriptor slaves of the msgdma cores are allocated in address_map, the registers of the csr slave are described in HDL_n_Tcl.py.
+    '''
+    module_name = 'stream_adapter'
+    HW_TCL = STREAM_ADAPTER_HW_TCL
+    HDL_SV = STREAM_ADAPTER_HDL_SV
+    # the span of the msgdma slaves, the descriptor slave has the standard descriptor format
+    DMA_SLAVE_SPANS = (('csr', 32), ('descriptor_slave', 16))
+
+    def __init__(self, name, pios, pio_width, address_map):
+        super().__init__(name)
+        self.width = pio_width
+        self.stimulus_pios, self.response_pios, self.stimulus_words, self.response_words = vector_layout(pios)
+        self.allocate_slave(address_map, 'csr', 4 * pio_width // 8)
+        self.dma_addresses = dict()
+        self.settings = list()
+        for dma in ('stimulus', 'response'):
+            for interface, span in self.DMA_SLAVE_SPANS:
+                address = address_map.allocate(f'msgdma_{dma}_0.{interface}', span)
+                self.dma_addresses[dma, interface] = address
+                self.settings.append((f'msgdma_{dma}_{interface}_address', f'{address}'))
+                print_log(f'INFO: msgdma_{dma}_0.{interface}: address {address}, span {span}')
+
+    def template_values(self):
+        return vector_template_values(self)
+
+    def xml_children(self, project):
+        return vector_xml_children(self)
+
+
+
+
+
+def generate_project_tcl(project, output_path = '', changed_files = None):
+    '''
+    The generate_project_tcl function creates a TCL script for adding VHDL files to a Quartus project from a parsed HDLGen project. It uses the component paths from mainPackage.hdlgen, constructs TCL commands, and includes the top module and MainPackage.vhd. The script is saved to a specified location.
+
+    Parameters:
+
+    project: HDLGenProject returned by parse_hdlgen_project().
+    output_path (optional): Directory to save the generated TCL script. Defaults to the current directory if not specified.
+    changed_files (optional): list to collect the path of the file if it is changed, see write_output_file().
+    '''
+    print_log('INFO: generate_project_tcl()')
     # Use TCL command `set_global_assignment -name VHDL_FILE path_of_the_hdl_file` to add those files into the Quartus project
     # Also add the MainPackage.vhd under the project folder into the Quartus project through the Tcl
-    
+
     # HDL_n_Tcl.py is a python module which store the Tcl script
     # the structure of DE10_NANO_SoC_GHRD.tcl will be like:
     #   QUARTUS_PROJECT_TCL_PART_1 (a string variable in HDL_n_Tcl.py which store the Tcl template)
@@ -122,77 +1201,305 @@ def generate_project_tcl(HDLGen_project_path, output_path = ''):
     #   QUARTUS_PROJECT_TCL_PART_2
     # then generate the DE10_NANO_SoC_GHRD.tcl
 
-    # load hdlgen project xml
-    project = minidom.parse(HDLGen_project_path)
-
-    # Extract package folder location
-    project_env = project.getElementsByTagName("environment")[0]
-    mainPackage_hdlgen_path = project_env.firstChild.data + r'\Package\mainPackage.hdlgen'
-    print_log(f'INFO: path of mainPackage.hdlgen: {mainPackage_hdlgen_path}')
-
-    # Parse mainPackage.hdlgen for component paths
-    main_package = minidom.parse(mainPackage_hdlgen_path)
-    components = main_package.getElementsByTagName("component")
-
-    vhdl_file_paths = list()
-    tcl_commands = list()
-
-    if components:
-        for component in components:
-            dir_tag = component.getElementsByTagName('dir')[0]
-            vhdl_path = dir_tag.firstChild.data.replace('\\','/')
-            vhdl_file_paths.append(vhdl_path)
-
-        # Construct TCL commands to add VHDL files to Quartus project
-        tcl_commands = [f'set_global_assignment -name VHDL_FILE {path}' for path in vhdl_file_paths]
+    # Construct TCL commands to add VHDL files to Quartus project
+    tcl_commands = [f'set_global_assignment -name VHDL_FILE {path}' for path in project.components]
 
     # And the top module itself to the commands
-    project_name = project.getElementsByTagName("name")[0].firstChild.data
-    top_module_vhdl_path = (project.getElementsByTagName('location')[0].firstChild.data + r'\VHDL\model' + f'\{project_name}.vhd').replace('\\','/')
+    top_module_vhdl_path = (project.location + r'\VHDL\model' + f'\{project.name}.vhd').replace('\\','/')
     tcl_commands.append(f'set_global_assignment -name VHDL_FILE {top_module_vhdl_path}')
 
     # Add MainPackage.vhd to the commands
-    main_package_vhd_path = (project_env.firstChild.data + r'\Package\MainPackage.vhd').replace('\\','/')
+    main_package_vhd_path = (project.environment + r'\Package\MainPackage.vhd').replace('\\','/')
     tcl_commands.append(f'set_global_assignment -name VHDL_FILE {main_package_vhd_path}')
 
     # Combine with template parts from HDL_n_Tcl.py
     full_tcl_script = "\n".join([QUARTUS_PROJECT_TCL_PART_1] + tcl_commands + [QUARTUS_PROJECT_TCL_PART_2])
 
     # Save the TCL scripr
-    with open(output_path + 'DE10_NANO_SoC_GHRD.tcl', 'w') as tcl_file:
-        tcl_file.write(full_tcl_script)    
+    write_output_file(output_path + 'DE10_NANO_SoC_GHRD.tcl', full_tcl_script, changed_files)
 
 
 
 
 
-def generate_top_module(design_name, ports, pios, connections, output_path = ''):
+class CycleCounter(Core):
+    '''
+    The cycle counter measures the design in clock cycles of the design clock, without the timing noise of the HPS.
+    The free_running slave reads a 64 bit counter of every clock cycle, the latched slave reads a 64 bit counter of the clock cycles between a start and a stop.
+    The HPS starts and stops the latched counter through the latched slave, and the gate input (high while a vector core is active) starts and stops it as well, so a run is measured exactly.
+    Both counters count the clock of the system: with a ClockControl they count the cycles the design is paused as well, the cycles the design is advanced by a step are the N written to the clock control.
+    The slaves are allocated in address_map, the registers are described in HDL_n_Tcl.py.
+    '''
+    module_name = 'cycle_counter'
+    HW_TCL = CYCLE_COUNTER_HW_TCL
+    HDL_SV = CYCLE_COUNTER_HDL_SV
+    SLAVE_SPANS = (('free_running', 8), ('latched', 16))
+
+    def __init__(self, name, address_map):
+        super().__init__(name)
+        for interface, span in self.SLAVE_SPANS:
+            self.allocate_slave(address_map, interface, span)
+
+
+
+
+
+class IrqPio(Core):
+    '''
+    The interrupt-capable pio: bit i of its irq input is the output port irq_port_indexes[i] of the design (any bit of the port high), a rising edge sets bit i of the edge capture register.
+    The interrupt goes to f2h_irq0 of hps_0 with irq_number, which is the GIC interrupt FIRST_GIC_INTERRUPT + irq_number of the HPS.
+    The ports are still read through their input pios as well. The slave is allocated in address_map, the registers are described in HDL_n_Tcl.py.
+    '''
+    module_name = 'pio_irq'
+    HW_TCL = PIO_IRQ_HW_TCL
+    HDL_SV = PIO_IRQ_HDL_SV
+    # f2h_irq0[0] is the shared peripheral interrupt 40, the GIC interrupt 72
+    FIRST_GIC_INTERRUPT = 72
+    MAX_IRQ_PORTS = 32
+
+    def __init__(self, name, irq_port_indexes, address_map, irq_number = 0):
+        super().__init__(name)
+        self.xml_tag = 'irq'
+        self.irq_port_indexes = irq_port_indexes
+        self.irq_number = irq_number
+        self.gic_interrupt = self.FIRST_GIC_INTERRUPT + irq_number
+        self.allocate_slave(address_map, 's0', 16)
+        print_log(f'INFO: {name}: irq {irq_number}')
+
+    def template_values(self):
+        irq_width = len(self.irq_port_indexes)
+        return {'irq_width': irq_width, 'irq_msb': irq_width - 1}
+
+    def xml_children(self, project):
+        children = super().xml_children(project) + [('irq_number', f'{self.irq_number}'), ('gic_interrupt', f'{self.gic_interrupt}')]
+        children += [('port_name', project.ports[port_index].name) for port_index in self.irq_port_indexes]
+        return children
+
+
+
+
+
+class PioSync(Core):
+    '''
+    The commit and snapshot strobes of the double-buffered pios: one write to its slave commits the staged words of every output pio in the same cycle,
+    and latches the design outputs of every input pio in the same cycle, so the design never sees a half written step and the reads never tear.
+    A snapshot is delayed by snapshot_delay cycles, so a commit and a snapshot in one write sees the design outputs of the committed inputs.
+    The slave is allocated in address_map, the register is described in HDL_n_Tcl.py.
+    '''
+    module_name = 'pio_sync'
+    HW_TCL = PIO_SYNC_HW_TCL
+    HDL_SV = PIO_SYNC_HDL_SV
+
+    def __init__(self, name, address_map, snapshot_delay = 2):
+        super().__init__(name)
+        self.snapshot_delay = snapshot_delay
+        self.allocate_slave(address_map, 's0', 4)
+        print_log(f'INFO: {name}: snapshot delay {snapshot_delay}')
+
+    def template_values(self):
+        return {'snapshot_delay': self.snapshot_delay}
+
+    def xml_children(self, project):
+        return super().xml_children(project) + [('snapshot_delay', f'{self.snapshot_delay}')]
+
+
+
+
+
+class ClockControl(Core):
+    '''
+    The clock control of the design: the design is clocked by the dut_clk output, the clock of the system through a clock control block of the device (cyclonev_clkena, as ALTCLKCTRL), glitch free and on a global clock network.
+    The HPS free-runs or pauses the design, or advances it exactly N cycles with one write, so a test sequence steps the design cycle by cycle without software sleeps.
+    The pios, the vector cores and the cycle counter stay on the clock of the system. The slave is allocated in address_map, the registers are described in HDL_n_Tcl.py.
+    '''
+    module_name = 'clock_control'
+    HW_TCL = CLOCK_CONTROL_HW_TCL
+    HDL_SV = CLOCK_CONTROL_HDL_SV
+
+    def __init__(self, name, address_map):
+        super().__init__(name)
+        self.allocate_slave(address_map, 's0', 8)
+
+
+
+
+
+def generate_sdc_file(project, pios, connections, output_path = '', changed_files = None, banks = None, read_latency = 0, multicycle = None, buffered = False, clock_control = None):
+    '''
+    This function writes DE10_NANO_SOC_GHRD.sdc, the sdc file of the Quartus project: the clocks in SDC_PART_1, then if multicycle is not None, a constraint for each pio path in the connection list.
+    If there is a clock_control, the design is clocked by its dut_clk, a generated clock of FPGA_CLK1_50 at the output of its clock gate, so the pio paths are related paths between two clocks.
+    The registers of an output pio drive the design, the design drives the read data registers of an input pio (the snapshot register if buffered is True),
+    or the read data register of its slave translator in the interconnect if the read path is combinational (the design reaches the interconnect only through the input pios).
+    These paths get a setup multicycle of multicycle cycles (and a hold multicycle of multicycle - 1), or false paths if multicycle is 0.
+    The pios of one burst pio bank share their registers, so they share one constraint.
+    The paths from the vector sequencer and the stream adapter to the design are not relaxed, they change every cycle.
+    '''
+    print_log('INFO: generate_sdc_file()')
+    generated_clocks = ''
+    if clock_control is not None:
+        generated_clocks = f'\ncreate_generated_clock -name dut_clk -source [get_ports {{FPGA_CLK1_50}}] [get_pins -compatibility_mode {{*{clock_control.instance_name}|dut_clock_gate|outclk}}]'
+    sdc_lines = list()
+    if multicycle is not None:
+        design_registers = f'[get_registers {{*my_{project.name}|*}}]'
+        bank_of_pio = {id(pio): bank for bank in banks or [] for pio in bank.pios}
+        ports_of_pio = dict()
+        for port_index, fragments in group_connections(connections):
+            for fragment in fragments:
+                ports_of_pio.setdefault(fragment[1], list()).append(project.ports[port_index].name)
+        # the pios and the ports of each path, in the order of the pios
+        path_pios = dict()
+        for pio_index, port_names in sorted(ports_of_pio.items()):
+            pio = pios[pio_index]
+            # the avalon slave instance which holds the registers of the pio
+            instance_name = bank_of_pio[id(pio)].pio_name if id(pio) in bank_of_pio else pio.pio_name
+            if pio.mode == 'out':
+                path = f'-from [get_registers {{*{instance_name}|pio_out[*]}}] -to {design_registers}'
+            elif buffered:
+                path = f'-from {design_registers} -to [get_registers {{*{instance_name}|pio_snapshot[*]}}]'
+            elif id(pio) in bank_of_pio:
+                path = f'-from {design_registers} -to [get_registers {{*{instance_name}|avs_s0_readdata[*]}}]'
+            elif read_latency:
+                path = f'-from {design_registers} -to [get_registers {{*{instance_name}|read_pipe[0][*]}}]'
+            else:
+                path = f'-from {design_registers} -to [get_registers {{*mm_interconnect_*|{instance_name}_s0_translator|av_readdata_pre[*]}}]'
+            path_pios.setdefault(path, list()).append((pio.pio_name, port_names))
+        if path_pios:
+            sdc_lines.append(SDC_PIO_PATHS_COMMENT)
+        for path, pio_ports in path_pios.items():
+            for pio_name, port_names in pio_ports:
+                sdc_lines.append(f'# {pio_name}: {", ".join(port_names)}')
+            if multicycle:
+                sdc_lines.append(f'set_multicycle_path -setup -end {path} {multicycle}')
+                sdc_lines.append(f'set_multicycle_path -hold -end {path} {multicycle - 1}')
+            else:
+                sdc_lines.append(f'set_false_path {path}')
+    write_output_file(output_path + 'DE10_NANO_SOC_GHRD.sdc', "\n".join([SDC_PART_1 % {'generated_clocks': generated_clocks}] + sdc_lines) + "\n", changed_files)
+
+
+
+
+
+def group_connections(connections):
+    '''
+    This function groups the connections by port, returns a list of (port index, fragments), the fragments of a port are its connections from the lowest port bit.
+    A connection without port lsb (the old 4-tuple) is treated as port lsb 0.
+    '''
+    fragments_of_port = dict()
+    for connection in connections:
+        fragments_of_port.setdefault(connection[0], list()).append(connection)
+    return [(port_index, sorted(fragments, key=lambda fragment: fragment[4] if len(fragment) > 4 else 0))
+            for port_index, fragments in sorted(fragments_of_port.items())]
+
+
+
+
+
+def generate_top_module(project, pios, connections, output_path = '', changed_files = None, banks = None, vector_cores = None, cycle_counter = None, irq_pio = None, pio_sync = None,
+                        clock_control = None):
     '''
     This function is to generate the top module of the entire soc system, which means connects user design to the Avalon MM bus
+    If banks is given, the soc system exports the burst pio banks, and the export of each pio is a slice of its bank's export.
+    vector_cores is a list of the cores which drive the design with test vectors (VectorSequencer, StreamAdapter): the inputs of the design are driven by the stimulus of the first active core, otherwise by the output pios, and the input pios are the response of every core.
+    If cycle_counter is given, its gate is high while any vector core is active.
+    If irq_pio is given, bit i of its irq input is high while any bit of its port i is high.
+    If pio_sync is given, its commit strobe goes to every output pio and its snapshot strobe to every input pio.
+    If clock_control is given, the design is clocked by its dut_clk, otherwise by fpga_clk_50.
     '''
     wires_list = list()
     component_list = list()
     soc_system_list = list()
+    # the signal which drives or is driven by the design, for each pio
+    dut_signal_names = [pio.export_name for pio in pios]
     for pio in pios:
-        wires_list.append(f'wire [63:0] {pio.export_name};')
-        soc_system_list.append(f'               .{pio.export_name}_export({pio.export_name}),')
-    component_list.append(f'{design_name} my_{design_name} (')
-    component_list.append('    .clk(fpga_clk_50),')
-    for connection in connections:
-        port_name = ports[connection[0]].name
-        export_name = pios[connection[1]].export_name
-        component_list.append(f'    .{port_name}({export_name}[{connection[2]}:{connection[3]}]),')
+        wires_list.append(f'wire [{pio.width - 1}:0] {pio.export_name};')
+    for bank in banks or []:
+        wires_list.append(f'wire [{bank.width * bank.words - 1}:0] {bank.export_name};')
+        for word, pio in enumerate(bank.pios):
+            word_slice = f'{bank.export_name}[{(word + 1) * bank.width - 1}:{word * bank.width}]'
+            if bank.mode == 'out':
+                wires_list.append(f'assign {pio.export_name} = {word_slice};')
+            else:
+                wires_list.append(f'assign {word_slice} = {pio.export_name};')
+        if bank.mode == 'in' and len(bank.pios) < bank.words:
+            unused_bits = (bank.words - len(bank.pios)) * bank.width
+            wires_list.append(f"assign {bank.export_name}[{bank.width * bank.words - 1}:{len(bank.pios) * bank.width}] = {{{unused_bits}{{1'b0}}}};")
+    for slave in banks or pios:
+        soc_system_list.append(f'               .{slave.export_name}_export({slave.export_name}),')
+    if pio_sync is not None:
+        strobes = {'out': 'commit', 'in': 'snapshot'}
+        for strobe in strobes.values():
+            wires_list.append(f'wire {pio_sync.instance_name}_{strobe};')
+            soc_system_list.append(f'               .{pio_sync.export_name}_{strobe}({pio_sync.instance_name}_{strobe}),')
+        for pio in pios:
+            strobe = strobes[pio.mode]
+            soc_system_list.append(f'               .{pio.export_name}_{strobe}({pio_sync.instance_name}_{strobe}),')
+    vector_cores = vector_cores or []
+    for core in vector_cores:
+        name = core.instance_name
+        width = core.width
+        wires_list.append(f'wire {name}_active;')
+        wires_list.append(f'wire [{width * core.stimulus_words - 1}:0] {name}_stimulus;')
+        wires_list.append(f'wire [{width * core.response_words - 1}:0] {name}_response;')
+        for word, pio in enumerate(core.response_pios):
+            wires_list.append(f'assign {name}_response[{(word + 1) * width - 1}:{word * width}] = {pio.export_name};')
+        if len(core.response_pios) < core.response_words:
+            unused_bits = (core.response_words - len(core.response_pios)) * width
+            wires_list.append(f"assign {name}_response[{width * core.response_words - 1}:{len(core.response_pios) * width}] = {{{unused_bits}{{1'b0}}}};")
+        for role in ('active', 'stimulus', 'response'):
+            soc_system_list.append(f'               .{core.export_name}_{role}({name}_{role}),')
+    if vector_cores:
+        # every core has the same stimulus layout, the word of an output pio is selected from the first active core
+        for word, pio in enumerate(vector_cores[0].stimulus_pios):
+            width = pio.width
+            dut_signal_name = f'{pio.export_name}_dut'
+            dut_signal_names[pios.index(pio)] = dut_signal_name
+            choices = [f'{core.instance_name}_active ? {core.instance_name}_stimulus[{(word + 1) * width - 1}:{word * width}] : ' for core in vector_cores]
+            wires_list.append(f'wire [{width - 1}:0] {dut_signal_name} = {"".join(choices)}{pio.export_name};')
+    if cycle_counter is not None:
+        gate = ' | '.join(f'{core.instance_name}_active' for core in vector_cores) or "1'b0"
+        soc_system_list.append(f'               .{cycle_counter.export_name}_gate({gate}),')
+    if clock_control is not None:
+        dut_clock = f'{clock_control.instance_name}_dut_clk'
+        wires_list.append(f'wire {dut_clock};')
+        soc_system_list.append(f'               .{clock_control.export_name}_dut_clk({dut_clock}),')
+    else:
+        dut_clock = 'fpga_clk_50'
+    component_list.append(f'{project.name} my_{project.name} (')
+    component_list.append(f'    .clk({dut_clock}),')
+    port_signals = dict()
+    for port_index, fragments in group_connections(connections):
+        port_name = project.ports[port_index].name
+        # a split port is the concatenation of its slices, the highest slice first
+        slices = [f'{dut_signal_names[fragment[1]]}[{fragment[2]}:{fragment[3]}]' for fragment in reversed(fragments)]
+        if len(slices) == 1:
+            port_signals[port_index] = slices[0]
+        else:
+            port_signals[port_index] = f'{{{", ".join(slices)}}}'
+        component_list.append(f'    .{port_name}({port_signals[port_index]}),')
     component_list.append(r');')
+    if irq_pio is not None:
+        irq_bits = [f'|{port_signals[port_index]}' for port_index in reversed(irq_pio.irq_port_indexes)]
+        soc_system_list.append(f'               .{irq_pio.export_name}_irq_in({{{", ".join(irq_bits)}}}),')
     top_module = "\n".join([TOP_MODULE_HDL_PART_1] + wires_list + component_list + [TOP_MODULE_HDL_PART_2] + soc_system_list + [TOP_MODULE_HDL_PART_3])
-    with open(output_path + 'DE10_NANO_SoC_GHRD.v', 'w') as verilog_file:
-        verilog_file.write(top_module)    
+    write_output_file(output_path + 'DE10_NANO_SoC_GHRD.v', top_module, changed_files)
 
 
 
 
 
-def generate_qsys_tcl(pios, output_path = ''):
-    print_log(f"INFO: generate_qsys_tcl()")
+def generate_qsys_tcl(project, pios, output_path = '', changed_files = None, address_map = None, banks = None, cores = None, stream_adapter = None, irq_pio = None):
+    '''
+    This function is to generate the soc_system.tcl, the qsys script which adds the pios of the project into the platform designer system
+    The ADDRESS_WIDTH of mm_bridge_0 is computed from address_map, if address_map is None, it is built from the address of the pios, and a ValueError is raised if two pios collide.
+    If banks is given, the burst pio banks are added instead of the pios, and mm_bridge_0 accepts bursts as long as the largest bank.
+    cores is a list of the other components (such as VectorSequencer) behind mm_bridge_0, a core has instance_name, module_name, export_name and slaves, the list of (interface name, base address, span).
+    If stream_adapter is given (it should be in cores as well), the msgdma cores of the streaming path are added and connected to it and to the SDRAM of hps_0.
+    If irq_pio is given (it should be in cores as well), its interrupt is connected to f2h_irq0 of hps_0.
+    '''
+    # the avalon slaves behind mm_bridge_0
+    slaves = banks or pios
+    cores = cores or []
+    print_log(f"INFO: generate_qsys_tcl() for {project.name}")
     # First, go through the list pios, add the instance according to the pio name in pios
     # Go through the list pios, generate the interface according to the export_name and pio_name.pio_mode in pios
     # Go through the list pios, generate the connection according to the address in pios
@@ -209,12 +1516,16 @@ def generate_qsys_tcl(pios, output_path = ''):
     set_connection_list.append(r'''add_connection clk_0.clk hps_0.h2f_axi_clock
 
 add_connection clk_0.clk mm_bridge_0.clk''')
-    for pio in pios:
+    for pio in slaves:
          set_connection_list.append(f'add_connection clk_0.clk {pio.pio_name}.clock')
+    for core in cores:
+         set_connection_list.append(f'add_connection clk_0.clk {core.instance_name}.clock')
 
     set_connection_list.append(r'add_connection clk_0.clk_reset mm_bridge_0.reset')
-    for pio in pios:
+    for pio in slaves:
          set_connection_list.append(f'add_connection clk_0.clk_reset {pio.pio_name}.reset')
+    for core in cores:
+         set_connection_list.append(f'add_connection clk_0.clk_reset {core.instance_name}.reset')
 
     set_connection_list.append(r'''
 add_connection hps_0.h2f_axi_master mm_bridge_0.s0
@@ -223,13 +1534,13 @@ set_connection_parameter_value hps_0.h2f_axi_master/mm_bridge_0.s0 baseAddress {
 set_connection_parameter_value hps_0.h2f_axi_master/mm_bridge_0.s0 defaultConnection {0}
                                ''')
     
-    for pio in pios:
+    for pio in slaves:
         # add_instance pio64_in_0 pio64_in 1.0
-        set_instance_list.append(f'add_instance {pio.pio_name} pio64_{pio.mode} 1.0')
+        set_instance_list.append(f'add_instance {pio.pio_name} {pio.module_name} 1.0')
         # add_interface fifocontrolsignal conduit end
         # set_interface_property fifocontrolsignal EXPORT_OF pio64_out_1.pio64_out
         set_interface_list.append(f'add_interface {pio.export_name} conduit name')
-        set_interface_list.append(f'set_interface_property {pio.export_name} EXPORT_OF {pio.pio_name}.pio64_{pio.mode}')
+        set_interface_list.append(f'set_interface_property {pio.export_name} EXPORT_OF {pio.pio_name}.{pio.module_name}')
         # connection
         set_connection_list.append(f'add_connection mm_bridge_0.m0 {pio.pio_name}.s0')
         set_connection_list.append(f'set_connection_parameter_value mm_bridge_0.m0/{pio.pio_name}.s0 arbitrationPriority {1}')
@@ -238,6 +1549,25 @@ set_connection_parameter_value hps_0.h2f_axi_master/mm_bridge_0.s0 defaultConnec
         print_log(f'INFO: pio address hex: {hex_str}')
         set_connection_list.append(f'set_connection_parameter_value mm_bridge_0.m0/{pio.pio_name}.s0 baseAddress {hex_str}')
         set_connection_list.append(f'set_connection_parameter_value mm_bridge_0.m0/{pio.pio_name}.s0 defaultConnection {0}')
+    for core in cores:
+        set_instance_list.append(f'add_instance {core.instance_name} {core.module_name} 1.0')
+        set_interface_list.append(f'add_interface {core.export_name} conduit name')
+        set_interface_list.append(f'set_interface_property {core.export_name} EXPORT_OF {core.instance_name}.{core.module_name}')
+        for interface, address, span in core.slaves:
+            slave_name = f'{core.instance_name}.{interface}'
+            set_connection_list.append(f'add_connection mm_bridge_0.m0 {slave_name}')
+            set_connection_list.append(f'set_connection_parameter_value mm_bridge_0.m0/{slave_name} arbitrationPriority {1}')
+            hex_str = '{0x'+f"{address:04x}"+'}'
+            set_connection_list.append(f'set_connection_parameter_value mm_bridge_0.m0/{slave_name} baseAddress {hex_str}')
+            set_connection_list.append(f'set_connection_parameter_value mm_bridge_0.m0/{slave_name} defaultConnection {0}')
+    if stream_adapter is not None:
+        set_connection_list.append(QSYS_TCL_MSGDMA % {'data_width': stream_adapter.width, 'adapter': stream_adapter.instance_name,
+                                                      'stimulus_csr': stream_adapter.dma_addresses['stimulus', 'csr'],
+                                                      'stimulus_descriptor': stream_adapter.dma_addresses['stimulus', 'descriptor_slave'],
+                                                      'response_csr': stream_adapter.dma_addresses['response', 'csr'],
+                                                      'response_descriptor': stream_adapter.dma_addresses['response', 'descriptor_slave']})
+    if irq_pio is not None:
+        set_connection_list.append(QSYS_TCL_IRQ % {'instance': irq_pio.instance_name, 'irq_number': irq_pio.irq_number})
     # add_interface hps_0_h2f_reset reset source
     # set_interface_property hps_0_h2f_reset EXPORT_OF hps_0.h2f_reset
     # add_interface memory conduit end
@@ -257,17 +1587,78 @@ set_interconnect_requirement {$system} {qsys_mm.maxAdditionalLatency} {1}
     # qsys_tcl_end_2 = r'save_system {' + output_path + r'soc_system.qsys}'
     qsys_tcl_end_2 = r'save_system {soc_system.qsys}'
 
-    full_qsys_tcl_script = "\n".join([QSYS_TCL_PART_1] + set_instance_list + set_interface_list + set_connection_list + [qsys_tcl_end_1, qsys_tcl_end_2])
-    with open(output_path + 'soc_system.tcl', 'w') as tcl_file:
-        tcl_file.write(full_qsys_tcl_script)    
+    if address_map is None:
+        address_map = AddressMap()
+        for pio in slaves:
+            address_map.reserve(pio.pio_name, pio.address, pio.span)
+        for core in cores:
+            for interface, address, span in core.slaves:
+                address_map.reserve(f'{core.instance_name}.{interface}', address, span)
+        if stream_adapter is not None:
+            for (dma, interface), address in stream_adapter.dma_addresses.items():
+                address_map.reserve(f'msgdma_{dma}_0.{interface}', address, dict(StreamAdapter.DMA_SLAVE_SPANS)[interface])
+    # the mm bridge has the same data width as the pios, and it is wide enough to reach every slave
+    data_width = max((pio.width for pio in pios), default=64)
+    address_width = address_map.address_width()
+    print_log(f'INFO: mm_bridge_0 address width: {address_width}')
+    max_burst_size = max((bank.words for bank in banks or []), default=1)
+    qsys_tcl_part_1 = QSYS_TCL_PART_1 + QSYS_TCL_MM_BRIDGE % {'data_width': data_width, 'address_width': address_width, 'max_burst_size': max_burst_size}
 
+    full_qsys_tcl_script = "\n".join([qsys_tcl_part_1] + set_instance_list + set_interface_list + set_connection_list + [qsys_tcl_end_1, qsys_tcl_end_2])
+    write_output_file(output_path + 'soc_system.tcl', full_qsys_tcl_script, changed_files)
 
 
 
 
-def generate_xml_file(ports, pios, connections, testbench, output_path = ''):
+
+def append_fragment_elements(doc, parent_element, pio, connection):
+    '''
+    This function appends the address, start bit and end bit node of a connection under parent_element
+    '''
+    # create address node
+    address = doc.createElement('address')
+    address_txt = doc.createTextNode(f'{pio.address}')
+    address.appendChild(address_txt)
+    parent_element.appendChild(address)
+    # create start bit node
+    start_bit = doc.createElement('start_bit')
+    start_bit_txt = doc.createTextNode(f'{connection[2]}')
+    start_bit.appendChild(start_bit_txt)
+    parent_element.appendChild(start_bit)
+    # create end bit node
+    end_bit = doc.createElement('end_bit')
+    end_bit_txt = doc.createTextNode(f'{connection[3]}')
+    end_bit.appendChild(end_bit_txt)
+    parent_element.appendChild(end_bit)
+
+
+
+
+
+def append_text_elements(doc, parent_element, children):
+    '''
+    This function appends an element with a text node under parent_element for each (tag, text) in children
+    '''
+    for tag, text in children:
+        child = doc.createElement(tag)
+        child.appendChild(doc.createTextNode(text))
+        parent_element.appendChild(child)
+
+
+
+
+
+def generate_xml_file(project, pios, connections, output_path = '', changed_files = None, access_groups = None, address_map = None, vector_cores = None, cycle_counter = None, irq_pio = None,
+                      pio_sync = None, clock_control = None):
     '''
     This function is to generate a xml file, this file will be transferred to DE10 Nano, then the python program in the DE10 Nano will interpret this xml file, and set up the map of connection.
+    For each access group, an access_group element lists its ports and the addresses of the pios they are in, so a whole test step can be written and read with one transaction per address.
+    If address_map is given, an address_map element lists the address width and every slave (name, base address and span in bytes) behind mm_bridge_0.
+    For each core in vector_cores, an element named after the core (vector_sequencer or stream_adapter) lists its settings, the address of its slaves and the address of the pio of each word of the stimulus and the response vector.
+    If cycle_counter is given, a cycle_counter element lists the address of its free_running and latched slaves.
+    If irq_pio is given, an irq element lists its address, its irq number on f2h_irq0, its GIC interrupt and the port of each bit.
+    If pio_sync is given, a pio_sync element lists its address and snapshot delay, the output pios are applied and the input pios are latched by writing it.
+    If clock_control is given, a clock_control element lists its address, the design is free-run, paused and stepped by writing it.
     '''
     doc = minidom.Document()
     # create the root element: soc_system, which is the parent of design and testbench
@@ -276,9 +1667,9 @@ def generate_xml_file(ports, pios, connections, testbench, output_path = ''):
     # create the element: design
     design_element = doc.createElement('design')
     root_element.appendChild(design_element)
-    for connection in connections:
-        port = ports[connection[0]]
-        pio = pios[connection[1]]
+    for port_index, fragments in group_connections(connections):
+        port = project.ports[port_index]
+        pio = pios[fragments[0][1]]
         # create port node
         port_element = doc.createElement('port')
         design_element.appendChild(port_element)
@@ -287,41 +1678,289 @@ def generate_xml_file(ports, pios, connections, testbench, output_path = ''):
         name_txt = doc.createTextNode(port.name)
         port_name.appendChild(name_txt) # add the text into the port name node
         port_element.appendChild(port_name) # add the node under its parent
-        # create address node, child of port
-        address = doc.createElement('address')
-        address_txt = doc.createTextNode(f'{pio.address}')
-        address.appendChild(address_txt)
-        port_element.appendChild(address)
-        # create start bit node, child of port
-        start_bit = doc.createElement('start_bit')
-        start_bit_txt = doc.createTextNode(f'{connection[2]}')
-        start_bit.appendChild(start_bit_txt)
-        port_element.appendChild(start_bit)
-        # create end bit node, child of port
-        end_bit = doc.createElement('end_bit')
-        end_bit_txt = doc.createTextNode(f'{connection[3]}')
-        end_bit.appendChild(end_bit_txt)
-        port_element.appendChild(end_bit)
+        if len(fragments) == 1:
+            # create address, start bit and end bit node, child of port
+            append_fragment_elements(doc, port_element, pio, fragments[0])
+        else:
+            # a split port has a width node and a fragment node for each slice, from the lowest port bit
+            # the board software rebuilds the value as the sum of (slice value << port_lsb)
+            width = doc.createElement('width')
+            width.appendChild(doc.createTextNode(f'{port.width}'))
+            port_element.appendChild(width)
+            for fragment in fragments:
+                fragment_element = doc.createElement('fragment')
+                port_element.appendChild(fragment_element)
+                append_fragment_elements(doc, fragment_element, pios[fragment[1]], fragment)
+                port_lsb = doc.createElement('port_lsb')
+                port_lsb.appendChild(doc.createTextNode(f'{fragment[4]}'))
+                fragment_element.appendChild(port_lsb)
         # create mode node, child of port
         pio_mode = doc.createElement('pio_mode')
         pio_mode_txt = doc.createTextNode(pio.mode)
         pio_mode.appendChild(pio_mode_txt)
         port_element.appendChild(pio_mode)
+        # create pio width node, child of port
+        pio_width = doc.createElement('pio_width')
+        pio_width_txt = doc.createTextNode(f'{pio.width}')
+        pio_width.appendChild(pio_width_txt)
+        port_element.appendChild(pio_width)
+    # create the element: access_group, child of design
+    for group_mode, group in split_access_groups(project.ports, access_groups or []):
+        group_element = doc.createElement('access_group')
+        design_element.appendChild(group_element)
+        group_pios = sorted({connection[1] for connection in connections if connection[0] in group})
+        pio_mode = doc.createElement('pio_mode')
+        pio_mode.appendChild(doc.createTextNode(group_mode))
+        group_element.appendChild(pio_mode)
+        for pio_index in group_pios:
+            address = doc.createElement('address')
+            address.appendChild(doc.createTextNode(f'{pios[pio_index].address}'))
+            group_element.appendChild(address)
+        for port_index in group:
+            port_name = doc.createElement('port_name')
+            port_name.appendChild(doc.createTextNode(project.ports[port_index].name))
+            group_element.appendChild(port_name)
+    # create the element: address_map
+    if address_map is not None:
+        address_map_element = doc.createElement('address_map')
+        root_element.appendChild(address_map_element)
+        address_width = doc.createElement('address_width')
+        address_width.appendChild(doc.createTextNode(f'{address_map.address_width()}'))
+        address_map_element.appendChild(address_width)
+        for base, span, name in address_map.slaves:
+            slave_element = doc.createElement('slave')
+            address_map_element.appendChild(slave_element)
+            append_text_elements(doc, slave_element, [('name', name), ('base', f'{base}'), ('span', f'{span}')])
+    # create the element of each core: vector_sequencer, stream_adapter, cycle_counter, irq, pio_sync and clock_control
+    for core in list(vector_cores or []) + [core for core in (cycle_counter, irq_pio, pio_sync, clock_control) if core is not None]:
+        core_element = doc.createElement(core.xml_tag)
+        root_element.appendChild(core_element)
+        append_text_elements(doc, core_element, core.xml_children(project))
     # create the element: test bench
     testbench_element = doc.createElement('testbench')
-    testbench_txt = doc.createTextNode(testbench)
+    testbench_txt = doc.createTextNode(project.testbench)
     testbench_element.appendChild(testbench_txt)
     root_element.appendChild(testbench_element)
 
     xml_str = doc.toprettyxml(indent="\t")
 
-    with open(output_path + "soc_system.xml", "w") as f:
-        f.write(xml_str)
+    write_output_file(output_path + "soc_system.xml", xml_str, changed_files)
         
         
 
 
 
+def port_lane_fragments(pios, connections):
+    '''
+    This function returns the list of (port index, pio mode, lane fragments) of the connected ports, in the order of soc_system.xml.
+    '''
+    port_fragments = list()
+    for port_index, fragments in group_connections(connections):
+        lane_fragments = list()
+        for fragment in fragments:
+            port_lsb = fragment[4] if len(fragment) > 4 else 0
+            lane_fragments += split_lane_fragment(pios[fragment[1]].address, fragment[3], port_lsb, fragment[2] - fragment[3] + 1)
+        port_fragments.append((port_index, pios[fragments[0][1]].mode, lane_fragments))
+    return port_fragments
+
+
+
+
+
+def generate_manifest_file(project, pios, connections, output_path = '', changed_files = None, address_map = None, cores = None):
+    '''
+    This function writes soc_system.bin, the binary manifest of soc_system.xml, so the board software memory maps it and uses its tables without parsing.
+    The header is followed by the port table (the ports in the order of soc_system.xml), the fragment table (the 64 bit lane fragments of every port, with their masks),
+    the pio table, the slave table of address_map, the strings (utf-8 names, referred by offset and size), the testbench text,
+    the core table (the cycle counter, the irq pio, the pio sync and the clock control in cores) and the core port table, the layouts are the MANIFEST_* of de10nano_lanes.
+    '''
+    print_log('INFO: generate_manifest_file()')
+    strings = bytearray()
+
+    def add_string(text):
+        encoded = text.encode('utf-8')
+        strings.extend(encoded)
+        return len(strings) - len(encoded), len(encoded)
+
+    mode_codes = {mode: code for code, mode in enumerate(de10nano_lanes.MANIFEST_MODES)}
+    port_table = bytearray()
+    fragment_table = bytearray()
+    fragment_count = 0
+    port_fragments = port_lane_fragments(pios, connections)
+    for port_index, mode, lane_fragments in port_fragments:
+        port = project.ports[port_index]
+        for lane_address, lane_lsb, port_lane, port_shift, bits in lane_fragments:
+            fragment_table += MANIFEST_FRAGMENT.pack((1 << bits) - 1, lane_address, lane_lsb, port_lane, port_shift, bits)
+        name_offset, name_size = add_string(port.name)
+        port_table += MANIFEST_PORT.pack(name_offset, name_size, mode_codes[mode], 0, port.width, fragment_count, len(lane_fragments))
+        fragment_count += len(lane_fragments)
+    pio_table = bytearray()
+    for pio in pios:
+        name_offset, name_size = add_string(pio.pio_name)
+        pio_table += MANIFEST_PIO.pack(name_offset, name_size, pio.address, pio.width, mode_codes[pio.mode], 0)
+    slave_table = bytearray()
+    slaves = address_map.slaves if address_map is not None else [(pio.address, pio.span, pio.pio_name) for pio in pios]
+    for base, span, name in slaves:
+        name_offset, name_size = add_string(name)
+        slave_table += MANIFEST_SLAVE.pack(name_offset, name_size, base, span)
+    if address_map is not None:
+        address_width = address_map.address_width()
+    else:
+        address_width = max(1, (max((pio.address + pio.span for pio in pios), default=1) - 1).bit_length())
+    testbench = (project.testbench or '').encode('utf-8')
+    # the row of each port in the port table
+    port_row = {port_index: row for row, (port_index, mode, lane_fragments) in enumerate(port_fragments)}
+    core_table = bytearray()
+    core_port_table = bytearray()
+    core_port_count = 0
+    for core in cores or []:
+        if core.module_name == 'pio_irq':
+            parameter, core_ports = core.irq_number, [port_row[port_index] for port_index in core.irq_port_indexes]
+        elif core.module_name == 'pio_sync':
+            parameter, core_ports = core.snapshot_delay, list()
+        else:
+            parameter, core_ports = 0, list()
+        for row in core_ports:
+            core_port_table += MANIFEST_CORE_PORT.pack(row)
+        name_offset, name_size = add_string(core.instance_name)
+        core_table += MANIFEST_CORE.pack(name_offset, name_size, de10nano_lanes.MANIFEST_CORE_KINDS.index(core.module_name), 0, core.slaves[0][1], parameter,
+                                         core_port_count, len(core_ports))
+        core_port_count += len(core_ports)
+
+    # the tables follow the header in this order, each one aligned to 8 bytes
+    blobs = [port_table, fragment_table, pio_table, slave_table, strings, testbench, core_table, core_port_table]
+    offsets = list()
+    offset = MANIFEST_HEADER.size
+    for blob in blobs:
+        offset = -(-offset // 8) * 8
+        offsets.append(offset)
+        offset += len(blob)
+    header_values = {'magic': de10nano_lanes.MANIFEST_MAGIC, 'version': de10nano_lanes.MANIFEST_VERSION, 'address_width': address_width,
+                     'port_count': len(port_fragments), 'port_offset': offsets[0], 'fragment_count': fragment_count, 'fragment_offset': offsets[1],
+                     'pio_count': len(pios), 'pio_offset': offsets[2], 'slave_count': len(slaves), 'slave_offset': offsets[3],
+                     'strings_offset': offsets[4], 'strings_size': len(strings), 'testbench_offset': offsets[5], 'testbench_size': len(testbench),
+                     'core_count': len(cores or []), 'core_offset': offsets[6], 'core_port_count': core_port_count, 'core_port_offset': offsets[7]}
+    header = MANIFEST_HEADER.pack(*(header_values[name] for name, code in de10nano_lanes.MANIFEST_HEADER))
+    manifest = bytearray(header)
+    for blob, blob_offset in zip(blobs, offsets):
+        manifest += bytes(blob_offset - len(manifest)) + blob
+    write_output_file(output_path + 'soc_system.bin', bytes(manifest), changed_files)
+
+
+
+
+
+def npy_bytes(rows, columns):
+    '''
+    This function returns the .npy file (format 1.0) of a (len(rows), columns) uint64 array, so the board software loads it with numpy.load(), memory mapped if it likes, and the generator needs no numpy
+    '''
+    header = "{'descr': '<u8', 'fortran_order': False, 'shape': (%d, %d), }" % (len(rows), columns)
+    # the header is padded with spaces and ends with a newline, so the data starts at a multiple of 64 bytes
+    header += ' ' * (-(len(header) + 11) % 64) + '\n'
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1') + b''.join(struct.pack(f'<{columns}Q', *row) for row in rows)
+
+
+
+
+
+def compile_testbench(project, pios, connections):
+    '''
+    This function compiles the test table of the TBNote into packed 64 bit lanes, with the bit layout of the pios, once on the host.
+    Returns (stimulus, expected, mask, stimulus lanes, response lanes), stimulus, expected and mask are the lists of the lane rows of each test step,
+    stimulus has a column for each of the stimulus lanes (the output pio lanes), expected and mask for each of the response lanes (the input pio lanes),
+    the lanes are in the order of de10nano_lanes.lane_addresses(), the same as the out_lane_addresses and in_lane_addresses of the Manifest of de10nano_runtime.
+    An input of the design without a value in a step keeps its value of the step before (0 at first), the bits of an output without a value are 0 in the mask.
+    '''
+    port_indexes, rows = parse_testbench_table(project.testbench, project.ports)
+    assert rows or not (project.testbench or '').strip(), f'ERROR: no test step is found in the TBNote of {project.name}, the test table needs a header naming the ports, with its columns separated by tabs, "|", "," or aligned spaces'
+    port_fragments = {port_index: (mode, lane_fragments) for port_index, mode, lane_fragments in port_lane_fragments(pios, connections)}
+    addresses = lane_addresses(port_fragments.values())
+    column_of_address = {mode: {address: column for column, address in enumerate(mode_addresses)} for mode, mode_addresses in addresses.items()}
+
+    def pack(lanes, mode, lane_fragments, value):
+        for lane_address, lane_lsb, port_lane, port_shift, bits in lane_fragments:
+            lanes[column_of_address[mode][lane_address]] |= ((value >> (port_lane * LANE_WIDTH + port_shift)) & ((1 << bits) - 1)) << lane_lsb
+
+    # the columns of the table which are connected ports
+    columns = [(column, port_index) for column, port_index in enumerate(port_indexes) if port_index in port_fragments]
+    stimulus = list()
+    expected = list()
+    mask = list()
+    input_values = dict()
+    for row in rows:
+        stimulus_lanes = [0] * len(addresses['out'])
+        expected_lanes = [0] * len(addresses['in'])
+        mask_lanes = [0] * len(addresses['in'])
+        for column, port_index in columns:
+            mode, lane_fragments = port_fragments[port_index]
+            value = row[column]
+            if mode == 'out':
+                if value is not None:
+                    input_values[port_index] = value & ((1 << project.ports[port_index].width) - 1)
+            elif value is not None:
+                pack(expected_lanes, mode, lane_fragments, value & ((1 << project.ports[port_index].width) - 1))
+                pack(mask_lanes, mode, lane_fragments, (1 << project.ports[port_index].width) - 1)
+        for port_index, value in input_values.items():
+            pack(stimulus_lanes, 'out', port_fragments[port_index][1], value)
+        stimulus.append(stimulus_lanes)
+        expected.append(expected_lanes)
+        mask.append(mask_lanes)
+    print_log(f'INFO: {len(rows)} test steps compiled, {len(addresses["out"])} stimulus lanes, {len(addresses["in"])} response lanes')
+    return stimulus, expected, mask, len(addresses['out']), len(addresses['in'])
+
+
+
+
+
+def generate_testbench_files(project, pios, connections, output_path = '', changed_files = None):
+    '''
+    This function writes the test table compiled by compile_testbench() as testbench_stimulus.npy, testbench_expected.npy and testbench_mask.npy,
+    the board software streams the stimulus rows to the bridge and compares the responses with (response & mask) == expected, without interpreting the TBNote.
+    '''
+    print_log('INFO: generate_testbench_files()')
+    stimulus, expected, mask, stimulus_columns, response_columns = compile_testbench(project, pios, connections)
+    write_output_file(output_path + 'testbench_stimulus.npy', npy_bytes(stimulus, stimulus_columns), changed_files)
+    write_output_file(output_path + 'testbench_expected.npy', npy_bytes(expected, response_columns), changed_files)
+    write_output_file(output_path + 'testbench_mask.npy', npy_bytes(mask, response_columns), changed_files)
+
+
+
+
+
+def remove_stale_files(path, changed_files):
+    '''
+    This function removes the files generated by an earlier run under path which are not generated any more, such as the ip of a core which is not used now.
+    The generated files (relative to path) are listed in GENERATED_FILES_LIST under path, only the files in that list are ever removed, and the removed files are appended to changed_files.
+    changed_files is the ChangedFiles of this run, every other file has been written already.
+    '''
+    list_path = path + GENERATED_FILES_LIST
+    generated = {file_path[len(path):] for file_path in changed_files.generated}
+    previous = set()
+    if os.path.exists(list_path):
+        with open(list_path) as list_file:
+            previous = {line.strip() for line in list_file if line.strip()}
+    for file_name in sorted(previous - generated):
+        # never outside path, whatever the list says
+        if os.path.isabs(file_name) or '..' in re.split(r'[\\/]', file_name):
+            continue
+        file_path = path + file_name
+        if os.path.isfile(file_path):
+            os.remove(file_path)
+            print_log(f'INFO: removed: {file_path}')
+            changed_files.append(file_path)
+            # the folder of the ip of a core, once it is empty
+            folder = os.path.dirname(file_path)
+            if os.path.normpath(folder) != os.path.normpath(path or '.'):
+                try:
+                    os.rmdir(folder)
+                except OSError:
+                    pass
+    write_output_file(list_path, ''.join(f'{file_name}\n' for file_name in sorted(generated)), changed_files)
+
+
+
+
+
 def run_command(command, description):
     try:
         result = subprocess.run(command, shell=True, check=True)
@@ -358,18 +1997,19 @@ def compile_programable_file(quartus_path, qsys_script_path, qsys_generate_path,
 
 
 # this project_path end with \
-def generate_bat_file(quartus_path, qsys_script_path, qsys_generate_path, quartus_cpf_path, TopModuleName, project_path=''):
+def generate_bat_file(quartus_path, qsys_script_path, qsys_generate_path, quartus_cpf_path, TopModuleName, project_path='', changed_files = None):
 
 
     bat_file_path = f'{project_path}generate_and_program.bat'
 
-    with open(bat_file_path, 'w') as bat_file:
-        bat_file.write(f'"{quartus_path}" -t DE10_NANO_SoC_GHRD.tcl\n')
-        bat_file.write(f'"{qsys_script_path}" --script=soc_system.tcl\n')
-        bat_file.write(f'"{qsys_generate_path}" --synthesis=VHDL soc_system.qsys\n')
-        bat_file.write(f'"{quartus_path}" --flow compile "DE10_NANO_SoC_GHRD.qpf"\n')
-        bat_file.write(f'"{quartus_cpf_path}" -c "output_files\\DE10_NANO_SoC_GHRD.sof" {TopModuleName}.rbf\n')
-        bat_file.write(f'pause\n')
+    bat_lines = list()
+    bat_lines.append(f'"{quartus_path}" -t DE10_NANO_SoC_GHRD.tcl\n')
+    bat_lines.append(f'"{qsys_script_path}" --script=soc_system.tcl\n')
+    bat_lines.append(f'"{qsys_generate_path}" --synthesis=VHDL soc_system.qsys\n')
+    bat_lines.append(f'"{quartus_path}" --flow compile "DE10_NANO_SoC_GHRD.qpf"\n')
+    bat_lines.append(f'"{quartus_cpf_path}" -c "output_files\\DE10_NANO_SoC_GHRD.sof" {TopModuleName}.rbf\n')
+    bat_lines.append(f'pause\n')
+    write_output_file(bat_file_path, ''.join(bat_lines), changed_files)
 
     print_log("INFO: Batch file 'generate_and_program.bat' has been successfully created.")
 
@@ -377,42 +2017,96 @@ def generate_bat_file(quartus_path, qsys_script_path, qsys_generate_path, quartu
 
 
 
-def de10nano_project_generator(HDLGen_project_path, path, quartus_path, qsys_script_path, qsys_generate_path, quartus_cpf_path):
+def de10nano_project_generator(HDLGen_project_path, path, quartus_path, qsys_script_path, qsys_generate_path, quartus_cpf_path, cache = None, options = None):
+    '''
+    This function generates the whole Quartus/Qsys project of the HDLGen project under the folder path.
+    If a ProjectCache is given as cache, an unchanged project is loaded from the cache instead of parsing the xml.
+    Only the files whose content changed are rewritten, and the files generated by an earlier run which are not generated any more are removed,
+    the list of those files (a ChangedFiles) is returned, so the later build steps can be skipped when it is empty.
+    options (optional) is a GeneratorOptions.
+    '''
     print_log(f"INFO: de10nano_project_generator()")
-    project = minidom.parse(HDLGen_project_path)
-    design_name = project.getElementsByTagName('name')[0].firstChild.data
-    connection_list = list()
-    ports = list()
-    pios = list()
-    entity_ioports = project.getElementsByTagName("entityIOPorts")[0]
-    for signal in entity_ioports.getElementsByTagName("signal"):
-        # got signal information from project xml
-        name = signal.getElementsByTagName("name")[0].firstChild.data
-        if name == 'clk':
-            print_log('INFO: clk detected')
-            continue
-        mode = signal.getElementsByTagName("mode")[0].firstChild.data
-        type_str = signal.getElementsByTagName("type")[0].firstChild.data 
-        description = signal.getElementsByTagName("description")[0].firstChild.data 
-        # save the port infromation in the list
-        port = Port(name, mode, type_str, description)
-        print_log(f"INFO: signal name: {port.name}, signal mode: {port.mode}, signal type: {port.type_str}, signal width: {port.width}")
-
-        ports.append(port)
-        #   if:
-        #       1, no pio exist yet
-        #       2, pio don't have enough bit
-        #       3, the existing pio direction is not suitable for this port
-        #   need to create a new pio
-        if len(pios) == 0 or pios[-1].mode != mode_convert(port.mode) or port.width > pios[-1].available_bit + 1:
-            pio = Pio(f"pio_{mode_convert(port.mode)}_{len(pios)}", mode_convert(port.mode), int(8*len(pios)))
-            pios.append(pio)
-        start_bit = pio.available_bit
-        pios[-1].connect(port.width)
-        end_bit = pio.available_bit + 1
-        connection_list.append((len(ports) - 1, len(pios) - 1, start_bit, end_bit))
-        print_log(f"INFO: port index: {len(ports) - 1}, pio index: {len(pios) - 1}, start bit: {start_bit}, end bit: {end_bit}")
-    
+    # parse the project only once, every generate_* function below uses this project
+    project = parse_hdlgen_project(HDLGen_project_path, cache)
+    design_name = project.name
+    ports = project.ports
+    if options is None:
+        options = GeneratorOptions()
+
+    # the ports which are accessed together should be in the same pio
+    if options.access_hint is None:
+        access_groups = derive_access_groups(project) if options.access_from_testbench else list()
+    else:
+        port_index_of_name = {port.name: port_index for port_index, port in enumerate(ports)}
+        for group in options.access_hint:
+            for port_name in group:
+                assert port_name in port_index_of_name, f'ERROR: access hint port {port_name} is not a port of {design_name}'
+        access_groups = [[port_index_of_name[port_name] for port_name in group] for group in options.access_hint]
+    # a group with input and output ports is accessed by one write and one read, each of them is a group of its own
+    access_groups = [group for pio_mode, group in split_access_groups(ports, merge_access_groups(access_groups))]
+
+    # the width of the pios and the mm bridge
+    if options.pio_width is None:
+        pio_width = choose_pio_width(ports, access_groups)
+    else:
+        assert options.pio_width in PIO_WIDTHS, f'ERROR: pio width {options.pio_width} is not supported, it should be one of {PIO_WIDTHS}'
+        pio_width = options.pio_width
+    print_log(f'INFO: pio width: {pio_width}')
+    address_map = AddressMap()
+    assert options.burst_size in BURST_SIZES, f'ERROR: burst size {options.burst_size} is not supported, it should be one of {BURST_SIZES}'
+    assert options.read_latency in READ_LATENCIES, f'ERROR: read latency {options.read_latency} is not supported, it should be one of {READ_LATENCIES}'
+    if options.burst_size > 1:
+        # the pios are placed in the burst pio banks, only the banks are in the address map
+        pios, connection_list = allocate_pios(ports, access_groups, pio_width)
+        banks = assign_pio_banks(pios, options.burst_size, address_map)
+    else:
+        pios, connection_list = allocate_pios(ports, access_groups, pio_width, address_map)
+        banks = None
+    if options.vector_depth is not None:
+        depth = options.vector_depth
+        assert depth >= 2 and depth & (depth - 1) == 0, f'ERROR: vector depth {depth} should be a power of two'
+        sequencer = VectorSequencer('vector_sequencer_0', pios, pio_width, depth, address_map)
+        assert sequencer.ram_bits <= MAX_VECTOR_RAM_BITS, f'ERROR: the vector sequencer needs {sequencer.ram_bits} bits of on-chip memory, more than {MAX_VECTOR_RAM_BITS}'
+    else:
+        sequencer = None
+    if options.dma_stream:
+        stream_adapter = StreamAdapter('stream_adapter_0', pios, pio_width, address_map)
+    else:
+        stream_adapter = None
+    # the cores which drive the design with test vectors, they are behind mm_bridge_0 as well
+    vector_cores = [core for core in (sequencer, stream_adapter) if core is not None]
+    if options.cycle_counter:
+        cycle_counter = CycleCounter('cycle_counter_0', address_map)
+        cores = vector_cores + [cycle_counter]
+    else:
+        cycle_counter = None
+        cores = vector_cores
+    if options.irq_ports:
+        port_index_of_name = {port.name: port_index for port_index, port in enumerate(ports)}
+        for port_name in options.irq_ports:
+            assert port_name in port_index_of_name, f'ERROR: irq port {port_name} is not a port of {design_name}'
+            assert ports[port_index_of_name[port_name]].mode == 'out', f'ERROR: irq port {port_name} is not an output port of {design_name}'
+        assert len(options.irq_ports) <= IrqPio.MAX_IRQ_PORTS, f'ERROR: at most {IrqPio.MAX_IRQ_PORTS} irq ports are supported'
+        irq_pio = IrqPio('pio_irq_0', [port_index_of_name[port_name] for port_name in options.irq_ports], address_map)
+        cores = cores + [irq_pio]
+    else:
+        irq_pio = None
+    if options.atomic_pios:
+        assert options.burst_size == 1, f'ERROR: the double-buffered pios are single word pios, burst size {options.burst_size} is not supported'
+        assert options.read_latency == 0, f'ERROR: the double-buffered input pios are read from their snapshot, read latency {options.read_latency} is not supported'
+        assert not options.pio_out_readback, f'ERROR: the double-buffered output pios are write only'
+        # a snapshot written with a commit waits as long as the pio paths are relaxed, two cycles if they are not
+        snapshot_delay = 2 if options.pio_multicycle is None else max(1, options.pio_multicycle)
+        pio_sync = PioSync('pio_sync_0', address_map, snapshot_delay)
+        cores = cores + [pio_sync]
+    else:
+        pio_sync = None
+    if options.clock_control:
+        clock_control = ClockControl('clock_control_0', address_map)
+        cores = cores + [clock_control]
+    else:
+        clock_control = None
+
     # just check the connection information
     print_log(f'INFO: number of port: {len(ports)}')
     print_log(f'INFO: number of pio: {len(pios)}')
@@ -436,58 +2130,129 @@ def de10nano_project_generator(HDLGen_project_path, path, quartus_path, qsys_scr
 
     # Then prepare the necessery files in the folder
         
-    # write the _hw.tcl file
-    pio_in_tcl_file_name = 'pio64_in_hw.tcl'
-    
-    with open(path + pio_in_tcl_file_name, 'w') as file:
-        file.write(PIO64_IN_HW_TCL)
-
-    pio_out_tcl_file_name = 'pio64_out_hw.tcl'
-
-    with open(path + pio_out_tcl_file_name, 'w') as file:
-        file.write(PIO64_OUT_HW_TCL)
-
-    # write the sv file
-    ip_path = path + 'ip\pio64' # create the path first if not exist
-    if not os.path.exists(ip_path):
-        os.makedirs(ip_path)
-    
-    pio_in_hdl_sv_file_name = '\pio64_in.sv'
-
-    with open(ip_path + pio_in_hdl_sv_file_name, 'w') as file:
-        file.write(PIO64_IN_HDL_SV)
-
-    pio_out_hdl_sv_file_name = '\pio64_out.sv'
+    changed_files = ChangedFiles()
 
-    with open(ip_path + pio_out_hdl_sv_file_name, 'w') as file:
-        file.write(PIO64_OUT_HDL_SV)
+    # write the _hw.tcl file and the sv file of the pio cores
+    if banks:
+        generate_pio_bank_ip(banks, path, changed_files)
+    else:
+        generate_pio_ip(pio_width, path, changed_files, options.read_latency, options.pio_out_readback, options.atomic_pios)
+    if sequencer is not None:
+        generate_core_ip(sequencer, path, changed_files)
+    if stream_adapter is not None:
+        generate_core_ip(stream_adapter, path, changed_files)
+    if cycle_counter is not None:
+        generate_core_ip(cycle_counter, path, changed_files)
+    if irq_pio is not None:
+        generate_core_ip(irq_pio, path, changed_files)
+    if pio_sync is not None:
+        generate_core_ip(pio_sync, path, changed_files)
+    if clock_control is not None:
+        generate_core_ip(clock_control, path, changed_files)
     
 
     # Then I can generate the project
         
     # Generate the Quartus project tcl
-    generate_project_tcl(HDLGen_project_path, path)
+    generate_project_tcl(project, path, changed_files)
         
+    # Generate the sdc file of the Quartus project
+    generate_sdc_file(project, pios, connection_list, path, changed_files, banks, options.read_latency, options.pio_multicycle, options.atomic_pios, clock_control)
+
     # Generate the Quartus top module
-    generate_top_module(design_name, ports, pios, connection_list, path)
+    generate_top_module(project, pios, connection_list, path, changed_files, banks, vector_cores, cycle_counter, irq_pio, pio_sync, clock_control)
     
     # Generate the Qsys tcl
-    generate_qsys_tcl(pios, path)
+    generate_qsys_tcl(project, pios, path, changed_files, address_map, banks, cores, stream_adapter, irq_pio)
 
     # Generate the xml file
-    testbench = project.getElementsByTagName('TBNote')[0].firstChild.data
-    generate_xml_file(ports, pios, connection_list, testbench, path)
+    generate_xml_file(project, pios, connection_list, path, changed_files, access_groups, address_map, vector_cores, cycle_counter, irq_pio, pio_sync, clock_control)
+
+    # Generate the binary manifest of the xml file
+    generate_manifest_file(project, pios, connection_list, path, changed_files, address_map, [core for core in (cycle_counter, irq_pio, pio_sync, clock_control) if core is not None])
+
+    # Generate the compiled test table
+    generate_testbench_files(project, pios, connection_list, path, changed_files)
 
     # compile
     # compile_programable_file(quartus_path, qsys_script_path, qsys_generate_path, quartus_cpf_path, design_name, path)
 
     # Generate the bat file
-    generate_bat_file(quartus_path, qsys_script_path, qsys_generate_path, quartus_cpf_path, design_name, path)
+    generate_bat_file(quartus_path, qsys_script_path, qsys_generate_path, quartus_cpf_path, design_name, path, changed_files)
+
+    # the files of an earlier run with other options which are not generated any more
+    remove_stale_files(path, changed_files)
+
+    print_log(f'INFO: {len(changed_files)} generated files changed')
+    return changed_files
             
 
 
 
 
+def generate_project_in_batch(HDLGen_project_path, path, quartus_path, qsys_script_path, qsys_generate_path, quartus_cpf_path, cache, options):
+    '''
+    This function runs in the worker process of de10nano_batch_generator(), it never raises, the result is (HDLGen_project_path, path, succeeded, message)
+    '''
+    try:
+        changed_files = de10nano_project_generator(HDLGen_project_path, path, quartus_path, qsys_script_path, qsys_generate_path, quartus_cpf_path, cache, options)
+    except Exception as e:
+        return (HDLGen_project_path, path, False, f'{type(e).__name__}: {e}')
+    return (HDLGen_project_path, path, True, f'{len(changed_files)} files changed')
+
+
+
+
+
+def de10nano_batch_generator(HDLGen_project_paths, output_root, quartus_path, qsys_script_path, qsys_generate_path, quartus_cpf_path, workers = None, cache = None, options = None):
+    '''
+    This function generates many HDLGen projects in parallel, each project is generated by de10nano_project_generator() in a process pool.
+
+    Parameters:
+
+    HDLGen_project_paths: a list of .hdlgen files, or a glob pattern string such as 'designs/*/HDLGenPrj/*.hdlgen'
+    output_root: each project is generated under output_root/<name of the .hdlgen file>/, a number is added when two files have the same name
+    workers (optional): number of worker processes, default is the number of CPUs
+    cache (optional): a ProjectCache shared by all the workers
+    options (optional): the GeneratorOptions of every project
+
+    Returns a list of (HDLGen_project_path, output_path, succeeded, message), in the order of HDLGen_project_paths
+    '''
+    print_log(f"INFO: de10nano_batch_generator()")
+    if isinstance(HDLGen_project_paths, str):
+        HDLGen_project_paths = sorted(glob.glob(HDLGen_project_paths, recursive=True))
+
+    # every project gets its own output folder
+    output_paths = list()
+    used_names = set()
+    for HDLGen_project_path in HDLGen_project_paths:
+        base_name = os.path.splitext(os.path.basename(HDLGen_project_path))[0]
+        output_name = base_name
+        count = 1
+        while output_name in used_names:
+            output_name = f'{base_name}_{count}'
+            count += 1
+        used_names.add(output_name)
+        output_paths.append(os.path.join(output_root, output_name) + os.sep)
+
+    results = list()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(generate_project_in_batch, HDLGen_project_path, output_path, quartus_path, qsys_script_path, qsys_generate_path, quartus_cpf_path, cache, options)
+                   for HDLGen_project_path, output_path in zip(HDLGen_project_paths, output_paths)]
+        for future in futures:
+            results.append(future.result())
+
+    succeeded = sum(1 for result in results if result[2])
+    for HDLGen_project_path, output_path, ok, message in results:
+        if not ok:
+            print(f'ERROR: Failed to generate {HDLGen_project_path}: {message}')
+    print_log(f'INFO: {succeeded} of {len(results)} projects generated successfully')
+    return results
+
+
+
+
+
 if __name__ == '__main__':
     quartus_path = r'C:\intelFPGA_lite\22.1std\quartus\bin64\quartus_sh.exe'
     qsys_script_path = r'C:\intelFPGA_lite\22.1std\quartus\sopc_builder\bin\qsys-script.exe'
@@ -496,6 +2261,7 @@ if __name__ == '__main__':
 
     de10nano_project_generator(r'FIFO/FIFOTopModule/HDLGenPrj/FIFOTopModule.hdlgen', 'FIFO\\intelPrj\\', quartus_path, qsys_script_path, qsys_generate_path, quartus_cpf_path)
     #generate_project_tcl(r'FIFOTopModule/HDLGenPrj/FIFOTopModule.hdlgen')
+    #de10nano_batch_generator(r'designs/*/HDLGenPrj/*.hdlgen', 'intelPrj', quartus_path, qsys_script_path, qsys_generate_path, quartus_cpf_path, workers=4)
 
 
 
@@ -0,0 +1,460 @@
+'''
+de10nano_runtime module, the board side of de10nano_project_generator, it runs on the HPS of the DE10 Nano
+
+LOG: if this value is True, the log will printed in the console. if you don't want those logs bother you, you can set it as False
+
+load_manifest(): this function loads soc_system.xml once, and precomputes the lane, shift and mask of every port
+load_binary_manifest(): this function memory maps soc_system.bin, the lanes, shifts and masks are already in its tables
+Bridge: the HPS-to-FPGA bridge window, memory mapped from /dev/mem, or from a regular file for testing without a board
+Runtime: packs and unpacks whole batches of test vectors with NumPy, and writes and reads them through the bridge
+WriteCoalescer: the shadow copy of the output pio lanes, the port updates of a step are combined and only the changed lanes are written
+load_testbench(): this function loads the test table compiled on the host (testbench_*.npy), memory mapped, ready to be streamed to the bridge
+
+The pio words are moved in 64 bit lanes, the lane layout is in de10nano_lanes, shared with the generator.
+A port of up to 64 bits is a 1-D uint64 array (one value per vector), a wider port is a 2-D uint64 array (one row of 64 bit lanes per vector, the lowest lane first).
+'''
+
+
+
+
+
+import mmap
+import os
+import xml.etree.ElementTree as ET
+import numpy as np
+import de10nano_lanes
+from de10nano_lanes import LANE_WIDTH, MANIFEST_MAGIC, MANIFEST_VERSION, MANIFEST_MODES, MANIFEST_CORE_KINDS, split_lane_fragment, lane_addresses, manifest_dtype
+
+
+
+
+
+LOG = True
+
+# the HPS-to-FPGA bridge window of the Cyclone V HPS, mm_bridge_0 is at its base
+BRIDGE_BASE = 0xC0000000
+
+# the binary manifest soc_system.bin, the numpy dtypes of the MANIFEST_* table layouts of de10nano_lanes
+MANIFEST_HEADER_DTYPE = np.dtype(manifest_dtype(de10nano_lanes.MANIFEST_HEADER))
+MANIFEST_PORT_DTYPE = np.dtype(manifest_dtype(de10nano_lanes.MANIFEST_PORT))
+MANIFEST_FRAGMENT_DTYPE = np.dtype(manifest_dtype(de10nano_lanes.MANIFEST_FRAGMENT))
+MANIFEST_PIO_DTYPE = np.dtype(manifest_dtype(de10nano_lanes.MANIFEST_PIO))
+MANIFEST_SLAVE_DTYPE = np.dtype(manifest_dtype(de10nano_lanes.MANIFEST_SLAVE))
+MANIFEST_CORE_DTYPE = np.dtype(manifest_dtype(de10nano_lanes.MANIFEST_CORE))
+MANIFEST_CORE_PORT_DTYPE = np.dtype(manifest_dtype(de10nano_lanes.MANIFEST_CORE_PORT))
+
+# the commit and snapshot strobes of the double-buffered pios, the bits of its register
+PIO_SYNC_COMMIT = 1
+PIO_SYNC_SNAPSHOT = 2
+
+
+
+
+
+def print_log(str):
+    '''
+    Set the LOG for False, you will not see the 'INFO' in the console
+    '''
+    if LOG:
+        print(str)
+
+
+
+
+
+class PortLayout:
+    '''
+    The layout of a port of the design in the pio lanes.
+    mode is the mode of its pios ('out' drives the design, 'in' is driven by the design), lanes is the number of 64 bit lanes of a port value.
+    fragments is the list of (lane column, lane lsb, port lane, port shift, mask), lane column is the index of the lane in the lane addresses of the mode,
+    the shifts are np.uint64, so a fragment is packed as ((value[port lane] >> port shift) & mask) << lane lsb without converting the batch.
+    lane_fragments is the list of (lane address, lane lsb, port lane, port shift, bits), see de10nano_lanes.split_lane_fragment().
+    '''
+    def __init__(self, name, mode, width, lane_fragments, lane_addresses):
+        self.name = name
+        self.mode = mode
+        self.width = width
+        self.lanes = -(-width // LANE_WIDTH)
+        column_of_address = {address: column for column, address in enumerate(lane_addresses)}
+        self.fragments = [(column_of_address[address], np.uint64(lane_lsb), port_lane, np.uint64(port_shift), np.uint64((1 << bits) - 1))
+                          for address, lane_lsb, port_lane, port_shift, bits in lane_fragments]
+
+
+
+
+
+class Manifest:
+    '''
+    The connection map of soc_system.xml (or soc_system.bin), loaded once.
+    ports is the dict of PortLayout by port name, in the order of the xml. out_lane_addresses and in_lane_addresses are the byte addresses of the lanes
+    which hold an output pio (driving the design) or an input pio, in address order, a packed batch has one column for each of them.
+    slaves is the dict of (base, span) by slave name of the address map, address_width is the address width of mm_bridge_0.
+    cores is the dict of (instance name, address, parameter, port names) by kind (one of MANIFEST_CORE_KINDS) of the cycle counter, the irq pio, the pio sync and the clock control,
+    address is the base of the first slave of the core, parameter is the irq number of the irq pio (its port names by bit) and the snapshot delay of the pio sync.
+    pio_sync is the address of the commit and snapshot register of the double-buffered pios, None if the pios are not double-buffered.
+    '''
+    def __init__(self, port_fragments, address_width, slaves = None, testbench = '', pios = None, cores = None):
+        # port_fragments: list of (port name, mode, width, lane fragments)
+        self.address_width = address_width
+        self.pios = pios or list() # (name, address, width, mode)
+        self.slaves = slaves or dict()
+        self.cores = cores or dict()
+        self.pio_sync = self.cores['pio_sync'][1] if 'pio_sync' in self.cores else None
+        self.testbench = testbench
+        addresses = lane_addresses((mode, lane_fragments) for name, mode, width, lane_fragments in port_fragments)
+        self.out_lane_addresses = addresses['out']
+        self.in_lane_addresses = addresses['in']
+        self.ports = dict()
+        for name, mode, width, lane_fragments in port_fragments:
+            addresses = self.out_lane_addresses if mode == 'out' else self.in_lane_addresses
+            self.ports[name] = PortLayout(name, mode, width, lane_fragments, addresses)
+        # the word indexes of the lanes in a uint64 view of the bridge window
+        self.out_lane_indexes = np.array(self.out_lane_addresses, dtype=np.intp) // (LANE_WIDTH // 8)
+        self.in_lane_indexes = np.array(self.in_lane_addresses, dtype=np.intp) // (LANE_WIDTH // 8)
+
+    def span(self):
+        '''
+        The number of bytes of the bridge window behind mm_bridge_0, at least one page
+        '''
+        return max(mmap.PAGESIZE, -(-(1 << self.address_width) // mmap.PAGESIZE) * mmap.PAGESIZE)
+
+
+
+
+
+def load_manifest(xml_path):
+    '''
+    This function loads soc_system.xml written by generate_xml_file(), and returns its Manifest.
+    A port has an address, a start bit and an end bit, or a width and a fragment (address, start bit, end bit and port lsb) for each slice.
+    '''
+    print_log(f'INFO: load_manifest() {xml_path}')
+    root = ET.parse(xml_path).getroot()
+    port_fragments = list()
+    for port_element in root.iterfind('design/port'):
+        name = port_element.findtext('port_name')
+        mode = port_element.findtext('pio_mode')
+        assert mode in ('out', 'in'), f'ERROR: pio mode {mode} of port {name} is not supported'
+        fragment_elements = port_element.findall('fragment') or [port_element]
+        lane_fragments = list()
+        width = 0
+        for fragment_element in fragment_elements:
+            address = int(fragment_element.findtext('address'))
+            start_bit = int(fragment_element.findtext('start_bit'))
+            end_bit = int(fragment_element.findtext('end_bit'))
+            port_lsb = int(fragment_element.findtext('port_lsb') or 0)
+            lane_fragments += split_lane_fragment(address, end_bit, port_lsb, start_bit - end_bit + 1)
+            width = max(width, port_lsb + start_bit - end_bit + 1)
+        width = int(port_element.findtext('width') or width)
+        port_fragments.append((name, mode, width, lane_fragments))
+    slaves = dict()
+    for slave_element in root.iterfind('address_map/slave'):
+        slaves[slave_element.findtext('name')] = (int(slave_element.findtext('base')), int(slave_element.findtext('span')))
+    if root.find('address_map') is not None:
+        address_width = int(root.findtext('address_map/address_width'))
+    else:
+        # an old soc_system.xml without address map, the window reaches the highest lane
+        address_width = max((address + LANE_WIDTH // 8 - 1).bit_length() for _, _, _, lane_fragments in port_fragments for address, *_ in lane_fragments)
+    cores = dict()
+    counter_element = root.find('cycle_counter')
+    if counter_element is not None:
+        cores['cycle_counter'] = (counter_element.findtext('name'), int(counter_element.findtext('free_running_address')), 0, [])
+    irq_element = root.find('irq')
+    if irq_element is not None:
+        cores['pio_irq'] = (irq_element.findtext('name'), int(irq_element.findtext('address')), int(irq_element.findtext('irq_number')),
+                            [port_name.text for port_name in irq_element.iterfind('port_name')])
+    sync_element = root.find('pio_sync')
+    if sync_element is not None:
+        cores['pio_sync'] = (sync_element.findtext('name'), int(sync_element.findtext('address')), int(sync_element.findtext('snapshot_delay')), [])
+    clock_element = root.find('clock_control')
+    if clock_element is not None:
+        cores['clock_control'] = (clock_element.findtext('name'), int(clock_element.findtext('address')), 0, [])
+    manifest = Manifest(port_fragments, address_width, slaves, root.findtext('testbench') or '', cores=cores)
+    print_log(f'INFO: {len(manifest.ports)} ports, {len(manifest.out_lane_addresses)} output lanes, {len(manifest.in_lane_addresses)} input lanes')
+    return manifest
+
+
+
+
+
+def load_binary_manifest(bin_path):
+    '''
+    This function memory maps soc_system.bin written by generate_manifest_file(), and returns its Manifest.
+    The tables are viewed in place with the MANIFEST_*_DTYPE, nothing is parsed, the lane fragments are already split.
+    It has everything the runtime reads from soc_system.xml, so the xml is not needed on the board.
+    '''
+    print_log(f'INFO: load_binary_manifest() {bin_path}')
+    with open(bin_path, 'rb') as bin_file:
+        buffer = mmap.mmap(bin_file.fileno(), 0, access=mmap.ACCESS_READ)
+    header = np.frombuffer(buffer, dtype=MANIFEST_HEADER_DTYPE, count=1)[0]
+    assert header['magic'] == MANIFEST_MAGIC, f'ERROR: {bin_path} is not a binary manifest'
+    assert header['version'] == MANIFEST_VERSION, f'ERROR: version {header["version"]} of {bin_path} is not supported'
+
+    def table(dtype, count, offset):
+        return np.frombuffer(buffer, dtype=dtype, count=int(header[count]), offset=int(header[offset]))
+
+    strings = buffer[int(header['strings_offset']):int(header['strings_offset']) + int(header['strings_size'])]
+
+    def string(entry):
+        return strings[int(entry['name_offset']):int(entry['name_offset']) + int(entry['name_size'])].decode('utf-8')
+
+    fragment_table = table(MANIFEST_FRAGMENT_DTYPE, 'fragment_count', 'fragment_offset')
+    fragment_columns = [fragment_table[field].tolist() for field in ('lane_address', 'lane_lsb', 'port_lane', 'port_shift', 'bits')]
+    lane_fragments = list(zip(*fragment_columns))
+    port_fragments = list()
+    for port in table(MANIFEST_PORT_DTYPE, 'port_count', 'port_offset'):
+        first = int(port['fragment_index'])
+        port_fragments.append((string(port), MANIFEST_MODES[port['mode']], int(port['width']), lane_fragments[first:first + int(port['fragment_count'])]))
+    pios = [(string(pio), int(pio['address']), int(pio['width']), MANIFEST_MODES[pio['mode']]) for pio in table(MANIFEST_PIO_DTYPE, 'pio_count', 'pio_offset')]
+    slaves = {string(slave): (int(slave['base']), int(slave['span'])) for slave in table(MANIFEST_SLAVE_DTYPE, 'slave_count', 'slave_offset')}
+    testbench = buffer[int(header['testbench_offset']):int(header['testbench_offset']) + int(header['testbench_size'])].decode('utf-8')
+    core_ports = table(MANIFEST_CORE_PORT_DTYPE, 'core_port_count', 'core_port_offset')['port'].tolist()
+    cores = dict()
+    for core in table(MANIFEST_CORE_DTYPE, 'core_count', 'core_offset'):
+        first = int(core['port_index'])
+        port_names = [port_fragments[row][0] for row in core_ports[first:first + int(core['port_count'])]]
+        cores[MANIFEST_CORE_KINDS[core['kind']]] = (string(core), int(core['address']), int(core['parameter']), port_names)
+    manifest = Manifest(port_fragments, int(header['address_width']), slaves, testbench, pios, cores)
+    print_log(f'INFO: {len(manifest.ports)} ports, {len(manifest.out_lane_addresses)} output lanes, {len(manifest.in_lane_addresses)} input lanes')
+    return manifest
+
+
+
+
+
+def load_testbench(path = ''):
+    '''
+    This function loads the test table compiled by generate_testbench_files() from the folder path, memory mapped.
+    Returns (stimulus, expected, mask): the (steps, output lanes) stimulus, and the (steps, input lanes) expected responses and the masks of their cared bits.
+    '''
+    print_log(f'INFO: load_testbench() {path}')
+    return tuple(np.load(os.path.join(path, f'testbench_{name}.npy'), mmap_mode='r') for name in ('stimulus', 'expected', 'mask'))
+
+
+
+
+
+class Bridge:
+    '''
+    The bridge window behind mm_bridge_0, memory mapped once, words is a uint64 view of it (no copy), so a lane is written or read as words[address // 8].
+    The Runtime accesses it only through write_lanes(), read_lanes() and write_register(), so any object with those methods (such as the BusModel of de10nano_bus_model) can stand in for it.
+    On the board, path is /dev/mem and base is BRIDGE_BASE. For testing without a board, path can be a regular file and base 0, the file is created or extended to span bytes if it is shorter.
+    '''
+    def __init__(self, span, path = '/dev/mem', base = BRIDGE_BASE):
+        self.span = span
+        # a regular file is created if it does not exist yet, a device never is
+        flags = os.O_RDWR | os.O_SYNC | (0 if path.startswith('/dev/') else os.O_CREAT)
+        fd = os.open(path, flags)
+        try:
+            if os.path.isfile(path) and os.fstat(fd).st_size < base + span:
+                os.ftruncate(fd, base + span)
+            self.mmap = mmap.mmap(fd, span, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE, offset=base)
+        finally:
+            os.close(fd)
+        self.words = np.frombuffer(self.mmap, dtype=np.uint64)
+        # the 32 bit registers of the cores, such as pio_sync
+        self.registers = np.frombuffer(self.mmap, dtype=np.uint32)
+
+    def write_lanes(self, indexes, lanes):
+        '''
+        Writes the lanes at the word indexes, in the order of indexes
+        '''
+        self.words[indexes] = lanes
+
+    def read_lanes(self, indexes):
+        '''
+        Reads the lanes at the word indexes, returns a copy
+        '''
+        return self.words[indexes]
+
+    def write_register(self, address, value):
+        '''
+        Writes the 32 bit register at the byte address
+        '''
+        self.registers[address // 4] = value
+
+    def close(self):
+        # the views hold the buffer of the mmap, they are released first
+        self.words = None
+        self.registers = None
+        self.mmap.close()
+
+
+
+
+
+class WriteCoalescer:
+    '''
+    The shadow copy of the output pio lanes (the output pios have no readback), so the ports packed into one lane are updated without a read-modify-write.
+    set() updates ports in the shadow only, flush() writes the lanes changed since the last flush, in address order, with one write_lanes() call to the bridge,
+    and commits them to the design with one pio_sync write if the pios are double-buffered.
+    port_updates counts the port updates, lane_updates the lanes those updates would write one port at a time, transactions the lanes written and commits the pio_sync commits.
+    saved() returns lane_updates - transactions, the lane writes saved by coalescing.
+    The shadow starts from the reset value 0 of the output pios.
+    '''
+    def __init__(self, manifest, bridge):
+        self.manifest = manifest
+        self.bridge = bridge
+        # the lane columns of each output port, a port update without coalescing writes each of them once
+        self.port_columns = {name: sorted({int(fragment[0]) for fragment in port.fragments}) for name, port in manifest.ports.items() if port.mode == 'out'}
+        self.reset()
+
+    def reset(self):
+        '''
+        Clears the shadow and the counters, after a reset of the output pios
+        '''
+        self.shadow = [0] * len(self.manifest.out_lane_addresses) # python ints, one for each output lane
+        self.dirty = set() # the lane columns changed since the last flush
+        self.port_updates = 0
+        self.lane_updates = 0
+        self.transactions = 0
+        self.commits = 0
+
+    def saved(self):
+        '''
+        The lane writes saved by coalescing, against writing every lane of a port on each update
+        '''
+        return self.lane_updates - self.transactions
+
+    def set(self, name, value):
+        '''
+        Updates the port name to value (a python int) in the shadow, the lanes are marked dirty only if their value changes
+        '''
+        port = self.manifest.ports[name]
+        assert port.mode == 'out', f'ERROR: port {name} is not driven by an output pio'
+        for column, lane_lsb, port_lane, port_shift, mask in port.fragments:
+            lane_lsb, mask = int(lane_lsb), int(mask)
+            bits = (value >> (port_lane * LANE_WIDTH + int(port_shift))) & mask
+            lane = (self.shadow[column] & ~(mask << lane_lsb)) | (bits << lane_lsb)
+            if lane != self.shadow[column]:
+                self.shadow[column] = lane
+                self.dirty.add(column)
+        self.port_updates += 1
+        self.lane_updates += len(self.port_columns[name])
+
+    def update(self, values):
+        '''
+        Updates several ports, values is a dict of python ints by port name
+        '''
+        for name, value in values.items():
+            self.set(name, value)
+
+    def set_lanes(self, lanes):
+        '''
+        Updates the whole shadow to one vector of output lanes (a row of Runtime.pack()), only the changed lanes are marked dirty
+        '''
+        for column, lane in enumerate(lanes.tolist()):
+            if lane != self.shadow[column]:
+                self.shadow[column] = lane
+                self.dirty.add(column)
+        self.port_updates += len(self.port_columns)
+        self.lane_updates += sum(len(columns) for columns in self.port_columns.values())
+
+    def flush(self):
+        '''
+        Writes the dirty lanes in address order with one call and commits them if the pios are double-buffered, returns the number of lanes written
+        '''
+        columns = sorted(self.dirty)
+        if columns:
+            self.bridge.write_lanes(self.manifest.out_lane_indexes[columns], np.array([self.shadow[column] for column in columns], dtype=np.uint64))
+            if self.manifest.pio_sync is not None:
+                self.bridge.write_register(self.manifest.pio_sync, PIO_SYNC_COMMIT)
+                self.commits += 1
+        self.dirty.clear()
+        self.transactions += len(columns)
+        return len(columns)
+
+
+
+
+
+class Runtime:
+    '''
+    The runtime of a design on the board, the ports are packed and unpacked with vectorised NumPy operations over a whole batch of test vectors.
+    A batch of values is a dict of arrays by port name, one value for each vector, see the module docstring for the array shapes.
+    If coalesce is True, the output lanes are written through a WriteCoalescer (writer), so a vector writes only the lanes which differ from the vector before.
+    If the pios are double-buffered (the manifest has a pio_sync), the written lanes are committed to the design with one write, and the input pios are snapshot before they are read.
+    '''
+    def __init__(self, manifest, bridge, coalesce = False):
+        self.manifest = manifest
+        self.bridge = bridge
+        self.writer = WriteCoalescer(manifest, bridge) if coalesce else None
+
+    def pack(self, values, vectors = None, mode = 'out'):
+        '''
+        Packs the values of the output pio ports (or of the input pio ports if mode is 'in') into a (vectors, lanes) uint64 array, a port missing from values is 0
+        '''
+        if vectors is None:
+            vectors = len(next(iter(values.values()))) if values else 1
+        lanes = np.zeros((vectors, len(self.manifest.out_lane_addresses if mode == 'out' else self.manifest.in_lane_addresses)), dtype=np.uint64)
+        for name, value in values.items():
+            port = self.manifest.ports[name]
+            assert port.mode == mode, f'ERROR: port {name} is not in an {mode}put pio'
+            value = np.asarray(value, dtype=np.uint64).reshape(vectors, port.lanes)
+            for column, lane_lsb, port_lane, port_shift, mask in port.fragments:
+                lanes[:, column] |= ((value[:, port_lane] >> port_shift) & mask) << lane_lsb
+        return lanes
+
+    def unpack(self, lanes, mode = 'in'):
+        '''
+        Unpacks a (vectors, lanes) uint64 array of the input lanes (or of the output lanes if mode is 'out') into a dict of the values of those ports
+        '''
+        lanes = np.asarray(lanes, dtype=np.uint64).reshape(-1, len(self.manifest.in_lane_addresses if mode == 'in' else self.manifest.out_lane_addresses))
+        values = dict()
+        for name, port in self.manifest.ports.items():
+            if port.mode != mode:
+                continue
+            value = np.zeros((len(lanes), port.lanes), dtype=np.uint64)
+            for column, lane_lsb, port_lane, port_shift, mask in port.fragments:
+                value[:, port_lane] |= ((lanes[:, column] >> lane_lsb) & mask) << port_shift
+            values[name] = value[:, 0] if port.lanes == 1 else value
+        return values
+
+    def write_lanes(self, lanes):
+        '''
+        Writes one vector of output lanes to the output pios
+        '''
+        if self.writer is not None:
+            # the writer commits the lanes it writes
+            self.writer.set_lanes(lanes)
+            self.writer.flush()
+            return
+        self.bridge.write_lanes(self.manifest.out_lane_indexes, lanes)
+        if self.manifest.pio_sync is not None and len(self.manifest.out_lane_indexes):
+            self.bridge.write_register(self.manifest.pio_sync, PIO_SYNC_COMMIT)
+
+    def read_lanes(self):
+        '''
+        Reads the input lanes of the input pios, returns a copy
+        '''
+        if self.manifest.pio_sync is not None:
+            self.bridge.write_register(self.manifest.pio_sync, PIO_SYNC_SNAPSHOT)
+        return self.bridge.read_lanes(self.manifest.in_lane_indexes)
+
+    def run_lanes(self, stimulus_lanes):
+        '''
+        Writes every row of stimulus_lanes (a (vectors, output lanes) array) and reads the input lanes after each one, returns the (vectors, input lanes) array of the responses
+        '''
+        response_lanes = np.empty((len(stimulus_lanes), len(self.manifest.in_lane_addresses)), dtype=np.uint64)
+        for vector, lanes in enumerate(stimulus_lanes):
+            self.write_lanes(lanes)
+            response_lanes[vector] = self.read_lanes()
+        return response_lanes
+
+    def run(self, stimulus, vectors = None):
+        '''
+        Applies every vector of stimulus (a dict of arrays by port name) and reads the input pios after each one, returns the dict of the response arrays by port name.
+        The batch is packed before and unpacked after the run, so only the bridge accesses are done for each vector.
+        '''
+        return self.unpack(self.run_lanes(self.pack(stimulus, vectors)))
+
+    def run_testbench(self, testbench):
+        '''
+        Runs the compiled test table (stimulus, expected, mask) of load_testbench(), returns the indexes of the failed test steps and the response lanes
+        '''
+        stimulus, expected, mask = testbench
+        assert stimulus.shape[1:] == (len(self.manifest.out_lane_addresses),), 'ERROR: the compiled test table does not match the stimulus lanes of the manifest'
+        assert expected.shape[1:] == (len(self.manifest.in_lane_addresses),), 'ERROR: the compiled test table does not match the response lanes of the manifest'
+        response_lanes = self.run_lanes(stimulus)
+        failed_steps = np.flatnonzero(((response_lanes & mask) != expected).any(axis=1))
+        print_log(f'INFO: {len(stimulus) - len(failed_steps)} of {len(stimulus)} test steps passed')
+        return failed_steps, response_lanes
@@ -0,0 +1,81 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import de10nano_project_generator as generator
+
+
+generator.LOG = False
+
+PIO_WIDTHS = (32, 64, 128, 256)
+
+# a design with narrow and wide ports in both directions, the wide ones need several lanes (and several pios at the narrow widths)
+HDLGEN = '''<?xml version="1.0" encoding="UTF-8"?>
+<HDLGen>
+<projectManager><settings><name>Dut</name><environment>%(environment)s</environment><location>%(environment)s/Dut</location></settings></projectManager>
+<hdlDesign><entityIOPorts>
+<signal><name>clk</name><mode>in</mode><type>single bit</type></signal>
+<signal><name>rst</name><mode>in</mode><type>single bit</type></signal>
+<signal><name>a</name><mode>in</mode><type>bus(15 downto 0)</type></signal>
+<signal><name>b</name><mode>in</mode><type>bus(39 downto 0)</type></signal>
+<signal><name>w</name><mode>in</mode><type>bus(99 downto 0)</type></signal>
+<signal><name>y</name><mode>out</mode><type>bus(15 downto 0)</type></signal>
+<signal><name>z</name><mode>out</mode><type>bus(2 downto 0)</type></signal>
+<signal><name>v</name><mode>out</mode><type>bus(99 downto 0)</type></signal>
+</entityIOPorts></hdlDesign>
+<testbench><TBNote>TestNo	rst	a	b	w	y	z	v	Note
+1	1	0x0	0x0	0x0	0x0	0x0	0x0	reset
+2	0	0xABCD	0x12_3456_789A	0xF_0000_0000_0000_0000_0000_0001	0x5432	0x0	0x0_FFFF_FFFF_FFFF_FFFF_FFFF_FFFE	step
+3	0	0x0001	0xFF_FFFF_FFFF	0x8_1234_5678_9ABC_DEF0_1234_5678	0xFFFE	0x7	0x7_EDCB_A987_6543_210F_EDCB_A987	step
+</TBNote></testbench>
+</HDLGen>
+'''
+
+MAIN_PACKAGE = '''<HDLGen><hdlDesign><components></components></hdlDesign></HDLGen>
+'''
+
+
+def dut_function(inputs):
+    '''
+    The behaviour of the design of HDLGEN, the outputs of the test table follow it
+    '''
+    if inputs['rst']:
+        return dict()
+    return {'y': ~inputs['a'] & 0xFFFF, 'z': (inputs['b'] >> 37) & 0x7, 'v': ~inputs['w'] & ((1 << 100) - 1)}
+
+
+@pytest.fixture
+def hdlgen_path(tmp_path):
+    environment = str(tmp_path / 'proj')
+    os.makedirs(environment)
+    path = os.path.join(environment, 'Dut.hdlgen')
+    with open(path, 'w') as file:
+        file.write(HDLGEN % {'environment': environment})
+    main_package_path = generator.main_package_hdlgen_path(environment)
+    os.makedirs(os.path.dirname(main_package_path), exist_ok=True)
+    with open(main_package_path, 'w') as file:
+        file.write(MAIN_PACKAGE)
+    return path
+
+
+@pytest.fixture(params=PIO_WIDTHS)
+def pio_width(request):
+    return request.param
+
+
+def generate(hdlgen_path, path, **options):
+    generator.de10nano_project_generator(hdlgen_path, path, 'quartus', 'qsys-script', 'qsys-generate', 'quartus_cpf', options=generator.GeneratorOptions(**options))
+    return path
+
+
+@pytest.fixture
+def generated_path(hdlgen_path, pio_width, tmp_path):
+    return generate(hdlgen_path, str(tmp_path / 'out') + os.sep, pio_width=pio_width)
+
+
+@pytest.fixture
+def atomic_path(hdlgen_path, pio_width, tmp_path):
+    return generate(hdlgen_path, str(tmp_path / 'atomic') + os.sep, pio_width=pio_width, atomic_pios=True)
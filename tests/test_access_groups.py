@@ -0,0 +1,45 @@
+import os
+from xml.dom import minidom
+
+import pytest
+
+import de10nano_project_generator as generator
+from conftest import generate
+
+
+WIDTHS = [1, 3, 7, 8, 12, 16, 17, 24, 31, 32, 5, 2, 30]
+
+
+def test_pack_ports_keeps_access_groups(pio_width):
+    port_indexes = list(range(len(WIDTHS)))
+    groups = [[0, 10, 11], [2, 3]]
+    bins = generator.pack_ports(WIDTHS, port_indexes, pio_width, groups)
+    for group in groups:
+        assert any(set(group) <= set(port_bin) for port_bin in bins)
+
+
+def test_derive_access_groups_from_testbench(hdlgen_path):
+    project = generator.parse_hdlgen_project(hdlgen_path)
+    index = {port.name: port_index for port_index, port in enumerate(project.ports)}
+    # step 2 releases the reset and changes every data input, step 3 changes the data inputs, the outputs are read together
+    assert generator.derive_access_groups(project) == [[index['rst'], index['a'], index['b'], index['w']], [index['a'], index['b'], index['w']],
+                                                       [index['y'], index['z'], index['v']]]
+
+
+def access_group_elements(path):
+    design = minidom.parse(path + 'soc_system.xml').getElementsByTagName('design')[0]
+    return [(group.getElementsByTagName('pio_mode')[0].firstChild.data, [name.firstChild.data for name in group.getElementsByTagName('port_name')])
+            for group in design.getElementsByTagName('access_group')]
+
+
+def test_access_groups_in_xml(hdlgen_path, tmp_path):
+    path = generate(hdlgen_path, str(tmp_path / 'tb') + os.sep, pio_width=64, access_from_testbench=True)
+    assert access_group_elements(path) == [('out', ['rst', 'a', 'b', 'w']), ('in', ['y', 'z', 'v'])]
+    # a hint with an input and an output port is split by pio mode
+    path = generate(hdlgen_path, str(tmp_path / 'hint') + os.sep, pio_width=64, access_hint=[['a', 'y', 'b']])
+    assert access_group_elements(path) == [('out', ['a', 'b']), ('in', ['y'])]
+
+
+def test_unknown_access_hint(hdlgen_path, tmp_path):
+    with pytest.raises(AssertionError, match='ERROR: access hint port q is not a port of Dut'):
+        generate(hdlgen_path, str(tmp_path / 'out') + os.sep, access_hint=[['a', 'q']])
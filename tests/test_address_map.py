@@ -0,0 +1,27 @@
+import pytest
+
+import de10nano_project_generator as generator
+
+
+def test_address_map_allocate(pio_width):
+    address_map = generator.AddressMap()
+    spans = [pio_width // 8] * 5 + [4, 8, 64, pio_width // 8]
+    bases = [address_map.allocate(f'slave_{index}.s0', span) for index, span in enumerate(spans)]
+    slaves = sorted(address_map.slaves)
+    for (base, span, name), (next_base, _, _) in zip(slaves, slaves[1:]):
+        assert base + span <= next_base
+    for base, span in zip(bases, spans):
+        assert base % address_map.span_of(span) == 0
+    assert address_map.top <= 1 << address_map.address_width()
+
+
+def test_address_map_reserve_collision(pio_width):
+    address_map = generator.AddressMap()
+    address_map.reserve('a.s0', 0, pio_width // 8)
+    with pytest.raises(ValueError):
+        address_map.reserve('b.s0', 0, pio_width // 8)
+    with pytest.raises(ValueError):
+        address_map.reserve('c.s0', 2, 8)
+    # the space below a reserved slave is reused
+    address_map.reserve('d.s0', 0x100, 0x10)
+    assert address_map.allocate('e.s0', 0x10) < 0x100
@@ -0,0 +1,49 @@
+import os
+
+import de10nano_project_generator as generator
+from conftest import HDLGEN, MAIN_PACKAGE
+
+
+def write_project(root, name, type_str = 'bus(15 downto 0)'):
+    environment = os.path.join(root, name)
+    os.makedirs(environment)
+    path = os.path.join(environment, f'{name}.hdlgen')
+    with open(path, 'w') as file:
+        file.write((HDLGEN % {'environment': environment}).replace('bus(15 downto 0)', type_str))
+    main_package_path = generator.main_package_hdlgen_path(environment)
+    os.makedirs(os.path.dirname(main_package_path), exist_ok=True)
+    with open(main_package_path, 'w') as file:
+        file.write(MAIN_PACKAGE)
+    return path
+
+
+def test_batch_with_a_failing_project(tmp_path, monkeypatch, capsys):
+    # the Quartus tools are never run by the generator, a call fails the project
+    def run_command(command, description):
+        raise RuntimeError(f'Quartus step run: {description}')
+
+    monkeypatch.setattr(generator, 'run_command', run_command)
+    good_path = write_project(str(tmp_path), 'Good')
+    bad_path = write_project(str(tmp_path), 'Bad', 'integer')
+    cache = generator.ProjectCache(str(tmp_path / 'cache'))
+    output_root = str(tmp_path / 'out')
+
+    results = generator.de10nano_batch_generator([bad_path, good_path], output_root, 'quartus', 'qsys-script', 'qsys-generate', 'quartus_cpf', workers=2, cache=cache)
+    assert [(path, ok) for path, _, ok, _ in results] == [(bad_path, False), (good_path, True)]
+    assert 'Signal type is not supported yet: integer' in results[0][3]
+    assert f'ERROR: Failed to generate {bad_path}' in capsys.readouterr().out
+    # the failing project does not stop the other one, its outputs are all there
+    good_output = results[1][1]
+    assert good_output == os.path.join(output_root, 'Good') + os.sep
+    for file_name in ('soc_system.xml', 'soc_system.bin', 'soc_system.tcl', 'DE10_NANO_SoC_GHRD.v', 'generated_files.txt'):
+        assert os.path.exists(good_output + file_name), file_name
+
+    # the workers share the cache, only the parsed project is in it
+    assert os.path.exists(cache.entry_path(good_path))
+    assert not os.path.exists(cache.entry_path(bad_path))
+
+    # a second run loads the project from the cache (a load marks the entry as used) and changes no file
+    os.utime(cache.entry_path(good_path), (0, 0))
+    results = generator.de10nano_batch_generator([good_path], output_root, 'quartus', 'qsys-script', 'qsys-generate', 'quartus_cpf', workers=2, cache=cache)
+    assert results == [(good_path, good_output, True, '0 files changed')]
+    assert os.path.getmtime(cache.entry_path(good_path)) > 0
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pytest
+
+import de10nano_runtime as runtime
+import de10nano_bus_model as bus_model
+from conftest import dut_function, generate
+
+
+runtime.LOG = False
+bus_model.LOG = False
+
+
+@pytest.mark.parametrize('coalesce', (False, True))
+def test_bus_model_testbench(generated_path, coalesce):
+    manifest = runtime.load_binary_manifest(generated_path + 'soc_system.bin')
+    model = bus_model.BusModel(manifest, bus_model.FunctionModel(dut_function))
+    failed_steps, response_lanes = runtime.Runtime(manifest, model, coalesce).run_testbench(runtime.load_testbench(generated_path))
+    assert len(response_lanes) == 3
+    assert failed_steps.tolist() == []
+    # a model which does nothing fails the steps with a non-zero output
+    failed_steps, _ = runtime.Runtime(manifest, bus_model.BusModel(manifest)).run_testbench(runtime.load_testbench(generated_path))
+    assert failed_steps.tolist() == [1, 2]
+
+
+def test_bus_model_run(generated_path):
+    manifest = runtime.load_binary_manifest(generated_path + 'soc_system.bin')
+    model = bus_model.BusModel(manifest, bus_model.FunctionModel(dut_function))
+    rng = np.random.default_rng(1)
+    a = rng.integers(0, 1 << 16, 8, dtype=np.uint64)
+    b = rng.integers(0, 1 << 40, 8, dtype=np.uint64)
+    w = rng.integers(0, 1 << 36, (8, 2), dtype=np.uint64)
+    response = runtime.Runtime(manifest, model).run({'a': a, 'b': b, 'w': w})
+    assert np.array_equal(response['y'], ~a & np.uint64(0xFFFF))
+    assert np.array_equal(response['z'], (b >> np.uint64(37)) & np.uint64(7))
+    assert np.array_equal(response['v'], ~w & np.array([(1 << 64) - 1, (1 << 36) - 1], dtype=np.uint64))
+
+
+@pytest.mark.parametrize('coalesce', (False, True))
+def test_atomic_bus_model_testbench(atomic_path, coalesce):
+    manifest = runtime.load_binary_manifest(atomic_path + 'soc_system.bin')
+    model = bus_model.BusModel(manifest, bus_model.FunctionModel(dut_function))
+    failed_steps, _ = runtime.Runtime(manifest, model, coalesce).run_testbench(runtime.load_testbench(atomic_path))
+    assert failed_steps.tolist() == []
+
+
+def test_atomic_bus_model_commit(atomic_path):
+    manifest = runtime.load_binary_manifest(atomic_path + 'soc_system.bin')
+    model = bus_model.BusModel(manifest, bus_model.FunctionModel(dut_function))
+    lanes = runtime.Runtime(manifest, model).pack({'a': np.array([0x1234], dtype=np.uint64)})[0]
+    # the written lanes are staged, the design and the input pios do not change until a commit and a snapshot
+    model.write_lanes(manifest.out_lane_indexes, lanes)
+    assert model.inputs['a'] == 0
+    model.write_register(manifest.pio_sync, runtime.PIO_SYNC_COMMIT)
+    assert model.inputs['a'] == 0x1234
+    assert model.unpack_ports(model.read_lanes(manifest.in_lane_indexes), 'in')['y'] == 0
+    model.write_register(manifest.pio_sync, runtime.PIO_SYNC_SNAPSHOT)
+    assert model.unpack_ports(model.read_lanes(manifest.in_lane_indexes), 'in')['y'] == ~0x1234 & 0xFFFF
+
+
+@pytest.mark.parametrize('cycles_per_access', (1, 3))
+def test_bus_model_timing(hdlgen_path, tmp_path, pio_width, cycles_per_access):
+    path = generate(hdlgen_path, str(tmp_path / 'counter') + os.sep, pio_width=pio_width, cycle_counter=True)
+    manifest = runtime.load_binary_manifest(path + 'soc_system.bin')
+    model = bus_model.BusModel(manifest, bus_model.FunctionModel(dut_function), cycles_per_access)
+    runtime.Runtime(manifest, model).run_testbench(runtime.load_testbench(path))
+    # every lane written or read takes cycles_per_access cycles, and the free running counter lane follows them
+    assert model.writes == 3 * len(manifest.out_lane_indexes)
+    assert model.reads == 3 * len(manifest.in_lane_indexes)
+    assert model.cycles == (model.writes + model.reads) * cycles_per_access
+    assert int(model.words[model.counter_index]) == model.cycles
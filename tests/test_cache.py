@@ -0,0 +1,82 @@
+import os
+
+import de10nano_project_generator as generator
+
+
+def project_summary(project):
+    return (project.name, project.location, project.environment, [(port.name, port.mode, port.type_str, port.width) for port in project.ports], list(project.components), project.testbench)
+
+
+def test_cache_hit(hdlgen_path, tmp_path, monkeypatch):
+    cache = generator.ProjectCache(str(tmp_path / 'cache'))
+    assert cache.load(hdlgen_path) is None
+    project = generator.parse_hdlgen_project(hdlgen_path, cache)
+    cache.store(hdlgen_path, project)
+    # a cached project is not parsed again
+    monkeypatch.setattr(generator, 'iter_hdlgen_elements', None)
+    assert project_summary(generator.parse_hdlgen_project(hdlgen_path, cache)) == project_summary(project)
+
+
+def test_cache_miss_after_change(hdlgen_path, tmp_path):
+    cache = generator.ProjectCache(str(tmp_path / 'cache'))
+    project = generator.parse_hdlgen_project(hdlgen_path, cache)
+    cache.store(hdlgen_path, project)
+    with open(generator.main_package_hdlgen_path(project.environment), 'a') as file:
+        file.write('\n')
+    assert cache.load(hdlgen_path) is None
+    with open(hdlgen_path, 'a') as file:
+        file.write('\n')
+    assert not os.path.exists(cache.entry_path(hdlgen_path))
+
+
+def test_cache_per_python_version(hdlgen_path, tmp_path, monkeypatch):
+    cache = generator.ProjectCache(str(tmp_path / 'cache'))
+    cache.store(hdlgen_path, generator.parse_hdlgen_project(hdlgen_path))
+    assert generator.ProjectCache.PYTHON_VERSION in os.path.basename(cache.entry_path(hdlgen_path))
+    # the entry of another python version is never read
+    monkeypatch.setattr(generator.ProjectCache, 'PYTHON_VERSION', 'py00')
+    assert cache.load(hdlgen_path) is None
+
+
+def test_cache_failed_utime(hdlgen_path, tmp_path, monkeypatch):
+    cache = generator.ProjectCache(str(tmp_path / 'cache'))
+    cache.store(hdlgen_path, generator.parse_hdlgen_project(hdlgen_path))
+
+    def utime(*args, **kwargs):
+        raise PermissionError('read only')
+
+    monkeypatch.setattr(os, 'utime', utime)
+    assert cache.load(hdlgen_path) is not None
+
+
+def test_cache_invalidate_and_clear(hdlgen_path, tmp_path):
+    cache = generator.ProjectCache(str(tmp_path / 'cache'))
+    cache.store(hdlgen_path, generator.parse_hdlgen_project(hdlgen_path))
+    assert cache.invalidate(hdlgen_path)
+    assert not cache.invalidate(hdlgen_path)
+    assert cache.load(hdlgen_path) is None
+    cache.store(hdlgen_path, generator.parse_hdlgen_project(hdlgen_path))
+    cache.clear()
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_cache_evicts_least_recently_used(hdlgen_path, tmp_path):
+    cache = generator.ProjectCache(str(tmp_path / 'cache'))
+    project = generator.parse_hdlgen_project(hdlgen_path)
+    # three versions of the project file, so three entries
+    paths = list()
+    for index in range(3):
+        path = str(tmp_path / f'Dut{index}.hdlgen')
+        with open(hdlgen_path) as source, open(path, 'w') as file:
+            file.write(source.read() + f'<!-- {index} -->\n')
+        paths.append(path)
+        cache.store(path, project)
+        os.utime(cache.entry_path(path), (1000 + index, 1000 + index))
+    entry_size = os.path.getsize(cache.entry_path(paths[0]))
+    # the first entry is used again, so the second one is the least recently used
+    assert cache.load(paths[0]) is not None
+    cache.max_size = 2 * entry_size
+    cache.evict()
+    assert os.path.exists(cache.entry_path(paths[0]))
+    assert not os.path.exists(cache.entry_path(paths[1]))
+    assert os.path.exists(cache.entry_path(paths[2]))
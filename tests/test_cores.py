@@ -0,0 +1,33 @@
+import os
+from xml.dom import minidom
+
+import de10nano_project_generator as generator
+from conftest import generate
+
+
+CORE_OPTIONS = dict(pio_width=64, vector_depth=4, dma_stream=True, cycle_counter=True, irq_ports=['z'], atomic_pios=True, clock_control=True)
+
+
+def test_core_files_and_elements(hdlgen_path, tmp_path):
+    path = generate(hdlgen_path, str(tmp_path / 'cores') + os.sep, **CORE_OPTIONS)
+    root = minidom.parse(path + 'soc_system.xml').documentElement
+    for module_name, xml_tag, instance_name in (('vector_sequencer', 'vector_sequencer', 'vector_sequencer_0'), ('stream_adapter', 'stream_adapter', 'stream_adapter_0'),
+                                                ('cycle_counter', 'cycle_counter', 'cycle_counter_0'), ('pio_irq', 'irq', 'pio_irq_0'),
+                                                ('pio_sync', 'pio_sync', 'pio_sync_0'), ('clock_control', 'clock_control', 'clock_control_0')):
+        # every core writes its hw.tcl and its sv file through generate_core_ip()
+        assert os.path.exists(path + f'{module_name}_hw.tcl'), module_name
+        assert os.path.exists(path + rf'ip\{module_name}\{module_name}.sv'), module_name
+        elements = [element for element in root.childNodes if element.nodeType == element.ELEMENT_NODE and element.tagName == xml_tag]
+        assert len(elements) == 1, xml_tag
+        assert elements[0].getElementsByTagName('name')[0].firstChild.data == instance_name
+
+
+def test_core_slaves():
+    address_map = generator.AddressMap()
+    counter = generator.CycleCounter('cycle_counter_0', address_map)
+    clock_control = generator.ClockControl('clock_control_0', address_map)
+    assert counter.export_name == 'cycle_counter_0_export'
+    assert [interface for interface, address, span in counter.slaves] == ['free_running', 'latched']
+    assert {name for base, span, name in address_map.slaves} == {'cycle_counter_0.free_running', 'cycle_counter_0.latched', 'clock_control_0.s0'}
+    # the s0 slave of a core is its address in soc_system.xml
+    assert clock_control.xml_children(None) == [('name', 'clock_control_0'), ('address', f'{clock_control.slaves[0][1]}')]
@@ -0,0 +1,109 @@
+import os
+from xml.dom import minidom
+
+import pytest
+
+import de10nano_project_generator as generator
+
+
+SIGNAL = '<signal><name>%(name)s</name><mode>%(mode)s</mode><type>%(type)s</type><description>%(name)s port</description></signal>'
+
+# a project with descriptions, components and a name tag outside of the settings, like the files written by HDLGen
+PROJECT = '''<?xml version="1.0" encoding="UTF-8"?>
+<HDLGen>
+<projectManager><settings><name>Sample</name><environment>%(environment)s</environment><location>%(environment)s/Sample</location></settings></projectManager>
+<genFolder><vhdl_folder>VHDL/model</vhdl_folder></genFolder>
+<hdlDesign><header><compName>Sample</compName><title>sample</title></header>
+<entityIOPorts>
+%(signals)s
+</entityIOPorts>
+<internalSignals><signal><name>internal</name><type>single bit</type></signal></internalSignals>
+</hdlDesign>
+<testbench><TBNote>TestNo	rst	a	y
+1	1	0x0	0x0
+2	0	0x1	0x2
+</TBNote></testbench>
+</HDLGen>
+'''
+
+MAIN_PACKAGE = '''<?xml version="1.0" encoding="UTF-8"?>
+<HDLGen><hdlDesign><components>
+<component><name>adder</name><dir>C:\\designs\\adder\\VHDL\\model\\adder.vhd</dir></component>
+<component><name>counter</name><dir>C:\\designs\\counter\\VHDL\\model\\counter.vhd</dir></component>
+</components></hdlDesign></HDLGen>
+'''
+
+
+def write_project(tmp_path, signal_count=8):
+    environment = str(tmp_path / 'sample')
+    os.makedirs(environment)
+    signals = [SIGNAL % {'name': 'clk', 'mode': 'in', 'type': 'single bit'}, SIGNAL % {'name': 'rst', 'mode': 'in', 'type': 'single bit'}]
+    for index in range(signal_count):
+        signals.append(SIGNAL % {'name': f'p{index}', 'mode': ('in', 'out')[index % 2], 'type': f'bus({index + 1} downto 0)'})
+    path = os.path.join(environment, 'Sample.hdlgen')
+    with open(path, 'w') as file:
+        file.write(PROJECT % {'environment': environment, 'signals': '\n'.join(signals)})
+    main_package_path = generator.main_package_hdlgen_path(environment)
+    os.makedirs(os.path.dirname(main_package_path), exist_ok=True)
+    with open(main_package_path, 'w') as file:
+        file.write(MAIN_PACKAGE)
+    return path
+
+
+def minidom_project(hdlgen_path):
+    '''
+    The project read the way the generator did before the streamed parser, with minidom
+    '''
+    project = minidom.parse(hdlgen_path)
+    settings = project.getElementsByTagName('settings')[0]
+    environment = settings.getElementsByTagName('environment')[0].firstChild.data
+    ports = list()
+    for signal in project.getElementsByTagName('entityIOPorts')[0].getElementsByTagName('signal'):
+        name = signal.getElementsByTagName('name')[0].firstChild.data
+        if name == 'clk':
+            continue
+        ports.append(tuple(signal.getElementsByTagName(tag)[0].firstChild.data for tag in ('name', 'mode', 'type', 'description')))
+    main_package = minidom.parse(generator.main_package_hdlgen_path(environment))
+    components = [component.getElementsByTagName('dir')[0].firstChild.data.replace('\\', '/') for component in main_package.getElementsByTagName('component')]
+    return (project.getElementsByTagName('name')[0].firstChild.data, settings.getElementsByTagName('location')[0].firstChild.data, environment,
+            ports, components, project.getElementsByTagName('TBNote')[0].firstChild.data)
+
+
+def test_streamed_parse_equals_minidom(tmp_path):
+    hdlgen_path = write_project(tmp_path)
+    project = generator.parse_hdlgen_project(hdlgen_path)
+    assert (project.name, project.location, project.environment, [(port.name, port.mode, port.type_str, port.description) for port in project.ports],
+            project.components, project.testbench) == minidom_project(hdlgen_path)
+
+
+def test_elements_are_cleared(tmp_path, monkeypatch):
+    hdlgen_path = write_project(tmp_path, signal_count=100)
+    roots = list()
+    iterparse = generator.ET.iterparse
+
+    def recording_iterparse(source, events):
+        for event, element in iterparse(source, events):
+            if not roots:
+                roots.append(element)
+            yield event, element
+
+    monkeypatch.setattr(generator.ET, 'iterparse', recording_iterparse)
+    signals = list()
+    for tag_path, element in generator.iter_hdlgen_elements(hdlgen_path, ('entityIOPorts/signal',)):
+        # the previous signal is released as soon as the next one is read
+        assert all(len(signal) == 0 for signal in signals)
+        assert element.findtext('name') is not None
+        signals.append(element)
+    assert len(signals) == 102
+    assert all(len(signal) == 0 and signal.text is None for signal in signals)
+    # nothing is left under the root, neither the wanted elements nor the skipped ones
+    assert len(roots[0]) == 0
+
+
+@pytest.mark.parametrize('content', ['', '<HDLGen><settings>', 'not xml'])
+def test_empty_or_invalid_file(tmp_path, content):
+    hdlgen_path = str(tmp_path / 'broken.hdlgen')
+    with open(hdlgen_path, 'w') as file:
+        file.write(content)
+    with pytest.raises(AssertionError, match='ERROR: .*broken.hdlgen'):
+        generator.parse_hdlgen_project(hdlgen_path)
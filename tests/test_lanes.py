@@ -0,0 +1,27 @@
+from de10nano_lanes import LANE_WIDTH, split_lane_fragment, lane_addresses
+
+
+def test_split_lane_fragment(pio_width):
+    # the pios of one direction are consecutive words, the bits of a port may start anywhere in a pio
+    for pio_index in range(4):
+        address = pio_index * pio_width // 8
+        for pio_lsb, bits in ((0, pio_width), (pio_width // 2 - 3, pio_width // 2 + 3), (pio_width - 1, 1)):
+            port_lsb = 5
+            lane_fragments = split_lane_fragment(address, pio_lsb, port_lsb, bits)
+            assert sum(fragment[4] for fragment in lane_fragments) == bits
+            bit = address * 8 + pio_lsb
+            for lane_address, lane_lsb, port_lane, port_shift, lane_bits in lane_fragments:
+                assert lane_address % (LANE_WIDTH // 8) == 0
+                assert lane_address * 8 + lane_lsb == bit
+                assert port_lane * LANE_WIDTH + port_shift == port_lsb
+                assert lane_lsb + lane_bits <= LANE_WIDTH and port_shift + lane_bits <= LANE_WIDTH
+                bit += lane_bits
+                port_lsb += lane_bits
+
+
+def test_split_lane_fragment_shared_lane():
+    # two 32 bit pios share a lane, the one at address 4 is in the upper half
+    assert split_lane_fragment(0, 0, 0, 32) == [(0, 0, 0, 0, 32)]
+    assert split_lane_fragment(4, 0, 0, 32) == [(0, 32, 0, 0, 32)]
+    assert split_lane_fragment(12, 16, 0, 32) == [(8, 48, 0, 0, 16), (16, 0, 0, 16, 16)]
+    assert lane_addresses([('out', split_lane_fragment(4, 0, 0, 32)), ('in', split_lane_fragment(0, 0, 0, 8))]) == {'out': [0], 'in': [0]}
@@ -0,0 +1,57 @@
+import os
+import struct
+
+import numpy as np
+
+import de10nano_lanes
+import de10nano_runtime as runtime
+from conftest import generate
+
+
+runtime.LOG = False
+
+
+def port_fragments(manifest):
+    return {name: (port.mode, port.width, port.lanes, [tuple(int(field) for field in fragment) for fragment in port.fragments])
+            for name, port in manifest.ports.items()}
+
+
+def test_manifest_round_trip(generated_path, pio_width):
+    xml_manifest = runtime.load_manifest(generated_path + 'soc_system.xml')
+    bin_manifest = runtime.load_binary_manifest(generated_path + 'soc_system.bin')
+    assert list(xml_manifest.ports) == list(bin_manifest.ports) == ['rst', 'a', 'b', 'w', 'y', 'z', 'v']
+    assert port_fragments(xml_manifest) == port_fragments(bin_manifest)
+    assert xml_manifest.out_lane_addresses == bin_manifest.out_lane_addresses
+    assert xml_manifest.in_lane_addresses == bin_manifest.in_lane_addresses
+    assert xml_manifest.slaves == bin_manifest.slaves
+    assert xml_manifest.address_width == bin_manifest.address_width
+    assert xml_manifest.testbench == bin_manifest.testbench
+    assert xml_manifest.pio_sync is bin_manifest.pio_sync is None
+    assert xml_manifest.cores == bin_manifest.cores == dict()
+    assert all(width == pio_width for _, _, width, _ in bin_manifest.pios)
+
+
+def test_atomic_manifest_round_trip(atomic_path):
+    xml_manifest = runtime.load_manifest(atomic_path + 'soc_system.xml')
+    bin_manifest = runtime.load_binary_manifest(atomic_path + 'soc_system.bin')
+    assert xml_manifest.pio_sync == bin_manifest.pio_sync == bin_manifest.slaves['pio_sync_0.s0'][0]
+
+
+def test_manifest_layouts():
+    # the generator packs the tables with struct and the runtime views them with numpy, both from the one layout
+    for name in ('MANIFEST_HEADER', 'MANIFEST_PORT', 'MANIFEST_FRAGMENT', 'MANIFEST_PIO', 'MANIFEST_SLAVE', 'MANIFEST_CORE', 'MANIFEST_CORE_PORT'):
+        layout = getattr(de10nano_lanes, name)
+        assert struct.calcsize(de10nano_lanes.manifest_struct_format(layout)) == np.dtype(de10nano_lanes.manifest_dtype(layout)).itemsize, name
+
+
+def test_core_manifest_round_trip(hdlgen_path, tmp_path):
+    path = generate(hdlgen_path, str(tmp_path / 'cores') + os.sep, pio_width=64, cycle_counter=True, irq_ports=['z', 'y'], atomic_pios=True, clock_control=True)
+    xml_manifest = runtime.load_manifest(path + 'soc_system.xml')
+    bin_manifest = runtime.load_binary_manifest(path + 'soc_system.bin')
+    assert xml_manifest.cores == bin_manifest.cores
+    slaves = bin_manifest.slaves
+    assert bin_manifest.cores == {'cycle_counter': ('cycle_counter_0', slaves['cycle_counter_0.free_running'][0], 0, []),
+                                  'pio_irq': ('pio_irq_0', slaves['pio_irq_0.s0'][0], 0, ['z', 'y']),
+                                  'pio_sync': ('pio_sync_0', slaves['pio_sync_0.s0'][0], 2, []),
+                                  'clock_control': ('clock_control_0', slaves['clock_control_0.s0'][0], 0, [])}
+    assert bin_manifest.pio_sync == slaves['pio_sync_0.s0'][0]
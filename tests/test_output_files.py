@@ -0,0 +1,23 @@
+import os
+
+import de10nano_project_generator as generator
+from conftest import generate
+
+
+def test_remove_stale_files(hdlgen_path, tmp_path):
+    path = str(tmp_path / 'out') + os.sep
+    generate(hdlgen_path, path, cycle_counter=True)
+    assert os.path.exists(path + 'cycle_counter_hw.tcl')
+    user_file = path + 'notes.txt'
+    with open(user_file, 'w') as file:
+        file.write('not generated')
+    changed_files = generator.de10nano_project_generator(hdlgen_path, path, 'quartus', 'qsys-script', 'qsys-generate', 'quartus_cpf')
+    # the cycle counter is not generated any more, the files the generator never wrote are kept
+    assert not os.path.exists(path + 'cycle_counter_hw.tcl')
+    assert path + 'cycle_counter_hw.tcl' in changed_files
+    assert os.path.exists(user_file)
+    with open(path + generator.GENERATED_FILES_LIST) as list_file:
+        generated = list_file.read().split()
+    assert 'soc_system.tcl' in generated and 'cycle_counter_hw.tcl' not in generated
+    # nothing changes in a run with the same options
+    assert generator.de10nano_project_generator(hdlgen_path, path, 'quartus', 'qsys-script', 'qsys-generate', 'quartus_cpf') == []
@@ -0,0 +1,13 @@
+import de10nano_project_generator as generator
+
+
+WIDTHS = [1, 3, 7, 8, 12, 16, 17, 24, 31, 32, 5, 2, 30]
+
+
+def test_pack_ports(pio_width):
+    port_indexes = list(range(len(WIDTHS)))
+    bins = generator.pack_ports(WIDTHS, port_indexes, pio_width)
+    assert sorted(port_index for port_bin in bins for port_index in port_bin) == port_indexes
+    assert all(sum(WIDTHS[port_index] for port_index in port_bin) <= pio_width for port_bin in bins)
+    # best-fit decreasing needs at most one pio more than the bits need
+    assert len(bins) <= -(-sum(WIDTHS) // pio_width) + 1
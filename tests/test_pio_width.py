@@ -0,0 +1,15 @@
+import de10nano_project_generator as generator
+
+
+def test_choose_pio_width():
+    ports = [generator.Port('wide', 'in', 'bus(199 downto 0)', '')] + [generator.Port(f'p{index}', 'in', 'bus(2 downto 0)', '') for index in range(30)]
+    # a single wide port is split across 64 bit pios instead of making every pio 256 bits
+    assert generator.choose_pio_width(ports) == 64
+    assert generator.choose_pio_width([generator.Port('wide', 'in', 'bus(255 downto 0)', '')]) == 256
+    assert generator.choose_pio_width([generator.Port('narrow', 'in', 'bus(7 downto 0)', '')]) == 64
+
+
+def test_count_pios(pio_width):
+    ports = [generator.Port(f'p{index}', 'in' if index % 3 else 'out', f'bus({width - 1} downto 0)', '') for index, width in enumerate((100, 300, 8, 64, 65, 2, 31))]
+    pios, _ = generator.allocate_pios(ports, pio_width=pio_width)
+    assert generator.count_pios(ports, pio_width=pio_width) == len(pios)
@@ -0,0 +1,73 @@
+import mmap
+import os
+
+import numpy as np
+
+import de10nano_runtime as runtime
+from conftest import generate
+
+
+runtime.LOG = False
+
+
+def test_lanes_do_not_overlap(generated_path):
+    manifest = runtime.load_binary_manifest(generated_path + 'soc_system.bin')
+    used = dict()
+    for name, port in manifest.ports.items():
+        addresses = manifest.out_lane_addresses if port.mode == 'out' else manifest.in_lane_addresses
+        for column, lane_lsb, port_lane, port_shift, mask in port.fragments:
+            bits = int(mask) << int(lane_lsb)
+            address = addresses[column]
+            assert not used.get(address, 0) & bits, f'{name} overlaps another port in lane {address}'
+            used[address] = used.get(address, 0) | bits
+
+
+def test_pack_unpack(generated_path):
+    manifest = runtime.load_binary_manifest(generated_path + 'soc_system.bin')
+    rng = np.random.default_rng(0)
+    values = {'a': rng.integers(0, 1 << 16, 10, dtype=np.uint64), 'b': rng.integers(0, 1 << 40, 10, dtype=np.uint64),
+              'w': rng.integers(0, 1 << 63, (10, 2), dtype=np.uint64) & np.array([(1 << 64) - 1, (1 << 36) - 1], dtype=np.uint64)}
+    values['w'][:, 0] |= np.uint64(1 << 63)
+    unpacked = runtime.Runtime(manifest, None).unpack(runtime.Runtime(manifest, None).pack(values), 'out')
+    for name, value in values.items():
+        assert np.array_equal(unpacked[name], value), name
+
+
+def test_bridge_on_a_file(hdlgen_path, tmp_path):
+    manifest = runtime.load_binary_manifest(generate(hdlgen_path, str(tmp_path / 'out') + os.sep, pio_width=64) + 'soc_system.bin')
+    span = manifest.span()
+    assert span % mmap.PAGESIZE == 0 and span >= 1 << manifest.address_width
+    # the window starts one page into the file, the file is created and extended to cover it
+    path = str(tmp_path / 'window.bin')
+    bridge = runtime.Bridge(span, path, base=mmap.PAGESIZE)
+    assert os.path.getsize(path) == mmap.PAGESIZE + span
+    rt = runtime.Runtime(manifest, bridge)
+    # the input pios hold the response of the design, it is written into the file before the run
+    response = {'y': np.array([0x1234], dtype=np.uint64), 'z': np.array([5], dtype=np.uint64), 'v': np.array([[1 << 63, 7]], dtype=np.uint64)}
+    bridge.words[manifest.in_lane_indexes] = rt.pack(response, mode='in')[0]
+    stimulus = {'a': np.array([0xABCD], dtype=np.uint64), 'b': np.array([0x12_3456_789A], dtype=np.uint64), 'w': np.array([[3, 9]], dtype=np.uint64)}
+    values = rt.run(stimulus)
+    for name, value in response.items():
+        assert np.array_equal(values[name], value), name
+    bridge.close()
+    with open(path, 'rb') as file:
+        file.seek(mmap.PAGESIZE)
+        words = np.frombuffer(file.read(span), dtype=np.uint64)
+    assert np.array_equal(words[manifest.out_lane_indexes], rt.pack(stimulus)[0])
+
+
+def test_span_is_rounded_to_pages():
+    assert runtime.Manifest([], 4).span() == mmap.PAGESIZE
+    assert runtime.Manifest([], 20).span() == 1 << 20
+    assert runtime.Manifest([], 20).span() % mmap.PAGESIZE == 0
+
+
+def test_bridge_registers_on_a_file(atomic_path, tmp_path):
+    manifest = runtime.load_binary_manifest(atomic_path + 'soc_system.bin')
+    bridge = runtime.Bridge(manifest.span(), str(tmp_path / 'window.bin'), base=0)
+    rt = runtime.Runtime(manifest, bridge)
+    rt.write_lanes(rt.pack({'a': np.array([1], dtype=np.uint64)})[0])
+    assert bridge.registers[manifest.pio_sync // 4] == runtime.PIO_SYNC_COMMIT
+    rt.read_lanes()
+    assert bridge.registers[manifest.pio_sync // 4] == runtime.PIO_SYNC_SNAPSHOT
+    bridge.close()
@@ -0,0 +1,51 @@
+import os
+import re
+
+import pytest
+
+from conftest import generate
+
+
+def sdc_lines(path):
+    with open(path + 'DE10_NANO_SOC_GHRD.sdc') as file:
+        return file.read().splitlines()
+
+
+def constraint_lines(lines):
+    return [line for line in lines if line.startswith(('set_multicycle_path', 'set_false_path'))]
+
+
+def test_default_sdc_does_not_relax(hdlgen_path, tmp_path):
+    lines = sdc_lines(generate(hdlgen_path, str(tmp_path / 'out') + os.sep))
+    assert 'create_clock -period "50.0 MHz" [get_ports FPGA_CLK1_50]' in lines
+    assert constraint_lines(lines) == []
+    assert not any('relaxed' in line for line in lines)
+
+
+@pytest.mark.parametrize('options', [dict(), dict(read_latency=2), dict(burst_size=4), dict(atomic_pios=True)])
+def test_pio_paths(hdlgen_path, tmp_path, pio_width, options):
+    lines = sdc_lines(generate(hdlgen_path, str(tmp_path / 'out') + os.sep, pio_width=pio_width, pio_multicycle=3, **options))
+    constraints = constraint_lines(lines)
+    setup_paths = [line.split(' -end ')[1].rsplit(' ', 1)[0] for line in constraints if ' -setup ' in line]
+    hold_paths = [line.split(' -end ')[1].rsplit(' ', 1)[0] for line in constraints if ' -hold ' in line]
+    assert setup_paths and setup_paths == hold_paths
+    assert len(set(setup_paths)) == len(setup_paths)
+    assert all(line.endswith(' 3') for line in constraints if ' -setup ' in line)
+    assert all(line.endswith(' 2') for line in constraints if ' -hold ' in line)
+    # the read paths end at the read data registers of the pios, never at the whole interconnect
+    assert all('{*mm_interconnect_*}' not in path for path in setup_paths)
+    # every pio comment is followed by the constraint of its path
+    start = lines.index(next(line for line in lines if line.startswith('# pio_')))
+    for line, next_line in zip(lines[start:], lines[start + 1:] + ['']):
+        if line.startswith('# pio_'):
+            assert next_line.startswith(('# pio_', 'set_multicycle_path -setup'))
+    ports = {port for line in lines[start:] if line.startswith('# pio_') for port in line.split(': ')[1].split(', ')}
+    assert ports == {'rst', 'a', 'b', 'w', 'y', 'z', 'v'}
+
+
+def test_false_paths_and_clock_control(hdlgen_path, tmp_path):
+    lines = sdc_lines(generate(hdlgen_path, str(tmp_path / 'out') + os.sep, pio_width=64, pio_multicycle=0, clock_control=True))
+    constraints = constraint_lines(lines)
+    assert constraints and all(line.startswith('set_false_path -from ') for line in constraints)
+    assert any(line.startswith('create_generated_clock -name dut_clk ') and 'clock_control_0|dut_clock_gate|outclk' in line for line in lines)
+    assert re.search(r'-to \[get_registers \{\*mm_interconnect_\*\|pio_in_\d+_s0_translator\|av_readdata_pre\[\*\]\}\]', ' '.join(constraints))
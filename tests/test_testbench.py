@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+import de10nano_project_generator as generator
+from conftest import generate
+
+
+def test_parse_port_value():
+    assert generator.parse_port_value('0xAB_CD') == 0xABCD
+    assert generator.parse_port_value('x"1F"') == 0x1F
+    assert generator.parse_port_value('"0101"') == 0b0101
+    assert generator.parse_port_value("'1'") == 1
+    assert generator.parse_port_value('-') is None
+    # digits without prefix are always hex
+    assert generator.parse_port_value('10') == 0x10
+    assert generator.parse_port_value('0010') == 0x10
+    assert generator.parse_port_value('0101') == 0x101
+    assert generator.parse_port_value('AB') == 0xAB
+    for value_str in ('0xZZ', '0b12', '"12"', '-1', '1.5', 'G'):
+        with pytest.raises(ValueError):
+            generator.parse_port_value(value_str)
+
+
+PORTS = [generator.Port('rst', 'in', 'single bit', ''), generator.Port('a', 'in', 'bus(7 downto 0)', ''), generator.Port('y', 'out', 'bus(7 downto 0)', '')]
+
+
+def test_parse_testbench_table_skips_prose():
+    testbench = 'Apply a reset then check y\nTestNo\trst\ta\ty\tNote\n1\t1\t0\t0\treset\n2\t0\t0x12\t0xED\tinvert\n'
+    assert generator.parse_testbench_table(testbench, PORTS) == ([0, 1, 2], [[1, 0, 0], [0, 0x12, 0xED]])
+    # a header needs an input and an output port, and single word column names
+    assert generator.parse_testbench_table('a, then y\nrst | a\n1 | 0\n', PORTS) == ([], [])
+
+
+def test_parse_testbench_table_aligned_columns():
+    testbench = 'Reset a then y\nrst  a     y\n1    0     0\n0    0x12  0xED\n'
+    assert generator.parse_testbench_table(testbench, PORTS) == ([0, 1, 2], [[1, 0, 0], [0, 0x12, 0xED]])
+
+
+def test_parse_testbench_table_reports_bad_rows(capsys, monkeypatch):
+    monkeypatch.setattr(generator, 'LOG', True)
+    port_indexes, rows = generator.parse_testbench_table('rst\ta\ty\n1\t0\t0\n0\t0x12\n', PORTS)
+    assert rows == [[1, 0, 0]]
+    assert 'ERROR: line 3 of the TBNote has 2 columns' in capsys.readouterr().out
+
+
+def test_compile_testbench_without_steps(hdlgen_path, tmp_path):
+    with open(hdlgen_path) as file:
+        hdlgen = file.read()
+    start = hdlgen.index('<TBNote>') + len('<TBNote>')
+    with open(hdlgen_path, 'w') as file:
+        file.write(hdlgen[:start] + 'Apply a reset then check y' + hdlgen[hdlgen.index('</TBNote>'):])
+    with pytest.raises(AssertionError, match='ERROR: no test step'):
+        generate(hdlgen_path, str(tmp_path / 'out') + os.sep)
@@ -0,0 +1,16 @@
+import de10nano_project_generator as generator
+
+
+def test_allocate_pios_splits_wide_ports(pio_width):
+    ports = [generator.Port(f'p{index}', 'in', f'bus({width - 1} downto 0)', '') for index, width in enumerate((100, 300, 8))]
+    pios, connections = generator.allocate_pios(ports, pio_width=pio_width, address_map=generator.AddressMap())
+    for port_index, port in enumerate(ports):
+        bits = sorted((connection[4] if len(connection) > 4 else 0, connection[2] - connection[3] + 1)
+                      for connection in connections if connection[0] == port_index)
+        # the slices of a port cover each of its bits once
+        covered = 0
+        for port_lsb, width in bits:
+            assert port_lsb == covered
+            covered += width
+        assert covered == port.width
+    assert all(pio.width == pio_width for pio in pios)
@@ -0,0 +1,39 @@
+import de10nano_runtime as runtime
+import de10nano_bus_model as bus_model
+from conftest import dut_function
+
+
+runtime.LOG = False
+bus_model.LOG = False
+
+
+def test_flush_commits(atomic_path):
+    manifest = runtime.load_binary_manifest(atomic_path + 'soc_system.bin')
+    model = bus_model.BusModel(manifest, bus_model.FunctionModel(dut_function))
+    writer = runtime.WriteCoalescer(manifest, model)
+    writer.update({'a': 0x1234, 'b': 0x12_3456_789A})
+    assert model.inputs['a'] == 0
+    # the coalescer commits the lanes it writes, without the Runtime
+    assert writer.flush() > 0
+    assert (model.inputs['a'], model.inputs['b']) == (0x1234, 0x12_3456_789A)
+    assert writer.commits == 1
+    # nothing changed, nothing is written or committed
+    writer.set('a', 0x1234)
+    assert writer.flush() == 0
+    assert writer.commits == 1
+
+
+def test_saved(generated_path):
+    manifest = runtime.load_binary_manifest(generated_path + 'soc_system.bin')
+    model = bus_model.BusModel(manifest)
+    writer = runtime.WriteCoalescer(manifest, model)
+    lanes_of = {name: len(columns) for name, columns in writer.port_columns.items()}
+    writer.update({'a': 1, 'b': 2, 'w': 3})
+    # saved is derived from the counters, nothing is written before the flush
+    assert writer.saved() == writer.lane_updates == lanes_of['a'] + lanes_of['b'] + lanes_of['w']
+    written = writer.flush()
+    assert written == model.writes == writer.transactions
+    assert writer.saved() == writer.lane_updates - written >= 0
+    writer.set('a', 1)
+    assert writer.flush() == 0
+    assert writer.saved() == writer.lane_updates - written